@@ -0,0 +1,184 @@
+"""ChapterExtractor 基准测试：逐元素 get_attribute 与单次 evaluate 快照的往返次数和耗时对比
+
+用法:
+    python benchmarks/bench_chapter_extractor.py               # 使用本地 Chromium + page.set_content
+    python benchmarks/bench_chapter_extractor.py --simulated   # 无浏览器，按 --rtt-ms 模拟每次往返延迟
+"""
+import os
+import sys
+import time
+import asyncio
+import inspect
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors.chapter_extractor import ChapterExtractor
+from utils.url_canonicalizer import url_canonicalizer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+logging.getLogger('extractors.chapter_extractor').setLevel(logging.WARNING)
+
+
+def build_chapter_html(content_images: int, decoration_images: int, links: int) -> str:
+    """构造一个与章节页面结构相近的测试页面"""
+    parts = ['<html><head><title>测试漫画 - 第12话</title></head><body><div class="imglist">']
+    for i in range(content_images):
+        parts.append(f'<img src="https://g-mh.online/hp/12345/{i + 1}_abc.webp" alt="p{i}" class="lazy">')
+    parts.append('</div>')
+    for i in range(decoration_images):
+        parts.append(f'<img src="https://cncover.godamanga.online/cover/{i}.jpg" alt="cover" class="cover">')
+    parts.append('<a href="/manga/test/1-1-11">上一话</a><a href="/manga/test/1-1-13">下一话</a>')
+    for i in range(links):
+        parts.append(f'<a href="/manga/other-{i}">推荐漫画 {i}</a>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+class RoundTripCounter:
+    """代理 Page/ElementHandle，统计每一次需要 await 的浏览器调用"""
+    def __init__(self, target, stats: dict):
+        self._target = target
+        self._stats = stats
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def wrapper(*args, **kwargs):
+            self._stats['round_trips'] += 1
+            result = await attr(*args, **kwargs)
+            if isinstance(result, list):
+                return [RoundTripCounter(item, self._stats) if hasattr(item, 'get_attribute') else item
+                        for item in result]
+            return result
+        return wrapper
+
+
+class SimulatedElement:
+    """模拟 ElementHandle，每次调用耗费一次往返延迟"""
+    def __init__(self, attrs: dict, text: str, rtt: float):
+        self._attrs = attrs
+        self._text = text
+        self._rtt = rtt
+
+    async def get_attribute(self, name):
+        await asyncio.sleep(self._rtt)
+        return self._attrs.get(name)
+
+    async def inner_text(self):
+        await asyncio.sleep(self._rtt)
+        return self._text
+
+
+class SimulatedPage:
+    """模拟 Page：从 lxml 解析的测试页面中应答查询"""
+    def __init__(self, html_text: str, rtt: float):
+        from lxml import html as lxml_html
+        self._tree = lxml_html.fromstring(html_text)
+        self._rtt = rtt
+
+    async def title(self):
+        await asyncio.sleep(self._rtt)
+        return self._tree.findtext('.//title')
+
+    async def query_selector_all(self, selector):
+        await asyncio.sleep(self._rtt)
+        return [SimulatedElement(dict(el.attrib), el.text_content(), self._rtt) for el in self._tree.iter(selector)]
+
+    async def evaluate(self, script):
+        await asyncio.sleep(self._rtt)
+        return {
+            'title': self._tree.findtext('.//title'),
+            'images': [[img.get('src', ''), img.get('alt', ''), img.get('class', '')] for img in self._tree.iter('img')],
+            'links': [[a.text_content(), a.get('href')] for a in self._tree.iter('a')]
+        }
+
+
+async def legacy_extract(page):
+    """改造前的实现：标题一次往返，每个 <img> 三次，每个 <a> 两次"""
+    title = await page.title()
+    images = set()
+    for img in await page.query_selector_all('img'):
+        src = await img.get_attribute('src') or ''
+        await img.get_attribute('alt')
+        await img.get_attribute('class')
+        if ('g-mh.online/hp/' in src or 'baozimh.org' in src) and 'cover' not in src:
+            images.add(src)
+    nav = {'prev': None, 'next': None}
+    for link in await page.query_selector_all('a'):
+        text = await link.inner_text()
+        href = await link.get_attribute('href')
+        if text and href:
+            if '上一' in text:
+                nav['prev'] = href
+            elif '下一' in text:
+                nav['next'] = href
+    return title, sorted(images, key=ChapterExtractor._get_image_number), nav
+
+
+async def batched_extract(page):
+    """当前实现：单次 evaluate 快照，过滤排序在 Python 中完成"""
+    snapshot = await ChapterExtractor._snapshot_page(page)
+    images = ChapterExtractor._extract_chapter_images(snapshot['images'])
+    nav = ChapterExtractor._extract_navigation_links(snapshot['links'])
+    return snapshot['title'], images, nav
+
+
+async def measure(name, extract, page, rounds: int) -> dict:
+    stats = {'round_trips': 0}
+    counted_page = RoundTripCounter(page, stats)
+    result = None
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        result = await extract(counted_page)
+    elapsed = (time.perf_counter() - start_time) / rounds
+    logger.info(f"{name}: 往返次数 {stats['round_trips'] // rounds}, 平均耗时 {elapsed * 1000:.1f}ms, 图片 {len(result[1])} 张")
+    return {'round_trips': stats['round_trips'] // rounds, 'elapsed': elapsed, 'result': result}
+
+
+async def run(args):
+    html_text = build_chapter_html(args.images, args.decorations, args.links)
+
+    if args.simulated:
+        logger.info(f"模拟模式，每次往返 {args.rtt_ms}ms")
+        page = SimulatedPage(html_text, args.rtt_ms / 1000)
+        before = await measure('逐元素调用', legacy_extract, page, args.rounds)
+        after = await measure('单次快照', batched_extract, page, args.rounds)
+    else:
+        from playwright.async_api import async_playwright
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=True)
+            try:
+                page = await browser.new_page()
+                await page.set_content(html_text)
+                before = await measure('逐元素调用', legacy_extract, page, args.rounds)
+                after = await measure('单次快照', batched_extract, page, args.rounds)
+            finally:
+                await browser.close()
+
+    # 改造前的导航链接保留页面中的原始 href，比较时统一为站内路径（与 ChapterExtractor 的输出形式一致）
+    legacy_images, legacy_nav = before['result'][1:]
+    legacy_nav = dict(zip(legacy_nav, (path or None for path in url_canonicalizer.display(legacy_nav.values(), 'page'))))
+    if (legacy_images, legacy_nav) != tuple(after['result'][1:]):
+        logger.error("两种实现的提取结果不一致")
+    logger.info(f"往返次数: {before['round_trips']} -> {after['round_trips']}")
+    logger.info(f"耗时: {before['elapsed'] * 1000:.1f}ms -> {after['elapsed'] * 1000:.1f}ms "
+                f"({before['elapsed'] / max(after['elapsed'], 1e-9):.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ChapterExtractor 往返次数基准测试")
+    parser.add_argument('--images', type=int, default=60, help='章节图片数量')
+    parser.add_argument('--decorations', type=int, default=20, help='非章节图片数量')
+    parser.add_argument('--links', type=int, default=150, help='页面链接数量')
+    parser.add_argument('--rounds', type=int, default=5, help='每种实现的执行轮数')
+    parser.add_argument('--simulated', action='store_true', help='不启动浏览器，模拟往返延迟')
+    parser.add_argument('--rtt-ms', type=float, default=1.0, help='模拟模式下每次往返的延迟（毫秒）')
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,98 @@
+"""章节列表构建基准测试：逐个 any() 去重 + 排序时编译正则 与 ChapterListBuilder 的耗时对比
+
+用法:
+    python benchmarks/bench_chapter_list.py                    # 5000 章
+    python benchmarks/bench_chapter_list.py --chapters 20000
+"""
+import os
+import re
+import sys
+import time
+import random
+import logging
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors.chapter_list import build_chapter_list
+from models.records import ChapterRef
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def build_sources(chapters: int, recent: int, seed: int):
+    """构造两个来源：完整章节列表页（乱序）和漫画页面上的最近若干章（与列表页重复）"""
+    rng = random.Random(seed)
+    full = [ChapterRef(f'第{i}话', f'testmanga/32382-046010880-{i}') for i in range(1, chapters + 1)]
+    rng.shuffle(full)
+    page = [ChapterRef(f'第{i}话', f'testmanga/32382-046010880-{i}')
+            for i in range(chapters, max(chapters - recent, 0), -1)]
+    return full, page
+
+
+def legacy_extract_chapter_number(chapter_link: str) -> int:
+    try:
+        match = re.search(r'-(\d+)$', chapter_link)
+        if match:
+            return int(match.group(1))
+        return 0
+    except Exception:
+        return 0
+
+
+def legacy_build(full, page):
+    """改造前的实现：逐个 any() 检查重复，再按 re.search 提取的序号排序"""
+    chapters = []
+    for source in (full, page):
+        for chapter in source:
+            chapter_info = {'title': chapter.title, 'link': chapter.link}
+            if not any(c['link'] == chapter_info['link'] for c in chapters):
+                chapters.append(chapter_info)
+    chapters.sort(key=lambda x: legacy_extract_chapter_number(x['link']))
+    return chapters
+
+
+def builder_build(full, page):
+    """当前实现：按链接哈希去重，预编译正则，稳定排序"""
+    return build_chapter_list(full, page)
+
+
+def measure(name, build, full, page, rounds: int) -> dict:
+    timings = []
+    result = None
+    for _ in range(rounds):
+        start_time = time.perf_counter()
+        result = build(full, page)
+        timings.append((time.perf_counter() - start_time) * 1000)
+    elapsed = statistics.median(timings)
+    logger.info(f"{name}: {len(result)} 章, 耗时中位数 {elapsed:.2f}ms")
+    return {'elapsed': elapsed, 'result': result}
+
+
+def main(args):
+    full, page = build_sources(args.chapters, args.recent, args.seed)
+    logger.info(f"章节列表页 {len(full)} 章，漫画页面 {len(page)} 章")
+    after = measure('ChapterListBuilder', builder_build, full, page, args.rounds)
+    if args.skip_legacy:
+        return
+    before = measure('any() 去重', legacy_build, full, page, args.legacy_rounds)
+    if [c['link'] for c in before['result']] != [c.link for c in after['result']]:
+        logger.error("两种实现的章节顺序不一致")
+    logger.info(f"耗时: {before['elapsed']:.2f}ms -> {after['elapsed']:.2f}ms "
+                f"({before['elapsed'] / max(after['elapsed'], 1e-9):.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="章节列表构建基准测试")
+    parser.add_argument('--chapters', type=int, default=5000, help='章节数量')
+    parser.add_argument('--recent', type=int, default=100, help='漫画页面上的最近章节数量')
+    parser.add_argument('--rounds', type=int, default=20, help='ChapterListBuilder 执行轮数')
+    parser.add_argument('--legacy-rounds', type=int, default=3, help='旧实现执行轮数')
+    parser.add_argument('--skip-legacy', action='store_true', help='只测试 ChapterListBuilder')
+    parser.add_argument('--seed', type=int, default=42, help='乱序随机种子')
+    main(parser.parse_args())
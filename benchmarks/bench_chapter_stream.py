@@ -0,0 +1,110 @@
+"""章节列表流式解析基准测试：整页建树提取 与 ChapterStreamParser 分块解析的首批章节延迟和峰值内存对比
+
+用法:
+    python benchmarks/bench_chapter_stream.py                       # 5000 章
+    python benchmarks/bench_chapter_stream.py --chapters 20000 --chunk-kb 16
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tracemalloc
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.parse_pool import extract_document
+from extractors.chapter_stream import ChapterStreamParser
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+CONTENT_TYPE = 'text/html; charset=utf-8'
+
+
+def build_chapter_list_html(chapters: int) -> bytes:
+    parts = ['<html><head><meta charset="utf-8"><title>章节列表 - G-MH</title></head><body><main>'
+             '<div class="chapter-list">']
+    for i in range(chapters, 0, -1):
+        parts.append(f'<div class="chapteritem"><a href="/manga/test/32382-046010880-{i}">'
+                     f'<span>第{i}话 标题{i}</span></a></div>')
+    parts.append('</div></main></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def chunked(content: bytes, chunk_size: int):
+    for start in range(0, len(content), chunk_size):
+        yield content[start:start + chunk_size]
+
+
+def run_full(content: bytes, chunk_size: int) -> dict:
+    """改造前的实现：下载完整个响应后一次建树并提取全部章节"""
+    start_time = time.perf_counter()
+    body = b''.join(chunked(content, chunk_size))
+    chapters = extract_document('chapter_list', body, CONTENT_TYPE, ['chapters'])['chapters']
+    elapsed = (time.perf_counter() - start_time) * 1000
+    return {'first_ms': elapsed, 'total_ms': elapsed, 'count': len(chapters)}
+
+
+def run_stream(content: bytes, chunk_size: int) -> dict:
+    """当前实现：逐块喂入解析器，每块产出一批章节"""
+    start_time = time.perf_counter()
+    first_ms = None
+    count = 0
+    parser = ChapterStreamParser(CONTENT_TYPE)
+    for chunk in chunked(content, chunk_size):
+        chapters = parser.feed(chunk)
+        if chapters and first_ms is None:
+            first_ms = (time.perf_counter() - start_time) * 1000
+        count += len(chapters)
+    count += len(parser.close())
+    total_ms = (time.perf_counter() - start_time) * 1000
+    return {'first_ms': first_ms if first_ms is not None else total_ms, 'total_ms': total_ms, 'count': count}
+
+
+MODES = {
+    'full': run_full,
+    'stream': run_stream
+}
+
+
+def measure_memory(mode: str, content: bytes, chunk_size: int) -> int:
+    """在独立进程中执行一次，返回 Python 堆峰值（KB，不含响应本身）"""
+    MODES[mode](b'<html><body></body></html>', chunk_size)  # 预先加载模块
+    tracemalloc.start()
+    MODES[mode](content, chunk_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak // 1024
+
+
+def main(args):
+    content = build_chapter_list_html(args.chapters)
+    chunk_size = args.chunk_kb * 1024
+    logger.info(f"章节列表页 {args.chapters} 章, {len(content) // 1024}KB, 分块 {args.chunk_kb}KB")
+    ctx = multiprocessing.get_context('spawn')
+    counts = set()
+    for mode, run in MODES.items():
+        results = [run(content, chunk_size) for _ in range(args.rounds)]
+        first_ms = sorted(r['first_ms'] for r in results)[len(results) // 2]
+        total_ms = sorted(r['total_ms'] for r in results)[len(results) // 2]
+        counts.add(results[0]['count'])
+        with ctx.Pool(1) as pool:
+            heap_kb = pool.apply(measure_memory, (mode, content, chunk_size))
+        logger.info(f"  {mode:<7} 首批章节 {first_ms:8.2f}ms  全部完成 {total_ms:8.2f}ms  "
+                    f"Python 堆峰值 {heap_kb:7d}KB  章节 {results[0]['count']}")
+    if len(counts) != 1:
+        logger.error("两种实现提取的章节数量不一致")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="章节列表流式解析基准测试")
+    parser.add_argument('--chapters', type=int, default=5000, help='章节数量')
+    parser.add_argument('--chunk-kb', type=int, default=64, help='响应分块大小（KB）')
+    parser.add_argument('--rounds', type=int, default=5, help='每种方式的执行轮数')
+    main(parser.parse_args())
@@ -0,0 +1,193 @@
+"""HTML 解析基准测试：各解析后端（以及改造前的 BeautifulSoup 往返）的耗时、峰值内存和提取结果对比
+
+已安装的全部后端（HTML_PARSER_CONFIG 可选值）都会参与测试，未安装的跳过；
+在录制页面上总耗时最短且提取结果与 lxml 一致的后端即为建议的默认值。
+
+用法:
+    python benchmarks/bench_html_parse.py                       # 使用构造的首页/漫画/章节页面
+    python benchmarks/bench_html_parse.py --pages data/debug    # 使用录制的页面（目录下的 *.html）
+"""
+import os
+import sys
+import glob
+import time
+import logging
+import argparse
+import resource
+import statistics
+import tracemalloc
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lxml import etree
+from utils.html_parser import detect_encoding, load_backend, PARSER_BACKENDS
+from extractors.selector_registry import extract_page
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def build_home_html(cards: int) -> str:
+    parts = ['<html><head><meta charset="utf-8"><title>G-MH 首页</title></head><body><main>']
+    for i in range(cards):
+        parts.append(f'<div class="slicarda"><a href="/manga/test-{i}"><img src="https://cncover.godamanga.online/cover/{i}.jpg">'
+                     f'<h3 class="slicardtitle">测试漫画 {i}</h3></a><p class="slicardtagp">第{i}话</p></div>')
+    parts.append('</main></body></html>')
+    return ''.join(parts)
+
+
+def build_manga_html(chapters: int) -> str:
+    parts = ['<html><head><meta charset="utf-8"><title>测试漫画 - G-MH</title></head><body><main><div>',
+             '<h1>测试漫画</h1><p>作者：测试作者</p><div class="chapter-list">']
+    for i in range(chapters):
+        parts.append(f'<div class="chapteritem"><a href="/manga/test/1-1-{i}"><span>第{i + 1}话 标题{i}</span></a></div>')
+    parts.append('</div></div></main></body></html>')
+    return ''.join(parts)
+
+
+def build_chapter_html(images: int) -> str:
+    parts = ['<html><head><meta charset="utf-8"><title>测试漫画 - 第12话</title></head><body><div class="imglist">']
+    for i in range(images):
+        parts.append(f'<img src="https://g-mh.online/hp/12345/{i + 1}_abc.webp" alt="p{i}" class="lazy">')
+    parts.append('</div><a href="/manga/test/1-1-11">上一话</a><a href="/manga/test/1-1-13">下一话</a></body></html>')
+    return ''.join(parts)
+
+
+def load_pages(args) -> dict:
+    """读取录制页面（原始字节），没有时使用构造的页面"""
+    if args.pages:
+        paths = sorted(glob.glob(os.path.join(args.pages, '*.html')))
+        if paths:
+            pages = {}
+            for path in paths:
+                with open(path, 'rb') as f:
+                    pages[os.path.basename(path)] = f.read()
+            return pages
+        logger.warning(f"{args.pages} 下没有 .html 文件，使用构造的页面")
+    return {
+        'home': build_home_html(args.cards).encode('utf-8'),
+        'manga': build_manga_html(args.chapters).encode('utf-8'),
+        'chapter': build_chapter_html(args.images).encode('utf-8')
+    }
+
+
+# 录制页面文件名（如 debug_capture 保存的 manga_page.html）中的关键词 -> 页面类型
+_PAGE_TYPES = (
+    ('chapter_list', 'chapter_list'),
+    ('manga_chapters', 'chapter_list'),
+    ('manga', 'manga'),
+    ('home', 'home'),
+    ('search', 'search'),
+    ('chapter', 'chapter')
+)
+
+
+def page_type_for(page_name: str):
+    for keyword, page_type in _PAGE_TYPES:
+        if keyword in page_name:
+            return page_type
+    return None
+
+
+def parse_bs4_roundtrip(content: bytes):
+    """改造前的实现：html.parser 解析、序列化后再交给 lxml"""
+    from bs4 import BeautifulSoup
+    return etree.HTML(str(BeautifulSoup(content, 'html.parser')))
+
+
+def backend_parser(name: str):
+    """解析后端：按 Content-Type/meta 检测编码后交给后端，后端未安装时抛出 ImportError"""
+    parse = load_backend(name)
+
+    def parser(content: bytes):
+        return parse(content, detect_encoding(content, 'text/html; charset=utf-8'))
+    return parser
+
+
+def load_parsers() -> dict:
+    """已安装的解析方式，第一个为改造前的实现"""
+    parsers = {}
+    candidates = [('bs4+lxml', lambda: parse_bs4_roundtrip)]
+    candidates += [(name, lambda name=name: backend_parser(name)) for name in PARSER_BACKENDS]
+    for name, factory in candidates:
+        try:
+            parser = factory()
+            parser(b'<html></html>')
+            parsers[name] = parser
+        except ImportError as e:
+            logger.warning(f"{name} 不可用，跳过: {str(e)}")
+    return parsers
+
+
+def measure_memory(name: str, content: bytes) -> tuple:
+    """在独立进程中解析一次，返回 (Python 堆峰值, 进程 RSS 峰值增量)，单位 KB"""
+    parser = parse_bs4_roundtrip if name == 'bs4+lxml' else backend_parser(name)
+    parser(b'<html><body></body></html>')  # 预先加载模块
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    tree = parser(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss
+    del tree
+    return peak // 1024, rss
+
+
+def measure_time(parser, content: bytes, rounds: int) -> float:
+    """多轮解析，返回耗时中位数（毫秒）"""
+    timings = []
+    for _ in range(rounds):
+        start_time = time.perf_counter()
+        parser(content)
+        timings.append((time.perf_counter() - start_time) * 1000)
+    return statistics.median(timings)
+
+
+def main(args):
+    pages = load_pages(args)
+    parsers = load_parsers()
+    totals = {name: 0.0 for name in parsers}
+    mismatched = set()
+
+    ctx = multiprocessing.get_context('spawn')
+    for page_name, content in pages.items():
+        page_type = page_type_for(page_name)
+        logger.info(f"{page_name} ({len(content) // 1024}KB, 页面类型 {page_type or '未知'})")
+        expected = None
+        for name, parser in parsers.items():
+            elapsed = measure_time(parser, content, args.rounds)
+            with ctx.Pool(1) as pool:
+                heap_kb, rss_kb = pool.apply(measure_memory, (name, content))
+            totals[name] += elapsed
+            same = ''
+            if page_type:
+                result = extract_page(page_type, parser(content))
+                if name == 'lxml':
+                    expected = result
+                elif expected is not None and name in PARSER_BACKENDS:
+                    same = '  提取结果一致' if result == expected else '  提取结果不一致'
+                    if result != expected:
+                        mismatched.add(name)
+            logger.info(f"  {name:<13} 耗时 {elapsed:8.2f}ms  Python 堆峰值 {heap_kb:7d}KB  RSS 峰值增量 {rss_kb:7d}KB{same}")
+
+    logger.info("总耗时: " + ", ".join(f"{name} {total:.2f}ms" for name, total in totals.items()))
+    candidates = [name for name in totals if name in PARSER_BACKENDS and name not in mismatched]
+    if candidates:
+        best = min(candidates, key=totals.get)
+        logger.info(f"建议 HTML_PARSER_CONFIG['backend'] = '{best}'")
+    if mismatched:
+        logger.warning(f"提取结果与 lxml 不一致的后端: {', '.join(sorted(mismatched))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTML 解析后端耗时、内存和提取结果基准测试")
+    parser.add_argument('--pages', help='录制页面目录（*.html，原始字节）')
+    parser.add_argument('--cards', type=int, default=120, help='构造首页的卡片数量')
+    parser.add_argument('--chapters', type=int, default=1500, help='构造漫画页的章节数量')
+    parser.add_argument('--images', type=int, default=200, help='构造章节页的图片数量')
+    parser.add_argument('--rounds', type=int, default=10, help='每种解析方式的执行轮数')
+    main(parser.parse_args())
@@ -0,0 +1,157 @@
+"""提取记录基准测试：dict / pydantic 模型与 __slots__ 记录的内存占用和 JSON/BSON 编码耗时对比
+
+场景：1000 章漫画的章节列表、200 张图片的章节。
+dict 为改用记录之前提取器返回的 dict，JSON 为 API 返回的字段，BSON 为写库文档（字段与记录的 to_document 相同）；
+pydantic 为改用记录之前的写库路径。
+
+用法:
+    python benchmarks/bench_records.py
+    python benchmarks/bench_records.py --chapters 5000 --images 400
+"""
+import os
+import sys
+import gc
+import json
+import time
+import logging
+import argparse
+import warnings
+import statistics
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bson
+from models.manga import ChapterInfo, Image
+from models.records import ChapterRef, ImageRef, to_dicts
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+# pydantic v2 下 .dict()/.json() 的弃用提示与测试无关
+warnings.filterwarnings('ignore', category=DeprecationWarning)
+
+MANGA_ID = 'testmanga'
+CHAPTER_ID = '32382-046010880-12'
+
+
+# ---- 章节列表 ----
+
+def chapters_dict(count: int):
+    return [{'title': f'第{i}话 标题{i}', 'link': f'{MANGA_ID}/32382-046010880-{i}'} for i in range(1, count + 1)]
+
+
+def chapters_pydantic(count: int):
+    """改造前的写库路径：每章一个 ChapterInfo 模型"""
+    return [ChapterInfo(manga_id=MANGA_ID, chapter_id=f'{MANGA_ID}_chapter_{i}', title=f'第{i}话 标题{i}',
+                        link=f'{MANGA_ID}/32382-046010880-{i}', order=i) for i in range(1, count + 1)]
+
+
+def chapters_records(count: int):
+    return [ChapterRef(f'第{i}话 标题{i}', f'{MANGA_ID}/32382-046010880-{i}', i) for i in range(1, count + 1)]
+
+
+# ---- 章节图片 ----
+
+def images_dict(count: int):
+    return [{'url': f'https://g-mh.online/hp/12345/{i + 1}_abc.webp', 'order': i} for i in range(count)]
+
+
+def images_pydantic(count: int):
+    """改造前的写库路径：每张图片一个 Image 模型"""
+    return [Image(manga_id=MANGA_ID, chapter_id=CHAPTER_ID, url=f'https://g-mh.online/hp/12345/{i + 1}_abc.webp',
+                  order=i) for i in range(count)]
+
+
+def images_records(count: int):
+    return [ImageRef(f'https://g-mh.online/hp/12345/{i + 1}_abc.webp', i) for i in range(count)]
+
+
+def to_json(items) -> bytes:
+    """编码为 API 响应"""
+    if items and hasattr(items[0], 'json'):
+        return ('[' + ','.join(item.json() for item in items) + ']').encode('utf-8')
+    if items and hasattr(items[0], 'to_dict'):
+        items = to_dicts(items)
+    return json.dumps(items, ensure_ascii=False).encode('utf-8')
+
+
+def dict_document(item: dict, order: int, now: datetime) -> dict:
+    """dict 写库时需要补全的文档字段，与记录的 to_document 相同"""
+    if 'url' in item:
+        return {'image_id': f'{CHAPTER_ID}_{order}', 'chapter_id': CHAPTER_ID, 'manga_id': MANGA_ID,
+                'url': item['url'], 'order': order, 'updated_at': now}
+    return {'manga_id': MANGA_ID, 'chapter_id': f'{MANGA_ID}_chapter_{order}', 'title': item['title'],
+            'link': item['link'], 'order': order, 'updated_at': now}
+
+
+def to_bson(items, now: datetime) -> int:
+    """编码为写库文档，返回 BSON 总字节数"""
+    size = 0
+    for position, item in enumerate(items, 1):
+        if isinstance(item, ChapterRef):
+            document = item.to_document(MANGA_ID, now)
+        elif isinstance(item, ImageRef):
+            document = item.to_document(MANGA_ID, CHAPTER_ID, now)
+        elif isinstance(item, dict):
+            document = dict_document(item, item.get('order', position), now)
+        else:
+            document = item.dict()
+        size += len(bson.encode(document))
+    return size
+
+
+def measure_memory(build, count: int) -> int:
+    """构建并保留全部对象后的 Python 堆占用（KB）"""
+    gc.collect()
+    tracemalloc.start()
+    items = build(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return current // 1024
+
+
+def measure_time(run, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        start_time = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start_time) * 1000)
+    return statistics.median(timings)
+
+
+def run_scenario(title: str, builders: dict, count: int, rounds: int):
+    logger.info(f"{title}（{count} 项）")
+    now = datetime.now()
+    for name, build in builders.items():
+        heap_kb = measure_memory(build, count)
+        items = build(count)
+        build_ms = measure_time(lambda: build(count), rounds)
+        json_ms = measure_time(lambda: to_json(items), rounds)
+        bson_ms = measure_time(lambda: to_bson(items, now), rounds)
+        logger.info(f"  {name:<9} 堆占用 {heap_kb:6d}KB  构建 {build_ms:7.2f}ms  JSON {json_ms:7.2f}ms  BSON {bson_ms:7.2f}ms")
+
+
+def main(args):
+    run_scenario('长篇漫画章节列表', {
+        'dict': chapters_dict,
+        'pydantic': chapters_pydantic,
+        'records': chapters_records
+    }, args.chapters, args.rounds)
+    run_scenario('章节图片', {
+        'dict': images_dict,
+        'pydantic': images_pydantic,
+        'records': images_records
+    }, args.images, args.rounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="提取记录内存和编码基准测试")
+    parser.add_argument('--chapters', type=int, default=1000, help='章节数量')
+    parser.add_argument('--images', type=int, default=200, help='图片数量')
+    parser.add_argument('--rounds', type=int, default=20, help='每项执行轮数')
+    main(parser.parse_args())
@@ -0,0 +1,101 @@
+"""地址规范化基准测试：逐个 urljoin + 子串扫描 与 UrlCanonicalizer 批量处理的耗时对比
+
+用法:
+    python benchmarks/bench_url_canonicalizer.py                  # 200 张图片 + 1000 个章节链接 + 120 个封面
+    python benchmarks/bench_url_canonicalizer.py --images 1000
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import statistics
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.url_canonicalizer import UrlCanonicalizer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+BASE_URL = 'https://g-mh.org/'
+MANGA_ROOT = urljoin(BASE_URL, 'manga/')
+LEGACY_MARKERS = ('g-mh.online/hp/', 'baozimh.org', 'godamanga.online', 'mhcdn.xyz', 'mangafuna.xyz')
+
+
+def build_urls(images: int, chapters: int, covers: int) -> dict:
+    image_urls = []
+    for i in range(images):
+        image_urls.append(f'https://g-mh.online/hp/12345/{i + 1}_abc.webp')
+        if i % 10 == 0:
+            image_urls.append('https://g-mh.org/static/logo.png')
+    return {
+        'images': image_urls,
+        'chapters': [f'/manga/testmanga/32382-046010880-{i}' for i in range(chapters)],
+        'covers': [f'https://cncover.godamanga.online/cover/{i}.jpg' for i in range(covers)]
+    }
+
+
+def legacy(urls: dict) -> dict:
+    """改造前的实现：每个地址单独 urljoin、扫描域名特征、函数内导入 quote"""
+    images = []
+    for src in urls['images']:
+        if any(marker in src for marker in LEGACY_MARKERS) and 'cover' not in src and src not in images:
+            images.append(src)
+    chapters = []
+    for href in urls['chapters']:
+        link = urljoin(BASE_URL, href.strip())
+        chapters.append(link[len(MANGA_ROOT):] if link.startswith(MANGA_ROOT) else link)
+    covers = []
+    for cover in urls['covers']:
+        from urllib.parse import quote
+        if 'cncover.godamanga.online' in cover:
+            cover = f'https://pro-api.mgsearcher.com/_next/image?url={quote(cover, safe="")}&w=250&q=60'
+        covers.append(cover)
+    return {'images': images, 'chapters': chapters, 'covers': covers}
+
+
+def batched(canonicalizer: UrlCanonicalizer, urls: dict) -> dict:
+    """当前实现：预编译正则 + 域名表，按列表批量处理"""
+    return {
+        'images': canonicalizer.chapter_images(urls['images']),
+        'chapters': canonicalizer.display(urls['chapters'], 'chapter'),
+        'covers': canonicalizer.display(urls['covers'], 'cover')
+    }
+
+
+def measure(name, run, rounds: int) -> dict:
+    timings = []
+    result = None
+    for _ in range(rounds):
+        start_time = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - start_time) * 1000)
+    elapsed = statistics.median(timings)
+    logger.info(f"{name}: 图片 {len(result['images'])}, 章节 {len(result['chapters'])}, "
+                f"封面 {len(result['covers'])}, 耗时中位数 {elapsed:.3f}ms")
+    return {'elapsed': elapsed, 'result': result}
+
+
+def main(args):
+    urls = build_urls(args.images, args.chapters, args.covers)
+    canonicalizer = UrlCanonicalizer()
+    before = measure('逐个处理', lambda: legacy(urls), args.rounds)
+    after = measure('UrlCanonicalizer', lambda: batched(canonicalizer, urls), args.rounds)
+    if before['result'] != after['result']:
+        logger.error("两种实现的结果不一致")
+    logger.info(f"耗时: {before['elapsed']:.3f}ms -> {after['elapsed']:.3f}ms "
+                f"({before['elapsed'] / max(after['elapsed'], 1e-9):.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="地址规范化基准测试")
+    parser.add_argument('--images', type=int, default=200, help='章节图片数量')
+    parser.add_argument('--chapters', type=int, default=1000, help='章节链接数量')
+    parser.add_argument('--covers', type=int, default=120, help='封面数量')
+    parser.add_argument('--rounds', type=int, default=50, help='执行轮数')
+    main(parser.parse_args())
@@ -12,6 +12,26 @@ API_HOST = "0.0.0.0"
 API_PORT = 7056
 BASE_URL = 'https://g-mh.org/'
 
+# URL 规范化
+# hosts: 域名（或 域名/首段路径）-> 角色，按 域名/路径 > 域名 > 上级域名 的顺序查找
+#   site 站内页面，image 章节图片，cover 封面图片（展示时经 cover_proxy 压缩），image_proxy 已代理的图片
+URL_CANONICAL_CONFIG = {
+    'hosts': {
+        'g-mh.org': 'site',
+        'g-mh.online/hp': 'image',
+        'g-mh.xyz': 'image',
+        'baozimh.org': 'image',
+        'godamanga.online': 'image',
+        'cncover.godamanga.online': 'cover',
+        'mhcdn.xyz': 'image',
+        'mangafuna.xyz': 'image',
+        'pro-api.mgsearcher.com': 'image_proxy'
+    },
+    # 章节图片路径中出现这些关键词时视为非正文图片
+    'image_exclude_keywords': ['cover', 'avatar', 'logo', 'banner', 'icon'],
+    'cover_proxy': 'https://pro-api.mgsearcher.com/_next/image?url={url}&w=250&q=60'
+}
+
 # 浏览器配置
 BROWSER_CONFIG = {
     'headless': True,
@@ -78,6 +98,336 @@ BROWSER_CONTEXT_CONFIG = {
     }
 }
 
+# 浏览器身份池：每个身份对应一个独立的浏览器上下文
+# 同一身份的 UA、请求头、视口、语言、时区、cookies 和代理保持一致；
+# 未列出的上下文选项沿用 BROWSER_CONTEXT_CONFIG
+BROWSER_IDENTITIES = [
+    {
+        'name': 'mac-chrome-122',
+        'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+        'platform': 'MacIntel',
+        'headers': {
+            'sec-ch-ua': '"Chromium";v="122", "Not(A:Brand";v="24", "Google Chrome";v="122"',
+            'sec-ch-ua-mobile': '?0',
+            'sec-ch-ua-platform': '"macOS"'
+        },
+        'viewport': {'width': 1920, 'height': 1080},
+        'locale': 'zh-CN',
+        'timezone_id': 'Asia/Shanghai',
+        'proxy': None  # 例如 {'server': 'http://127.0.0.1:7890'}
+    },
+    {
+        'name': 'win-chrome-121',
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+        'platform': 'Win32',
+        'headers': {
+            'sec-ch-ua': '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
+            'sec-ch-ua-mobile': '?0',
+            'sec-ch-ua-platform': '"Windows"'
+        },
+        'viewport': {'width': 1536, 'height': 864},
+        'locale': 'zh-CN',
+        'timezone_id': 'Asia/Shanghai',
+        'proxy': None
+    },
+    {
+        'name': 'win-edge-122',
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36 Edg/122.0.0.0',
+        'platform': 'Win32',
+        'headers': {
+            'sec-ch-ua': '"Chromium";v="122", "Not(A:Brand";v="24", "Microsoft Edge";v="122"',
+            'sec-ch-ua-mobile': '?0',
+            'sec-ch-ua-platform': '"Windows"'
+        },
+        'viewport': {'width': 1920, 'height': 1080},
+        'locale': 'zh-TW',
+        'timezone_id': 'Asia/Taipei',
+        'proxy': None
+    }
+]
+
+# 身份健康度配置
+BROWSER_IDENTITY_CONFIG = {
+    'success_recovery': 0.2,  # 成功时向 1.0 恢复的比例
+    'challenge_penalty': 0.3,  # 遇到 Cloudflare 验证时健康度乘以该系数
+    'failure_penalty': 0.8,  # 其他失败时健康度乘以该系数
+    'min_health': 0.2,  # 低于该值时身份进入冷却，并丢弃其 cookies
+    'cooldown': 300,  # 冷却时间（秒）
+    'reset_health': 0.5,  # 冷却结束后的健康度
+    'storage_dir': os.path.join(DATA_DIR, 'identities')  # 各身份 cookies（storage state）保存目录
+}
+
+# 页面就绪条件配置（按页面类型）
+# selector: 目标内容选择器，出现 min_count 个即视为内容已到达
+# stable_selector: 可选，要求该选择器匹配数量连续 stable_rounds 次轮询不变
+# timeout: 就绪等待超时（毫秒），超时后按当前内容继续处理
+PAGE_READINESS_CONFIG = {
+    'home': {
+        'selector': 'a.slicarda',
+        'min_count': 1,
+        'stable_selector': 'a.slicarda',
+        'stable_rounds': 2,
+        'timeout': 8000
+    },
+    'search': {
+        'selector': 'div.cardlist > div.pb-2',
+        'min_count': 1,
+        'stable_selector': 'div.cardlist > div.pb-2',
+        'stable_rounds': 2,
+        'timeout': 8000
+    },
+    'manga': {
+        'selector': 'main h1',
+        'min_count': 1,
+        'stable_selector': None,
+        'stable_rounds': 0,
+        'timeout': 8000
+    },
+    'chapter_list': {
+        'selector': '[class*="chapter"] a, a[href*="chapter"]',
+        'min_count': 1,
+        'stable_selector': '[class*="chapter"] a, a[href*="chapter"]',
+        'stable_rounds': 3,
+        'timeout': 10000
+    },
+    'chapter': {
+        'selector': 'div.imglist img, div.chapter-img img, div.rd-article img, div.chapter-content img',
+        'min_count': 1,
+        'stable_selector': 'img',
+        'stable_rounds': 3,
+        'timeout': 10000
+    }
+}
+
+# 就绪条件轮询间隔（毫秒）
+PAGE_READINESS_POLL_INTERVAL = 150
+
+# 页面池预热
+# 归还的页面停留在站点源上（保留已建立的连接、已加载的脚本和验证状态），不再重置为 about:blank；
+# 复用时同源地址优先使用站点前端路由做客户端导航，失败时回退到 page.goto
+WARM_PAGE_CONFIG = {
+    'enabled': True,
+    'origin_hosts': ['g-mh.org'],
+    'client_navigation': True,
+    'client_navigation_timeout': 10000  # 客户端导航等待地址变化的超时（毫秒）
+}
+
+# 导航耗时直方图的桶上限（毫秒），按页面类型和导航方式（cold/warm/client）统计
+NAVIGATION_HISTOGRAM_BUCKETS = [100, 250, 500, 1000, 2000, 4000, 8000, 15000, 30000]
+
+# 选择器自适应排序
+# 每组备选选择器记录命中次数，最近命中的选择器移到最前；每隔 revalidate_every 次按声明顺序完整尝试一次，
+# 让排在前面的首选选择器在页面恢复后重新生效
+SELECTOR_ORDER_CONFIG = {
+    'adaptive': True,
+    'revalidate_every': 50
+}
+
+# 定向 DOM 快照（按页面类型）
+# 只序列化解析需要的子树，代替 page.content() 序列化整个文档；
+# 匹配元素按文档顺序拼接到 <body> 下，已被选中元素的后代不再重复输出
+# 首页和漫画页的主选择器是 /html/body/main/... 形式的直接路径，需要完整保留 main 才能匹配，
+# 也保证布局指纹取到的是真实的页面骨架
+DOM_SNAPSHOT_CONFIG = {
+    'home': [
+        'main',
+        'a.slicarda',
+        'div[class*="hot-updates"]',
+        'div[class*="hot-section"]',
+        'div[class*="rank-section"]',
+        'div[class*="popular-section"]',
+        'div[class*="new-manga"]',
+        'div[class*="new-section"]'
+    ],
+    'manga': [
+        'main',
+        'div[class*="chapter-list"]',
+        'div[class*="manga-chapters"]'
+    ],
+    'chapter': [
+        'div.imglist',
+        'div[class*="chapter-img"]',
+        'div[class*="rd-article"]',
+        'div[class*="chapter-content"]',
+        'div[class*="manga-page"]',
+        'div[class*="manga-image"]',
+        'div[class*="comic-page"]',
+        'img[class*="chapter-img"]',
+        'img[class*="manga-image"]',
+        'img[class*="comic-image"]',
+        'a'
+    ]
+}
+
+# 禁用 JavaScript 的轻量渲染模式
+# 目标内容已在服务端 HTML 中的页面类型先用禁用 JavaScript 的上下文加载，
+# 内容不完整（如遇到需要脚本的验证页）时回退到启用 JavaScript 的上下文；
+# 连续失败 max_failures 次后该页面类型停用轻量模式 cooldown 秒，之后重新尝试
+STATIC_RENDER_CONFIG = {
+    'enabled': True,
+    # 章节列表由前端脚本分批加载，不使用轻量模式
+    'page_types': ['home', 'search', 'manga', 'chapter'],
+    'max_failures': 3,
+    'cooldown': 600
+}
+
+# 资源拦截策略（在 BrowserContext 级别统一生效）
+RESOURCE_BLOCKING_CONFIG = {
+    'enabled': True,
+    # 按资源类型拦截
+    'blocked_resource_types': ['image', 'font', 'media', 'stylesheet'],
+    # 统计/广告域名（匹配域名本身及其子域名）
+    'blocked_hosts': [
+        'google-analytics.com',
+        'googletagmanager.com',
+        'doubleclick.net',
+        'googlesyndication.com',
+        'adservice.google.com',
+        'hm.baidu.com',
+        'cnzz.com',
+        'umeng.com',
+        'clarity.ms',
+        'histats.com',
+        'statcounter.com'
+    ],
+    # 第三方脚本白名单，不在名单内的脚本一律拦截
+    'script_allowlist_hosts': [
+        'g-mh.org',
+        'g-mh.online',
+        'challenges.cloudflare.com',
+        'cdnjs.cloudflare.com'
+    ],
+    # 尚未观测到同类响应大小时，用于估算节省流量的默认大小（字节）
+    'estimated_sizes': {
+        'image': 80000,
+        'font': 40000,
+        'media': 500000,
+        'stylesheet': 20000,
+        'script': 50000,
+        'other': 5000
+    }
+}
+
+# 浏览器静态资源缓存（路由级本地资源库）
+# Playwright 开启请求拦截后浏览器 HTTP 缓存不再生效，站点的 JS 包改由本地磁盘缓存提供，
+# 跨上下文、跨浏览器重启以及各工作进程共享
+ASSET_CACHE_CONFIG = {
+    'enabled': True,
+    'directory': os.path.join(DATA_DIR, 'browser_asset_cache'),
+    # 样式表和字体已由 RESOURCE_BLOCKING_CONFIG 拦截，不会到达缓存
+    'resource_types': ['script'],
+    # 只缓存这些域名（及其子域名）下的静态资源
+    'hosts': [
+        'g-mh.org',
+        'g-mh.online',
+        'cdnjs.cloudflare.com'
+    ],
+    'max_age': 7 * 24 * 3600,  # 缓存有效期（秒）
+    'max_size_mb': 200  # 磁盘占用上限，超过后按最近使用时间淘汰
+}
+
+# 浏览器监控配置
+BROWSER_SUPERVISOR_CONFIG = {
+    'check_interval': 30,  # 巡检间隔（秒）
+    'max_context_navigations': 200,  # 单个上下文最多导航次数，超过后回收
+    'max_context_age': 1800,  # 单个上下文最长存活时间（秒）
+    'memory_ceiling_mb': 1024,  # 浏览器进程树 RSS 上限（MB），超过后回收上下文
+    'restart_on_disconnect': True  # 浏览器断开（崩溃）后自动重启
+}
+
+# 浏览器工作进程池配置
+# 启用后 Playwright 相关任务在独立进程中执行，API 进程只负责分发任务
+BROWSER_WORKER_CONFIG = {
+    'enabled': True,
+    'workers': 2,  # 工作进程数
+    'concurrency': 4,  # 每个工作进程同时执行的任务数
+    'job_timeout': 120,  # 单个任务超时（秒）
+    'max_attempts': 2,  # 工作进程异常退出时任务最多执行次数
+    'monitor_interval': 1.0  # 工作进程存活检查间隔（秒）
+}
+
+# 页面布局漂移检测
+# 每次解析时计算页面骨架指纹（main 下两层元素的标签序列）。某页面类型的必需字段连续
+# drift_threshold 次为空且指纹不是已知正常布局时，标记为降级：该页面类型不再每次请求都
+# 回退到 Playwright，只每隔 probe_interval 秒放行一次探测，提取恢复完整后自动解除
+LAYOUT_DRIFT_CONFIG = {
+    'enabled': True,
+    'drift_threshold': 3,
+    'probe_interval': 300,
+    'known_fingerprints': 8,  # 每种页面类型记住的正常布局指纹数量
+    'required_fields': {
+        'home': ['hot_updates', 'popular_manga', 'new_manga'],
+        'manga': ['title', 'chapters'],
+        'chapter_list': ['chapters'],
+        'chapter': ['images']
+    }
+}
+
+# 首页栏目缓存
+# 首页各栏目分别提取和缓存：最新更新几分钟就会变化，排行榜每天才更新一次。
+# 请求首页时只重新提取已过期的栏目，/api/manga/home/{section} 只返回单个栏目
+HOME_SECTION_CONFIG = {
+    'cache_key': 'home_section_{section}',
+    # 各栏目的缓存时间（秒），键的顺序即首页栏目顺序
+    'ttl': {
+        'updates': 300,
+        'hot_updates': 1800,
+        'popular_manga': 86400,
+        'new_manga': 3600
+    }
+}
+
+# HTML 解析后端
+# 可选 lxml（libxml2，默认）和 html5-parser（gumbo，按 HTML5 规范建树，需要 pip install html5-parser），
+# 两者都生成 lxml 文档树，选择器注册表不受影响；选择的后端未安装或不可用时回退到 fallback。
+# 默认值由 benchmarks/bench_html_parse.py 在录制的页面上对比得出
+HTML_PARSER_CONFIG = {
+    'backend': 'lxml',
+    'fallback': 'lxml'
+}
+
+# 大文档解析进程池
+# 超过 offload_threshold_kb 的页面在独立进程中解析和提取，避免阻塞 API 事件循环
+PARSE_POOL_CONFIG = {
+    'enabled': True,
+    'workers': 2,
+    'offload_threshold_kb': 256
+}
+
+# 流式章节列表
+# 章节列表响应按 read_chunk_kb 分块下载并增量解析，章节边解析边返回，
+# 每累计 db_batch_size 个章节批量写入一次数据库
+CHAPTER_STREAM_CONFIG = {
+    'read_chunk_kb': 64,
+    'queue_chunks': 8,  # 下载线程最多领先解析的块数
+    'db_batch_size': 500
+}
+
+# 慢导航 trace 采样（默认关闭）
+# 开启后浏览器上下文持续记录网络和时序（不截图），导航加就绪等待超过 slow_threshold_ms 时
+# 保存对应的 trace 分段，可用 `playwright show-trace` 查看，通过 /api/admin/traces 列出和下载
+TRACE_CONFIG = {
+    'enabled': False,
+    'slow_threshold_ms': 10000,
+    'max_chunk_seconds': 120,  # 单个 trace 分段最长时间，超过后新的导航不再加入
+    'directory': os.path.join(DATA_DIR, 'traces'),
+    'max_files': 50,
+    'max_total_mb': 500
+}
+
+# 调试快照采集（默认关闭）
+# 开启后按 sample_rate 采样，或在提取失败时（on_failure）保存页面 HTML、截图和提取结果；
+# 文件在后台线程中写入，目录按文件数和总大小轮转
+DEBUG_CAPTURE_CONFIG = {
+    'enabled': False,
+    'sample_rate': 0.01,
+    'on_failure': True,
+    'directory': os.path.join(DATA_DIR, 'debug'),
+    'max_files': 200,
+    'max_total_mb': 100,
+    'max_file_mb': 5  # 单个文件超过该大小时截断
+}
+
 # 默认请求头
 DEFAULT_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
@@ -1,40 +1,47 @@
 import logging
-from urllib.parse import urljoin
-from config.settings import BASE_URL
+from utils.page_readiness import wait_for_page_ready
+from utils.url_canonicalizer import url_canonicalizer
 
 logger = logging.getLogger(__name__)
 
+# 单次往返获取章节页面数据：标题、所有 <img> 的 [src, alt, class] 以及所有 <a> 的 [text, href]
+_PAGE_SNAPSHOT_SCRIPT = """() => ({
+    title: document.title,
+    images: Array.from(document.images, img => [
+        img.getAttribute('src') || '',
+        img.getAttribute('alt') || '',
+        img.getAttribute('class') || ''
+    ]),
+    links: Array.from(document.querySelectorAll('a'), a => [a.innerText, a.getAttribute('href')])
+})"""
+
 class ChapterExtractor:
     @staticmethod
     async def extract_chapter_data(page):
         """提取章节页面的数据"""
         try:
-            # 等待页面加载完成
+            # 等待章节图片就绪（目标内容出现即说明Cloudflare验证已通过）
             logger.info('等待页面加载完成...')
-            await page.wait_for_load_state('networkidle', timeout=60000)
-            logger.info('页面加载完成')
+            if await wait_for_page_ready(page, 'chapter'):
+                logger.info('页面加载完成')
+            else:
+                logger.warning('章节内容未在超时前就绪，按当前页面内容提取')
 
-            # 等待Cloudflare验证完成
-            logger.info('等待Cloudflare验证...')
-            try:
-                await page.wait_for_selector('#challenge-running', state='hidden', timeout=60000)
-                await page.wait_for_selector('#challenge-form', state='hidden', timeout=60000)
-                logger.info('Cloudflare验证完成')
-            except Exception as e:
-                logger.warning(f'等待Cloudflare验证时出错: {str(e)}')
+            # 一次 evaluate 取回标题、图片和链接，过滤排序在 Python 中完成
+            snapshot = await ChapterExtractor._snapshot_page(page)
 
             # 提取页面标题
             logger.info('提取页面标题...')
-            page_title = await page.title()
+            page_title = snapshot.get('title', '')
             manga_title = page_title.split('-')[0].strip()
             chapter_title = page_title.split('-')[1].strip()
             logger.info(f'提取到标题: {manga_title} - {chapter_title}')
 
             # 提取图片
-            chapter_images = await ChapterExtractor._extract_chapter_images(page)
+            chapter_images = ChapterExtractor._extract_chapter_images(snapshot.get('images', []))
             
             # 提取导航链接
-            nav_links = await ChapterExtractor._extract_navigation_links(page)
+            nav_links = ChapterExtractor._extract_navigation_links(snapshot.get('links', []))
             
             # 合并结果
             result = {
@@ -51,30 +58,28 @@ class ChapterExtractor:
         except Exception as e:
             logger.error(f"提取章节数据时出错: {str(e)}")
             raise
+
+    @staticmethod
+    async def _snapshot_page(page):
+        """通过单次 evaluate 获取章节页面所需的全部 DOM 数据"""
+        try:
+            snapshot = await page.evaluate(_PAGE_SNAPSHOT_SCRIPT)
+            logger.info(f"页面快照: {len(snapshot['images'])} 个图片元素, {len(snapshot['links'])} 个链接")
+            return snapshot
+        except Exception as e:
+            logger.error(f"获取页面快照时出错: {str(e)}")
+            return {'title': await page.title(), 'images': [], 'links': []}
             
     @staticmethod
-    async def _extract_chapter_images(page):
-        """提取章节图片"""
+    def _extract_chapter_images(image_records):
+        """从快照的 [src, alt, class] 记录中提取章节图片"""
         try:
             logger.info('开始提取图片...')
-            image_elements = await page.query_selector_all('img')
-            logger.info(f'找到 {len(image_elements)} 个图片元素')
-            
-            chapter_images = set()  # 使用集合去重
-            
-            for img in image_elements:
-                src = await img.get_attribute('src') or ''
-                alt = await img.get_attribute('alt') or ''
-                class_name = await img.get_attribute('class') or ''
-                logger.info(f'检查图片: src={src}, alt={alt}, class={class_name}')
-                
-                # 检查图片是否为章节内容图片
-                if ('g-mh.online/hp/' in src or 'baozimh.org' in src) and not ('cover' in src):
-                    logger.info(f'找到章节图片: {src}')
-                    chapter_images.add(src)
+            # 按域名表批量过滤章节内容图片并去重
+            chapter_images = url_canonicalizer.chapter_images(src for src, _, _ in image_records)
                     
             # 按照图片序号排序
-            sorted_images = sorted(list(chapter_images), key=ChapterExtractor._get_image_number)
+            sorted_images = sorted(chapter_images, key=ChapterExtractor._get_image_number)
             logger.info(f'图片排序完成,共 {len(sorted_images)} 张')
             
             return sorted_images
@@ -84,16 +89,12 @@ class ChapterExtractor:
             return []
             
     @staticmethod
-    async def _extract_navigation_links(page):
-        """提取上一章和下一章的链接"""
+    def _extract_navigation_links(link_records):
+        """从快照的 [text, href] 记录中提取上一章和下一章的链接"""
         nav_links = {'prev': None, 'next': None}
         try:
             logger.info('提取导航链接...')
-            links = await page.query_selector_all('a')
-            
-            for link in links:
-                text = await link.inner_text()
-                href = await link.get_attribute('href')
+            for text, href in link_records:
                 if text and href:
                     if '上一' in text:
                         nav_links['prev'] = href
@@ -102,6 +103,9 @@ class ChapterExtractor:
                         nav_links['next'] = href
                         logger.info(f'找到下一章链接: {href}')
                         
+            # 导航链接统一为去掉域名的站内路径
+            paths = url_canonicalizer.display([nav_links['prev'], nav_links['next']], 'page')
+            nav_links['prev'], nav_links['next'] = (path or None for path in paths)
             return nav_links
             
         except Exception as e:
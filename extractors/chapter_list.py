@@ -0,0 +1,56 @@
+import re
+from typing import Dict, Iterable, List
+from models.records import ChapterRef
+
+# 章节链接末尾的序号，例如 '/manga/yishijieluyingliaoyushenghuo/32382-046010880-12' -> 12
+_CHAPTER_NUMBER = re.compile(r'-(\d+)$')
+
+
+def chapter_number(link: str) -> int:
+    """从章节链接中提取章节序号，没有序号时返回 0"""
+    match = _CHAPTER_NUMBER.search(link or '')
+    return int(match.group(1)) if match else 0
+
+
+class ChapterListBuilder:
+    """章节列表构建器
+
+    按链接哈希去重（先加入的来源优先），构建时按章节序号稳定排序：
+    序号相同或没有序号的章节保持加入顺序。整体为 O(n log n)，不再逐个 any() 比较。
+    """
+    def __init__(self):
+        self._chapters: Dict[str, ChapterRef] = {}
+
+    def add(self, chapter: ChapterRef) -> bool:
+        """加入一个章节，链接已存在时忽略并返回 False"""
+        link = chapter.link
+        if not link or link in self._chapters:
+            return False
+        self._chapters[link] = chapter
+        return True
+
+    def extend(self, chapters: Iterable[ChapterRef]) -> int:
+        """加入一批章节，返回实际新增的数量"""
+        added = 0
+        for chapter in chapters:
+            if self.add(chapter):
+                added += 1
+        return added
+
+    def build(self) -> List[ChapterRef]:
+        """按章节序号排序后的章节列表，order 更新为排序后的位置（从 1 开始）"""
+        chapters = sorted(self._chapters.values(), key=lambda chapter: chapter_number(chapter.link))
+        for order, chapter in enumerate(chapters, 1):
+            chapter.order = order
+        return chapters
+
+    def __len__(self) -> int:
+        return len(self._chapters)
+
+
+def build_chapter_list(*sources: Iterable[ChapterRef]) -> List[ChapterRef]:
+    """合并多个来源的章节，按链接去重（靠前的来源优先）并按章节序号排序"""
+    builder = ChapterListBuilder()
+    for chapters in sources:
+        builder.extend(chapters)
+    return builder.build()
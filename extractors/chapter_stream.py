@@ -0,0 +1,156 @@
+import logging
+from typing import Iterable, Iterator, List, Optional
+from lxml import etree
+from utils.html_parser import detect_encoding
+from extractors.selector_registry import SELECTOR_REGISTRY
+from models.records import ChapterRef
+
+logger = logging.getLogger(__name__)
+
+# 选择器每次在整个已解析的文档上求值，找到第一批章节后按已解析字节数的比例间隔求值，
+# 总开销与文档大小成线性关系，不随分块变小而增加
+_MIN_COLLECT_BYTES = 64 * 1024
+_COLLECT_RATIO = 0.25
+
+
+class ChapterStreamParser:
+    """增量章节列表解析器
+
+    按块喂入响应字节，每块解析完成后立即返回其中新出现的章节，不等待整个文档下载完成。
+    章节使用选择器注册表中 chapter_list 的列表项选择器和字段，规则与整页提取一致：
+    按声明顺序使用第一个有匹配的选择器。文档只在末尾增长，同一选择器的匹配结果在块之间只会追加，
+    每次只提取新增的列表项，尚未结束的链接留到下一次处理；找到第一批章节后按已解析字节数的比例间隔求值。
+
+    已返回的全部章节保存在 chapters 中。文档结束时如果声明顺序更靠前的选择器也有结果
+    （它的列表出现在文档后部），chapters 改为该选择器的提取结果，与整页提取保持一致。
+    """
+    def __init__(self, content_type: Optional[str] = None):
+        self.content_type = content_type
+        self.items = SELECTOR_REGISTRY['chapter_list'].parts['chapters']
+        self.chapters: List[ChapterRef] = []
+        self.reselected = False
+        self._parser: Optional[etree.HTMLPullParser] = None
+        self._root = None
+        self._open_link = None
+        self._selector: Optional[int] = None
+        self._consumed = 0
+        self._seen = set()
+        self._collected_bytes = 0
+        self.bytes = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.chapters)
+
+    def _ensure_parser(self, chunk: bytes):
+        if self._parser is None:
+            # 编码只能在创建解析器时确定，按第一块内容检测（BOM/Content-Type/<meta charset>）
+            encoding = detect_encoding(chunk, self.content_type)
+            self._parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+
+    def _records(self, nodes) -> List[ChapterRef]:
+        """按注册表的字段和必需字段提取章节，按链接去重"""
+        chapters = []
+        for node in nodes:
+            record = self.items.extract_item(node)
+            if not all(record.get(name) for name in self.items.required):
+                continue
+            if record['link'] in self._seen:
+                continue
+            self._seen.add(record['link'])
+            chapters.append(self.items.record(**record))
+        return chapters
+
+    def _collect(self, final: bool = False) -> List[ChapterRef]:
+        if self._root is None:
+            return []
+        compiled = self.items.candidates.compiled
+        if self._selector is None:
+            for index in self.items.candidates.declared:
+                if compiled[index](self._root):
+                    self._selector = index
+                    break
+            else:
+                return []
+        nodes = compiled[self._selector](self._root)
+        if not final and nodes and nodes[-1] is self._open_link:
+            # 链接文本可能还在后续块中
+            nodes = nodes[:-1]
+        new_nodes = nodes[self._consumed:]
+        self._consumed += len(new_nodes)
+        chapters = self._records(new_nodes)
+        self.chapters.extend(chapters)
+        return chapters
+
+    def _due(self) -> bool:
+        if not self.chapters:
+            return True
+        step = max(_MIN_COLLECT_BYTES, int(self._collected_bytes * _COLLECT_RATIO))
+        return self.bytes - self._collected_bytes >= step
+
+    def _drain(self, final: bool = False) -> List[ChapterRef]:
+        for event, element in self._parser.read_events():
+            if self._root is None:
+                self._root = element.getroottree().getroot()
+            if element.tag == 'a':
+                if event == 'start':
+                    self._open_link = element
+                elif element is self._open_link:
+                    self._open_link = None
+        if not final and not self._due():
+            return []
+        self._collected_bytes = self.bytes
+        return self._collect(final)
+
+    def _reselect(self):
+        """文档结束后按声明顺序确认生效的选择器，更靠前的选择器有结果时改用它的结果"""
+        if self._selector is None:
+            return
+        compiled = self.items.candidates.compiled
+        for index in self.items.candidates.declared[:self._selector]:
+            nodes = compiled[index](self._root)
+            if not nodes:
+                continue
+            seen, self._seen = self._seen, set()
+            chapters = self._records(nodes)
+            if chapters:
+                logger.warning(f"章节列表改用选择器 '{self.items.candidates.expressions[index]}'，"
+                               f"流式返回的章节与最终结果不一致")
+                self.chapters = chapters
+                self.reselected = True
+                return
+            self._seen = seen
+
+    def feed(self, chunk: bytes) -> List[ChapterRef]:
+        """喂入一块响应字节，返回这一块中解析出的章节"""
+        if not chunk:
+            return []
+        self._ensure_parser(chunk)
+        self.bytes += len(chunk)
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> List[ChapterRef]:
+        """结束解析，返回文档末尾剩余的章节"""
+        if self._parser is None:
+            return []
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError as e:
+            logger.warning(f"章节列表文档不完整: {str(e)}")
+        chapters = self._drain(final=True)
+        self._reselect()
+        logger.info(f"流式解析章节列表完成: {self.count} 个章节, {self.bytes // 1024}KB")
+        return chapters
+
+
+def iter_chapters(chunks: Iterable[bytes], content_type: Optional[str] = None) -> Iterator[List[ChapterRef]]:
+    """按块解析章节列表，每块产出一批章节（可能为空的块不产出）"""
+    parser = ChapterStreamParser(content_type)
+    for chunk in chunks:
+        chapters = parser.feed(chunk)
+        if chapters:
+            yield chapters
+    chapters = parser.close()
+    if chapters:
+        yield chapters
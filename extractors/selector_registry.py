@@ -0,0 +1,484 @@
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from lxml import etree
+from config.settings import SELECTOR_ORDER_CONFIG
+from utils.url_canonicalizer import url_canonicalizer
+from models.records import ChapterRef, MangaCard, UpdateRecord
+
+logger = logging.getLogger(__name__)
+
+# 章节图片可能存放地址的属性（懒加载）
+_IMAGE_ATTRS = ('src', 'data-src', 'data-original', 'data-url', 'data-image', 'data-lazyload', 'data-lazy')
+
+
+# ---- 取值转换 ----
+
+def _strip(value) -> str:
+    return str(value).strip()
+
+
+def _node_text(element) -> str:
+    """元素下所有文本拼接，等价于 ''.join(element.xpath('.//text()')).strip()"""
+    return ''.join(element.itertext()).strip()
+
+
+def _absolute(value) -> str:
+    """站内相对地址补全为完整地址"""
+    return url_canonicalizer.canonicalize(str(value)).canonical
+
+
+def _image_src(element) -> str:
+    """图片元素的第一个非空地址属性"""
+    for attr in _IMAGE_ATTRS:
+        src = element.get(attr)
+        if src:
+            return src
+    return ''
+
+
+def _image_url(element) -> str:
+    return url_canonicalizer.canonicalize(_image_src(element), 'image').canonical
+
+
+def _chapter_link(value) -> str:
+    """章节链接统一为 /manga/ 之后的相对路径"""
+    return url_canonicalizer.canonicalize(str(value), 'chapter').display
+
+
+def _site_path(value) -> str:
+    """站内地址去掉域名部分"""
+    return url_canonicalizer.canonicalize(str(value), 'page').display
+
+
+def _link_entry(element):
+    name = _node_text(element)
+    if not name:
+        return None
+    href = element.get('href')
+    return name, _absolute(href) if href else ''
+
+
+def _names_and_links(entries: List[tuple]) -> dict:
+    return {
+        'names': [name for name, _ in entries],
+        'links': [link for _, link in entries if link]
+    }
+
+
+def _chapter_images(values: List[str]) -> List[str]:
+    """一次规范化全部章节图片地址并去重"""
+    return url_canonicalizer.chapter_images(values)
+
+
+# ---- 字段模式 ----
+
+class Candidates:
+    """一组按顺序尝试的备选 XPath
+
+    预编译全部表达式并记录每个表达式的命中次数。自适应排序开启时，命中的表达式移到最前，
+    下次优先尝试；每隔 revalidate_every 次按声明顺序完整尝试一次。
+    """
+    def __init__(self, expressions: Sequence[str], config: Optional[dict] = None):
+        config = config or SELECTOR_ORDER_CONFIG
+        self.adaptive = config.get('adaptive', True)
+        self.revalidate_every = config.get('revalidate_every', 50)
+        self.expressions = tuple(expressions)
+        self.compiled = tuple(etree.XPath(expression) for expression in self.expressions)
+        self.declared = tuple(range(len(self.expressions)))
+        self.order = list(self.declared)
+        self.hits = [0] * len(self.expressions)
+        self.lookups = 0
+        self.evaluations = 0
+        self.wasted = 0
+        self.misses = 0
+
+    def ordered(self) -> Sequence[int]:
+        """本次查找的尝试顺序（表达式下标）"""
+        self.lookups += 1
+        if not self.adaptive or (self.revalidate_every and self.lookups % self.revalidate_every == 0):
+            return self.declared
+        return tuple(self.order)
+
+    def record(self, index: Optional[int], evaluated: int):
+        """记录一次查找的结果：命中的表达式下标（未命中为 None）和实际求值次数"""
+        self.evaluations += evaluated
+        if index is None:
+            self.misses += 1
+            self.wasted += evaluated
+            return
+        self.wasted += evaluated - 1
+        self.hits[index] += 1
+        if self.adaptive and self.order[0] != index:
+            self.order.remove(index)
+            self.order.insert(0, index)
+
+    def get_stats(self) -> dict:
+        return {
+            'lookups': self.lookups,
+            'evaluations': self.evaluations,
+            'wasted': self.wasted,
+            'misses': self.misses,
+            'order': [self.expressions[index] for index in self.order],
+            'hits': {self.expressions[index]: self.hits[index] for index in self.declared if self.hits[index]}
+        }
+
+
+class Field:
+    """单个字段：按顺序尝试预编译的备选 XPath，使用第一个得到有效值的表达式
+
+    Args:
+        name: 结果中的字段名
+        xpaths: 备选 XPath（相对于文档或列表项）
+        convert: 对每个 XPath 结果的转换函数，默认取去除空白的字符串
+        accept: 转换后的值是否有效，默认非空
+        many: 返回所有有效值而不是第一个
+        reduce: many 为真时对值列表的汇总函数
+        default: 没有有效值时的返回值（可调用对象时每次调用生成）
+    """
+    def __init__(self, name: str, *xpaths: str, convert: Callable = _strip, accept: Callable = bool,
+                 many: bool = False, reduce: Optional[Callable] = None, default: Any = None):
+        self.name = name
+        self.candidates = Candidates(xpaths)
+        self.convert = convert
+        self.accept = accept
+        self.many = many
+        self.reduce = reduce
+        self.default = default
+
+    def extract(self, node):
+        candidates = self.candidates
+        evaluated = 0
+        for index in candidates.ordered():
+            evaluated += 1
+            values = [value for value in map(self.convert, candidates.compiled[index](node)) if self.accept(value)]
+            if values:
+                candidates.record(index, evaluated)
+                if not self.many:
+                    return values[0]
+                return self.reduce(values) if self.reduce else values
+        candidates.record(None, evaluated)
+        return self.default() if callable(self.default) else self.default
+
+    def get_stats(self) -> dict:
+        return {self.name: self.candidates.get_stats()}
+
+
+class ItemList:
+    """重复出现的列表项：按顺序尝试备选的列表项 XPath，第一个得到有效记录的表达式生效
+
+    Args:
+        name: 结果中的字段名
+        items: 备选的列表项 XPath
+        fields: 每个列表项内的字段
+        required: 记录必须包含的字段
+        rank: 为记录加上在列表中的名次（从 1 开始）
+        unique: 按该字段去重，保留先出现的记录
+        record: 记录类型（models.records），字段名与记录属性一致；默认为 dict
+    """
+    def __init__(self, name: str, items: Sequence[str], fields: Sequence[Field],
+                 required: Iterable[str] = ('title', 'link'), rank: bool = False, unique: Optional[str] = None,
+                 record: Optional[Callable] = None):
+        self.name = name
+        self.candidates = Candidates(items)
+        self.fields = tuple(fields)
+        self.required = tuple(required)
+        self.rank = rank
+        self.unique = unique
+        self.record = record
+
+    def extract_item(self, node) -> dict:
+        record = {}
+        for field in self.fields:
+            value = field.extract(node)
+            if value is not None:
+                record[field.name] = value
+        return record
+
+    def extract(self, tree) -> list:
+        candidates = self.candidates
+        evaluated = 0
+        for index in candidates.ordered():
+            evaluated += 1
+            nodes = candidates.compiled[index](tree)
+            if not nodes:
+                continue
+            records = []
+            seen = set()
+            for position, node in enumerate(nodes, 1):
+                record = self.extract_item(node)
+                if not all(record.get(name) for name in self.required):
+                    continue
+                if self.unique:
+                    key = record[self.unique]
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                if self.rank:
+                    record['rank'] = position
+                records.append(self.record(**record) if self.record else record)
+            if records:
+                candidates.record(index, evaluated)
+                logger.debug(f"{self.name}: 使用选择器 '{candidates.expressions[index]}' 提取到 {len(records)} 项")
+                return records
+        candidates.record(None, evaluated)
+        return []
+
+    def get_stats(self) -> dict:
+        stats = {self.name: self.candidates.get_stats()}
+        for field in self.fields:
+            for name, field_stats in field.get_stats().items():
+                stats[f'{self.name}.{name}'] = field_stats
+        return stats
+
+
+class PageSchema:
+    """一种页面类型的全部字段，一次调用提取整个页面"""
+    def __init__(self, page_type: str, *parts):
+        self.page_type = page_type
+        self.parts: Dict[str, Any] = {part.name: part for part in parts}
+
+    @property
+    def field_names(self) -> List[str]:
+        return list(self.parts)
+
+    def extract(self, tree, names: Optional[Iterable[str]] = None) -> dict:
+        """提取页面字段；names 指定时只对这些字段求值，没有有效值的单值字段不出现在结果中"""
+        parts = self.parts.values() if names is None else [self.parts[name] for name in names]
+        result = {}
+        for part in parts:
+            try:
+                value = part.extract(tree)
+            except Exception as e:
+                logger.error(f"提取 {self.page_type}.{part.name} 时出错: {str(e)}")
+                value = [] if isinstance(part, ItemList) else None
+            if value is not None:
+                result[part.name] = value
+        return result
+
+    def get_stats(self) -> dict:
+        stats = {}
+        for part in self.parts.values():
+            stats.update(part.get_stats())
+        return stats
+
+
+# ---- 各页面类型的字段定义 ----
+
+def _home_card_fields() -> List[Field]:
+    """热门更新、人气排行、最新上架共用的卡片字段"""
+    return [
+        Field('link', './/a/@href', convert=_absolute),
+        Field('title', './/h3/text()'),
+        Field('cover', './/img', convert=_image_url)
+    ]
+
+
+_HOME = PageSchema(
+    'home',
+    ItemList('updates', [
+        '//a[@class="slicarda"]',
+        '/html/body/main/div/div[4]/div/div[1]/a',
+        '/html/body/main/div/div[4]/div/div[2]/a'
+    ], [
+        Field('link', './@href', convert=_absolute),
+        Field('title', './/h3[@class="slicardtitle"]/text()'),
+        Field('time', './/p[@class="slicardtagp"]/text()'),
+        Field('chapter', './/p[@class="slicardtitlep"]/text()'),
+        Field('cover', './/img[@class="slicardimg"]', convert=_image_url)
+    ], record=UpdateRecord),
+    ItemList('hot_updates', [
+        '/html/body/main/div/div[6]/div[1]/div[2]/div',
+        '//div[contains(@class, "hot-updates")]//div[contains(@class, "manga-item")]',
+        '//div[contains(@class, "hot-section")]//a'
+    ], _home_card_fields(), record=MangaCard),
+    ItemList('popular_manga', [
+        '/html/body/main/div/div[6]/div[2]/div[2]/div',
+        '//div[contains(@class, "rank-section")]//div[contains(@class, "manga-item")]',
+        '//div[contains(@class, "popular-section")]//a'
+    ], _home_card_fields(), rank=True, record=MangaCard),
+    ItemList('new_manga', [
+        '/html/body/main/div/div[6]/div[3]/div[2]/div',
+        '//div[contains(@class, "new-manga")]//div[contains(@class, "manga-item")]',
+        '//div[contains(@class, "new-section")]//a'
+    ], _home_card_fields(), record=MangaCard)
+)
+
+_SEARCH = PageSchema(
+    'search',
+    ItemList('manga_list', [
+        '//div[contains(@class, "cardlist")]/div[contains(@class, "pb-2")]'
+    ], [
+        Field('title', './/h3[contains(@class, "cardtitle")]/text()'),
+        Field('link', './/a/@href', convert=_absolute),
+        Field('cover', './/img/@src', convert=_absolute)
+    ], record=MangaCard),
+    ItemList('page_links', [
+        '//div[contains(@class, "flex justify-between items-center")]//a'
+    ], [
+        Field('text', '.', convert=_node_text),
+        Field('link', './@href', convert=_absolute)
+    ], required=('text', 'link'))
+)
+
+def _chapter_fields() -> List[Field]:
+    """漫画页面和章节列表页的章节链接字段（各自独立统计命中）"""
+    return [
+        Field('title', '.', convert=_node_text),
+        Field('link', './@href', convert=_chapter_link)
+    ]
+
+_MANGA_CHAPTER_ITEMS = [
+    '//div[contains(@class, "chapter-list")]//a',
+    '//div[contains(@class, "chapters")]//a',
+    '/html/body/main/div/div[3]/div[3]//a',
+    '/html/body/main/div/div[3]/div[3]/div[1]//a',
+    '//div[contains(@class, "manga-chapters")]//a',
+    '//div[contains(@class, "chapter-items")]//a',
+    '//main//div[contains(@class, "chapter")]//a'
+]
+
+_MANGA = PageSchema(
+    'manga',
+    Field('cover',
+          '/html/body/main/div[2]/div[2]/div[1]/div/div[1]/div[1]/div/div/img',
+          '//div[contains(@class, "manga-cover")]//img | //div[contains(@class, "cover")]//img',
+          convert=_image_url),
+    Field('title',
+          '/html/body/main/div[2]/div[2]/div[2]/div[1]/div[1]/div[1]/h1/text()',
+          '//h1',
+          convert=lambda value: _node_text(value) if isinstance(value, etree._Element) else _strip(value)),
+    Field('status',
+          '/html/body/main/div[2]/div[2]/div[2]/div[1]/div[1]/div[1]/h1/span/text()',
+          '//h1//span/text()',
+          '//div[contains(@class, "status")]//text()',
+          '//div[contains(@class, "info")]//div[contains(text(), "状态")]//following-sibling::div//text()'),
+    Field('author',
+          '/html/body/main/div[2]/div[2]/div[2]/div[1]/div[1]/div[2]/a',
+          '//div[contains(text(), "作者：")]/following-sibling::div//a',
+          '//div[contains(text(), "作者:")]/following-sibling::div//a',
+          '//div[contains(text(), "作者")]/following-sibling::div//a',
+          '//div[contains(text(), "作家")]/following-sibling::div//a',
+          '//div[contains(@class, "author")]//a',
+          '//div[contains(@class, "manga-author")]//a',
+          '//div[contains(@class, "info")]//div[contains(text(), "作者")]/following-sibling::div//a',
+          convert=_link_entry, many=True, reduce=_names_and_links,
+          default=lambda: {'names': [], 'links': []}),
+    Field('type',
+          '/html/body/main/div[2]/div[2]/div[2]/div[1]/div[1]/div[3]/a',
+          '//div[contains(text(), "类型：")]/following-sibling::div//a',
+          '//div[contains(text(), "类型:")]/following-sibling::div//a',
+          '//div[contains(text(), "类型")]/following-sibling::div//a',
+          '//div[contains(@class, "flex")]//div[contains(text(), "类型")]//following-sibling::div//a',
+          '//div[contains(@class, "flex")]//div[contains(text(), "分类")]//following-sibling::div//a',
+          '//div[contains(@class, "info")]//div[contains(text(), "类型")]//following-sibling::div//a',
+          '//div[contains(@class, "info")]//div[contains(text(), "分类")]//following-sibling::div//a',
+          '//div[contains(@class, "genre")]//a',
+          '//div[contains(@class, "manga-genre")]//a',
+          convert=_link_entry, many=True, reduce=_names_and_links,
+          default=lambda: {'names': [], 'links': []}),
+    Field('description',
+          '/html/body/main/div[2]/div[2]/div[2]/div[1]/div[1]/p/text()',
+          '//div[contains(@class, "flex")]//p[string-length(text()) > 10]/text()',
+          '//div[contains(@class, "description")]//p[string-length(text()) > 10]/text()',
+          '//div[contains(@class, "summary")]//p[string-length(text()) > 10]/text()',
+          '//div[contains(@class, "manga-description")]//p[string-length(text()) > 10]/text()',
+          '//div[contains(@class, "info")]//div[contains(text(), "简介") or contains(text(), "描述")]//following-sibling::div//p/text()'),
+    ItemList('chapters', _MANGA_CHAPTER_ITEMS, _chapter_fields(), unique='link', record=ChapterRef)
+)
+
+_CHAPTER_LIST = PageSchema(
+    'chapter_list',
+    ItemList('chapters', _MANGA_CHAPTER_ITEMS + [
+        '//*[contains(@class, "chapter")]//a',
+        '//a[contains(@href, "chapter")]',
+        '//*[contains(text(), "第")]//ancestor::a'
+    ], _chapter_fields(), unique='link', record=ChapterRef)
+)
+
+
+def _nav_field(name: str, marker: str, classes: Sequence[str]) -> Field:
+    """上一章/下一章链接：先按专用类名，再按链接文字或 title"""
+    xpaths = [f'//a[@class="{classes[0]}"]/@href']
+    xpaths += [f'//a[contains(@class, "{class_name}")]/@href' for class_name in classes[1:]]
+    xpaths += [
+        f'//a[contains(@class, "chapter-nav")][contains(., "{marker}") or contains(@title, "{marker}")]/@href',
+        f'//a[contains(text(), "{marker}章")]/@href',
+        f'//a[contains(@title, "{marker}章")]/@href',
+        f'//a[contains(., "{marker}")]/@href'
+    ]
+    return Field(name, *xpaths, convert=_site_path)
+
+
+_CHAPTER = PageSchema(
+    'chapter',
+    Field('images',
+          '//div[@class="imglist"]//img',
+          '//div[contains(@class, "chapter-img")]//img',
+          '//div[contains(@class, "rd-article")]//img',
+          '//div[contains(@class, "chapter-content")]//img',
+          '//div[contains(@class, "manga-page")]//img',
+          '//div[contains(@class, "manga-image")]//img',
+          '//div[contains(@class, "comic-page")]//img',
+          '//img[contains(@class, "chapter-img")]',
+          '//img[contains(@class, "manga-image")]',
+          '//img[contains(@class, "comic-image")]',
+          convert=_image_src, accept=url_canonicalizer.is_chapter_image, many=True, reduce=_chapter_images,
+          default=list),
+    _nav_field('prev_chapter', '上一', ['prev', 'prev-chapter', 'rd-prev-chapter', 'pre-chapter']),
+    _nav_field('next_chapter', '下一', ['next', 'next-chapter', 'rd-next-chapter'])
+)
+
+# 页面类型 -> 字段定义，所有抓取方式（cloudscraper、Playwright）共用
+SELECTOR_REGISTRY: Dict[str, PageSchema] = {
+    schema.page_type: schema for schema in (_HOME, _SEARCH, _MANGA, _CHAPTER_LIST, _CHAPTER)
+}
+
+
+def extract_page(page_type: str, tree, fields: Optional[Iterable[str]] = None) -> dict:
+    """按页面类型的字段定义一次提取整个页面
+
+    Args:
+        page_type: 页面类型（home/search/manga/chapter_list/chapter）
+        tree: parse_html 得到的文档树
+        fields: 只提取指定字段，默认全部
+    """
+    if tree is None:
+        return {}
+    return SELECTOR_REGISTRY[page_type].extract(tree, fields)
+
+
+def resolve_fields(page_type: str, fields: Optional[str]) -> Optional[List[str]]:
+    """解析 API 的 fields 参数（逗号分隔的字段名）
+
+    Returns:
+        按页面字段定义顺序排列的字段名；参数为空时返回 None（提取全部字段）
+
+    Raises:
+        ValueError: 包含页面类型中不存在的字段
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(',') if name.strip()}
+    names = SELECTOR_REGISTRY[page_type].field_names
+    unknown = requested.difference(names)
+    if unknown:
+        raise ValueError(f"未知字段: {', '.join(sorted(unknown))}，可选: {', '.join(names)}")
+    return [name for name in names if name in requested] or None
+
+
+def get_selector_stats() -> dict:
+    """各页面类型选择器的命中统计，wasted 为没有得到结果的求值次数"""
+    stats = {}
+    total_evaluations = 0
+    total_wasted = 0
+    for page_type, schema in SELECTOR_REGISTRY.items():
+        page_stats = schema.get_stats()
+        stats[page_type] = page_stats
+        total_evaluations += sum(entry['evaluations'] for entry in page_stats.values())
+        total_wasted += sum(entry['wasted'] for entry in page_stats.values())
+    return {
+        'adaptive': SELECTOR_ORDER_CONFIG.get('adaptive', True),
+        'evaluations': total_evaluations,
+        'wasted': total_wasted,
+        'page_types': stats
+    }
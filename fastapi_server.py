@@ -1,5 +1,5 @@
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import logging
@@ -9,30 +9,40 @@ import json
 import os
 from typing import Optional, Dict, Any, List, Tuple, AsyncGenerator
 from urllib.parse import urljoin, quote
-from bs4 import BeautifulSoup
-from lxml import etree
 import cloudscraper
 import asyncio
-from playwright.async_api import async_playwright
 import re
 from asyncio import Semaphore, PriorityQueue
 from dataclasses import dataclass, field
 from typing import Any
 import aiojobs
 from contextlib import asynccontextmanager
+import threading
 from threading import Lock
-from lxml import html
-from utils.turnstile_solver import TurnstileSolver
-from utils.content_extractor import ContentExtractor
 from utils.db_manager import DBManager
 from models.manga import MangaInfo, Chapter, Image, Author, Genre, Type, ChapterInfo
+from models.records import MangaCard, ChapterRef, ImageRef, to_dicts
 
 from config.settings import (
     DATA_DIR, API_HOST, API_PORT, LOG_CONFIG,
-    MONGO_COLLECTION_MANGA, MONGO_COLLECTION_CHAPTERS, MONGO_COLLECTION_IMAGES
+    MONGO_COLLECTION_MANGA, MONGO_COLLECTION_CHAPTERS, MONGO_COLLECTION_IMAGES,
+    CHAPTER_STREAM_CONFIG, HOME_SECTION_CONFIG
 )
 from utils.browser_manager import BrowserManager
 from utils.cache_manager import CacheManager
+from utils.resource_policy import resource_policy
+from utils.asset_cache import asset_cache
+from utils.static_render import static_render_selector
+from utils.debug_capture import debug_capture
+from utils.trace_recorder import trace_recorder
+from utils.browser_worker_pool import BrowserWorkerPool
+from utils.html_parser import looks_like_html
+from utils.url_canonicalizer import url_canonicalizer
+from utils.parse_pool import parse_pool
+from utils.layout_monitor import layout_monitor
+from extractors.selector_registry import get_selector_stats, resolve_fields
+from extractors.chapter_list import build_chapter_list
+from extractors.chapter_stream import ChapterStreamParser
 
 # 设置日志
 logging.basicConfig(
@@ -69,6 +79,12 @@ async def lifespan(app: FastAPI):
     global scheduler
     scheduler = await aiojobs.create_scheduler(limit=100)
     await scheduler.spawn(process_request_queue())
+    # 启动浏览器工作进程池和大文档解析进程池
+    await browser_worker_pool.start()
+    parse_pool.start()
+    # 浏览器巡检：内存采样、上下文回收和崩溃重启（启用进程池时由各工作进程负责）
+    if not browser_worker_pool.started:
+        await scheduler.spawn(browser_manager.supervisor.run())
     
     # 连接数据库
     await db_manager.connect()
@@ -78,6 +94,10 @@ async def lifespan(app: FastAPI):
     # 关闭时的操作
     if scheduler:
         await scheduler.close()
+    # 关闭浏览器工作进程和浏览器
+    await browser_worker_pool.close()
+    await browser_manager.close()
+    parse_pool.close()
     # 关闭数据库连接
     await db_manager.close()
 
@@ -98,8 +118,18 @@ app.add_middleware(
 
 # 初始化工具类
 browser_manager = BrowserManager()
+browser_worker_pool = BrowserWorkerPool(browser_manager)
 cache = CacheManager(ttl=86400)  # 默认缓存时间改为24小时
 
+# 首页栏目（顺序与返回的首页数据一致）
+HOME_SECTIONS = list(HOME_SECTION_CONFIG['ttl'])
+HOME_SECTION_NAMES = {
+    'updates': '最新更新',
+    'hot_updates': '热门更新',
+    'popular_manga': '人气排行',
+    'new_manga': '最新上架'
+}
+
 # 定义请求优先级
 class Priority:
     HIGH = 1    # 用户直接请求
@@ -170,15 +200,13 @@ async def warm_up_cache():
     """预热缓存"""
     try:
         # 预热首页数据
-        home_data = await get_page_content_with_playwright()
-        if home_data:
-            cache.set('home_page', home_data)
+        home_data = await load_home_sections(HOME_SECTIONS)
             
         # 从首页数据中获取热门漫画进行预热
-        if home_data and 'hot_updates' in home_data:
+        if home_data.get('hot_updates'):
             for manga in home_data['hot_updates'][:5]:  # 只预热前5个热门漫画
-                if 'link' in manga:
-                    manga_path = manga['link'].replace('https://g-mh.org/manga/', '')
+                if manga.link:
+                    manga_path = url_canonicalizer.canonicalize(manga.link, 'manga').display
                     manga_info, chapters = await get_manga_info_with_playwright(f"https://g-mh.org/manga/{manga_path}")
                     if manga_info or chapters:
                         cache.set(f'chapters_{manga_path}', {
@@ -188,7 +216,13 @@ async def warm_up_cache():
     except Exception as e:
         logger.error(f"预热缓存时出错: {str(e)}")
 
-async def get_search_results_with_cloudscraper(search_url: str, page: int = 1) -> Tuple[List[dict], dict]:
+async def extract_search_results(content, page: int, content_type: Optional[str] = None) -> Tuple[List[MangaCard], dict]:
+    """提取搜索结果列表和分页链接"""
+    data = await parse_pool.extract('search', content, content_type)
+    logger.info(f"找到 {len(data['manga_list'])} 个漫画")
+    return data['manga_list'], {'current_page': page, 'page_links': data['page_links']}
+
+async def get_search_results_with_cloudscraper(search_url: str, page: int = 1) -> Tuple[List[MangaCard], dict]:
     try:
         scraper = cloudscraper.create_scraper(
             browser={
@@ -211,63 +245,11 @@ async def get_search_results_with_cloudscraper(search_url: str, page: int = 1) -
         )
         
         if response.status_code == 200:
-            if '<html' not in response.text.lower():
+            if not looks_like_html(response.content):
                 logger.warning("响应内容可能不是有效的HTML")
                 return [], {'current_page': page, 'page_links': []}
                 
-            tree = etree.HTML(str(BeautifulSoup(response.content, 'html.parser')))
-            
-            # 提取漫画列表
-            manga_list = []
-            manga_items = tree.xpath('//div[contains(@class, "cardlist")]/div[contains(@class, "pb-2")]')
-            logger.info(f"找到 {len(manga_items)} 个漫画")
-            
-            for item in manga_items:
-                try:
-                    manga_info = {}
-                    
-                    # 提取标题和链接
-                    link_elem = item.xpath('.//a/@href')
-                    title_elem = item.xpath('.//h3[contains(@class, "cardtitle")]/text()')
-                    
-                    if link_elem and title_elem:
-                        manga_info['title'] = title_elem[0].strip()
-                        manga_info['link'] = link_elem[0]
-                        if manga_info['link'] and not manga_info['link'].startswith('http'):
-                            manga_info['link'] = urljoin(search_url, manga_info['link'])
-                            
-                    # 提取封面图片
-                    img_elem = item.xpath('.//img/@src')
-                    if img_elem:
-                        manga_info['cover'] = img_elem[0]
-                        if not manga_info['cover'].startswith('http'):
-                            manga_info['cover'] = urljoin(search_url, manga_info['cover'])
-                            
-                    if manga_info.get('title') and manga_info.get('link'):
-                        manga_list.append(manga_info)
-                        
-                except Exception as e:
-                    logger.error(f"处理漫画信息时出错: {str(e)}")
-                    continue
-                    
-            # 提取分页信息
-            pagination = {'current_page': page, 'page_links': []}
-            page_links = tree.xpath('//div[contains(@class, "flex justify-between items-center")]//a')
-            
-            if page_links:
-                pagination['page_links'] = []
-                for link in page_links:
-                    href = link.get('href')
-                    text = ''.join(link.xpath('.//text()')).strip()
-                    if href and text:
-                        if not href.startswith('http'):
-                            href = urljoin(search_url, href)
-                        pagination['page_links'].append({
-                            'text': text,
-                            'link': href
-                        })
-                        
-            return manga_list, pagination
+            return await extract_search_results(response.content, page, response.headers.get('content-type'))
             
         else:
             logger.warning(f"搜索请求失败，状态码: {response.status_code}")
@@ -277,76 +259,17 @@ async def get_search_results_with_cloudscraper(search_url: str, page: int = 1) -
         logger.error(f"使用 Cloudscraper 搜索时出错: {str(e)}")
         return [], {'current_page': page, 'page_links': []}
 
-async def get_search_results_with_playwright(search_url: str, page: int = 1) -> Tuple[List[dict], dict]:
+async def get_search_results_with_playwright(search_url: str, page: int = 1) -> Tuple[List[MangaCard], dict]:
     try:
-        browser_page = await browser_manager.get_page()
-        try:
-            logger.info("使用 Playwright 访问搜索页面...")
-            await browser_page.goto(search_url, timeout=30000)
-            await browser_page.wait_for_load_state('networkidle')
-            await browser_page.wait_for_timeout(3000)
-            
-            content = await browser_page.content()
-            if not content:
-                logger.error("无法获取页面内容")
-                return [], {'current_page': page, 'page_links': []}
-                
-            tree = etree.HTML(content)
-            
-            # 提取漫画列表
-            manga_list = []
-            manga_items = tree.xpath('//div[contains(@class, "cardlist")]/div[contains(@class, "pb-2")]')
-            logger.info(f"找到 {len(manga_items)} 个漫画")
-            
-            for item in manga_items:
-                try:
-                    manga_info = {}
-                    
-                    # 提取标题和链接
-                    link_elem = item.xpath('.//a/@href')
-                    title_elem = item.xpath('.//h3[contains(@class, "cardtitle")]/text()')
-                    
-                    if link_elem and title_elem:
-                        manga_info['title'] = title_elem[0].strip()
-                        manga_info['link'] = link_elem[0]
-                        if manga_info['link'] and not manga_info['link'].startswith('http'):
-                            manga_info['link'] = urljoin(search_url, manga_info['link'])
-                            
-                    # 提取封面图片
-                    img_elem = item.xpath('.//img/@src')
-                    if img_elem:
-                        manga_info['cover'] = img_elem[0]
-                        if not manga_info['cover'].startswith('http'):
-                            manga_info['cover'] = urljoin(search_url, manga_info['cover'])
-                            
-                    if manga_info.get('title') and manga_info.get('link'):
-                        manga_list.append(manga_info)
-                        
-                except Exception as e:
-                    logger.error(f"处理漫画信息时出错: {str(e)}")
-                    continue
-                    
-            # 提取分页信息
-            pagination = {'current_page': page, 'page_links': []}
-            page_links = tree.xpath('//div[contains(@class, "flex justify-between items-center")]//a')
-            
-            if page_links:
-                pagination['page_links'] = []
-                for link in page_links:
-                    href = link.get('href')
-                    text = ''.join(link.xpath('.//text()')).strip()
-                    if href and text:
-                        if not href.startswith('http'):
-                            href = urljoin(search_url, href)
-                        pagination['page_links'].append({
-                            'text': text,
-                            'link': href
-                        })
-                        
-            return manga_list, pagination
+        logger.info("使用 Playwright 访问搜索页面...")
+        rendered = await browser_worker_pool.run('render_page', url=search_url, page_type='search')
+        
+        content = rendered['html']
+        if not content:
+            logger.error("无法获取页面内容")
+            return [], {'current_page': page, 'page_links': []}
             
-        finally:
-            await browser_manager.close()
+        return await extract_search_results(content, page)
             
     except Exception as e:
         logger.error(f"使用 Playwright 搜索时出错: {str(e)}")
@@ -395,7 +318,7 @@ async def get_manga_by_url(url: str):
             }
             
         result_data = {
-            'manga_list': manga_list,
+            'manga_list': to_dicts(manga_list),
             'pagination': pagination
         }
         
@@ -467,7 +390,7 @@ async def search_manga(keyword: str, page: int = 1):
             }
             
         result_data = {
-            'manga_list': manga_list,
+            'manga_list': to_dicts(manga_list),
             'pagination': pagination,
             'keyword': keyword
         }
@@ -620,8 +543,8 @@ class CloudflareSession:
 
 cloudflare_session = CloudflareSession.get_instance()
 
-async def get_page_content_with_cloudscraper():
-    """使用 cloudscraper 获取页面内容"""
+async def get_page_content_with_cloudscraper(sections: Optional[List[str]] = None):
+    """使用 cloudscraper 获取首页并提取栏目，sections 指定时只提取这些栏目"""
     try:
         # 设置代理配置
         proxy_config = {
@@ -685,40 +608,18 @@ async def get_page_content_with_cloudscraper():
             logger.info("成功获取响应!")
             # 检查响应内容
             content = response.content
-            text = response.text
             
-            # 打印响应内容的前1000个字符用于调试
-            logger.debug(f"响应内容预览: {text[:1000]}")
+            # 打印响应内容的前1000个字节用于调试
+            logger.debug(f"响应内容预览: {content[:1000]!r}")
             
             # 检查响应内容是否包含预期的HTML结构
-            if '<html' not in text.lower():
+            if not looks_like_html(content):
                 logger.warning("响应内容可能不是有效的HTML")
                 return None
                 
-            # 解析HTML
-            tree = etree.HTML(str(BeautifulSoup(content, 'html.parser')))
-            
-            # 提取数据
+            # 解析HTML并提取数据
             logger.info("开始提取数据...")
-            updates = extract_updates(tree)
-            hot_updates = extract_hot_updates(tree)
-            popular = extract_popular_manga(tree)
-            new_manga = extract_new_manga(tree)
-            
-            logger.info(f"找到 {len(updates)} 个最新更新")
-            logger.info(f"找到 {len(hot_updates)} 个热门更新")
-            logger.info(f"找到 {len(popular)} 个人气排行")
-            logger.info(f"找到 {len(new_manga)} 个最新上架")
-            
-            # 返回所有数据
-            home_data = {
-                'updates': updates,
-                'hot_updates': hot_updates,
-                'popular_manga': popular,
-                'new_manga': new_manga
-            }
-            
-            return home_data
+            return await extract_home_sections(content, response.headers.get('content-type'), sections)
             
         else:
             logger.warning(f"请求失败，状态码: {response.status_code}")
@@ -735,9 +636,7 @@ async def get_chapter_content_with_playwright(chapter_url: str) -> Tuple[List[st
     """使用 Playwright 获取章节内容"""
     try:
         logger.info("初始化内容提取器...")
-        extractor = ContentExtractor(debug=True, headless=True)
-        
-        result = await extractor.extract_content(chapter_url)
+        result = await browser_worker_pool.run('extract_content', url=chapter_url)
         
         if result:
             images = result.get('images', [])
@@ -758,406 +657,105 @@ async def get_chapter_content_with_playwright(chapter_url: str) -> Tuple[List[st
         return [], None, None
 
     
-def normalize_image_url(url: str) -> str:
-    """标准化图片URL"""
-    if not url:
-        return ''
-        
-    # 如果是相对路径，添加域名
-    if url.startswith('/'):
-        url = f'https://g-mh.org{url}'
-    elif not url.startswith(('http://', 'https://')):
-        url = f'https://g-mh.org/{url}'
-    
-    return url
-
-def normalize_manga_url(url: str) -> str:
-    """标准化漫画URL"""
-    if not url:
-        return ''
-        
-    # 如果是相对路径，添加域名
-    if url.startswith('/'):
-        url = f'https://g-mh.org{url}'
-    elif not url.startswith(('http://', 'https://')):
-        url = f'https://g-mh.org/{url}'
-    
-    # 确保URL以/manga/开头
-    if '/manga/' not in url:
-        url = url.replace('https://g-mh.org/', 'https://g-mh.org/manga/')
-    
-    return url
-
-def extract_updates(tree) -> List[dict]:
-    """提取最新更新列表"""
-    updates = []
+async def extract_home_sections(content, content_type: Optional[str] = None,
+                                sections: Optional[List[str]] = None) -> dict:
+    """提取首页栏目，sections 指定时只提取这些栏目"""
+    home_data = await parse_pool.extract('home', content, content_type, sections)
+    for section in sections or HOME_SECTIONS:
+        logger.info(f"找到 {len(home_data.get(section, []))} 个{HOME_SECTION_NAMES[section]}")
+    return home_data
+
+async def get_home_sections_with_playwright(sections: Optional[List[str]] = None) -> Optional[dict]:
+    """在浏览器池中渲染首页并提取栏目"""
+    # 访问页面并等待首页内容就绪，使用较短的超时时间（资源拦截已在浏览器上下文级别生效）
+    logger.info("正在访问页面...")
     try:
-        # 尝试不同的选择器
-        selectors = [
-            '//a[@class="slicarda"]',
-            '/html/body/main/div/div[4]/div/div[1]/a',
-            '/html/body/main/div/div[4]/div/div[2]/a'
-        ]
-        
-        for selector in selectors:
-            items = tree.xpath(selector)
-            logger.info(f"使用选择器 '{selector}' 找到 {len(items)} 个更新项")
-            
-            if items:
-                for item in items:
-                    try:
-                        manga_info = {}
-                        
-                        # 提取链接
-                        href = item.get('href')
-                        if href:
-                            manga_info['link'] = normalize_image_url(href)
-                        
-                        # 提取标题
-                        title = item.xpath('.//h3[@class="slicardtitle"]/text()')
-                        if title:
-                            manga_info['title'] = title[0].strip()
-                        
-                        # 提取时间
-                        time_text = item.xpath('.//p[@class="slicardtagp"]/text()')
-                        if time_text:
-                            manga_info['time'] = time_text[0].strip()
-                        
-                        # 提取章节
-                        chapter = item.xpath('.//p[@class="slicardtitlep"]/text()')
-                        if chapter:
-                            manga_info['chapter'] = chapter[0].strip()
-                        
-                        # 提取图片
-                        img = item.xpath('.//img[@class="slicardimg"]')
-                        if img:
-                            src = img[0].get('src') or img[0].get('data-src')
-                            if src:
-                                manga_info['cover'] = normalize_image_url(src)
-                        
-                        if manga_info.get('title') and manga_info.get('link'):
-                            logger.info(f"找到更新: {manga_info['title']}")
-                            updates.append(manga_info)
-                            
-                    except Exception as e:
-                        logger.error(f"处理更新项时出错: {str(e)}")
-                        continue
-                
-                # 如果找到了数据就不再尝试其他选择器
-                if updates:
-                    break
-        
-        return updates
+        rendered = await browser_worker_pool.run(
+            'render_page',
+            url='https://g-mh.org/',
+            page_type='home',
+            headers=DEFAULT_HEADERS,
+            debug_name='home_page',
+            navigation_timeout=15000,
+            snapshot=True
+        )
+        logger.info(f"页面响应状态码: {rendered['status']}")
     except Exception as e:
-        logger.error(f"提取更新列表时出错: {str(e)}")
-        return []
-
-def extract_hot_updates(tree) -> List[dict]:
-    """提取热门更新列表"""
-    hot_updates = []
+        logger.error(f"访问页面失败: {str(e)}")
+        return None
+    
+    # 获取页面内容
     try:
-        # 尝试不同的选择器
-        selectors = [
-            '/html/body/main/div/div[6]/div[1]/div[2]/div',
-            '//div[contains(@class, "hot-updates")]//div[contains(@class, "manga-item")]',
-            '//div[contains(@class, "hot-section")]//a'
-        ]
-        
-        for selector in selectors:
-            items = tree.xpath(selector)
-            logger.info(f"使用选择器 '{selector}' 找到 {len(items)} 个热门更新")
-            
-            if items:
-                for item in items:
-                    try:
-                        manga_info = {}
-                        
-                        # 提取链接
-                        link_elem = item.xpath('.//a')
-                        if link_elem:
-                            href = link_elem[0].get('href')
-                            if href:
-                                manga_info['link'] = normalize_image_url(href)
-                        
-                        # 提取标题
-                        title = item.xpath('.//h3/text()')
-                        if title:
-                            manga_info['title'] = title[0].strip()
-                        
-                        # 提取图片
-                        img = item.xpath('.//img')
-                        if img:
-                            src = img[0].get('src') or img[0].get('data-src')
-                            if src:
-                                manga_info['cover'] = normalize_image_url(src)
-                        
-                        if manga_info.get('title') and manga_info.get('link'):
-                            logger.info(f"找到热门更新: {manga_info['title']}")
-                            hot_updates.append(manga_info)
-                            
-                    except Exception as e:
-                        logger.error(f"处理热门更新项时出错: {str(e)}")
-                        continue
-                
-                # 如果找到了数据就不再尝试其他选择器
-                if hot_updates:
-                    break
-        
-        return hot_updates
+        logger.info("获取页面内容...")
+        content = rendered['html']
+        if not content:
+            raise Exception("页面内容为空")
+        
+        # 提取数据
+        logger.info("开始提取数据...")
+        home_data = await extract_home_sections(content, None, sections)
+        
+        # 按采样或提取失败保存页面内容用于调试
+        debug_capture.capture('home_page.html', content, failed=not any(home_data.values()))
+        return home_data
     except Exception as e:
-        logger.error(f"提取热门更新列表时出错: {str(e)}")
-        return []
+        logger.error(f"提取数据时出错: {str(e)}")
+        return None
 
-def extract_popular_manga(tree) -> List[dict]:
-    """提取人气排行列表"""
-    popular = []
-    try:
-        # 尝试不同的选择器
-        selectors = [
-            '/html/body/main/div/div[6]/div[2]/div[2]/div',
-            '//div[contains(@class, "rank-section")]//div[contains(@class, "manga-item")]',
-            '//div[contains(@class, "popular-section")]//a'
-        ]
-        
-        for selector in selectors:
-            items = tree.xpath(selector)
-            logger.info(f"使用选择器 '{selector}' 找到 {len(items)} 个人气排行")
-            
-            if items:
-                for index, item in enumerate(items, 1):
-                    try:
-                        manga_info = {}
-                        
-                        # 提取链接
-                        link_elem = item.xpath('.//a')
-                        if link_elem:
-                            href = link_elem[0].get('href')
-                            if href:
-                                manga_info['link'] = normalize_image_url(href)
-                        
-                        # 提取标题
-                        title = item.xpath('.//h3/text()')
-                        if title:
-                            manga_info['title'] = title[0].strip()
-                        
-                        # 提取图片
-                        img = item.xpath('.//img')
-                        if img:
-                            src = img[0].get('src') or img[0].get('data-src')
-                            if src:
-                                manga_info['cover'] = normalize_image_url(src)
-                        
-                        # 添加排名
-                        manga_info['rank'] = index
-                        
-                        if manga_info.get('title') and manga_info.get('link'):
-                            logger.info(f"找到人气排行: {manga_info['title']} (第{index}名)")
-                            popular.append(manga_info)
-                            
-                    except Exception as e:
-                        logger.error(f"处理人气排行项时出错: {str(e)}")
-                        continue
-                
-                # 如果找到了数据就不再尝试其他选择器
-                if popular:
-                    break
+def cache_home_sections(home_data: dict) -> None:
+    """按栏目分别缓存，空栏目不缓存（下次请求重新提取）"""
+    for section, items in home_data.items():
+        if items and section in HOME_SECTION_CONFIG['ttl']:
+            cache.set(HOME_SECTION_CONFIG['cache_key'].format(section=section), items,
+                      HOME_SECTION_CONFIG['ttl'][section])
+
+# 同一时间只刷新一次首页，并发请求等待后直接读取刷新结果
+home_refresh_lock = asyncio.Lock()
+
+async def load_home_sections(sections: List[str]) -> dict:
+    """读取首页栏目，只请求和提取缓存中已过期的栏目"""
+    key = HOME_SECTION_CONFIG['cache_key']
+    home_data = {section: cache.get(key.format(section=section)) for section in sections}
+    if all(home_data.values()):
+        logger.info(f"从缓存返回首页栏目: {', '.join(sections)}")
+        return home_data
+    
+    async with home_refresh_lock:
+        # 等待锁期间其他请求可能已经刷新过
+        missing = [section for section in sections
+                   if not home_data[section] and not cache.get(key.format(section=section))]
+        home_data.update({section: cache.get(key.format(section=section))
+                          for section in sections if section not in missing})
+        if not missing:
+            return home_data
         
-        return popular
-    except Exception as e:
-        logger.error(f"提取人气排行列表时出错: {str(e)}")
-        return []
-
-def extract_new_manga(tree) -> List[dict]:
-    """提取最新上架列表"""
-    new_manga = []
-    try:
-        # 尝试不同的选择器
-        selectors = [
-            '/html/body/main/div/div[6]/div[3]/div[2]/div',
-            '//div[contains(@class, "new-manga")]//div[contains(@class, "manga-item")]',
-            '//div[contains(@class, "new-section")]//a'
-        ]
-        
-        for selector in selectors:
-            items = tree.xpath(selector)
-            logger.info(f"使用选择器 '{selector}' 找到 {len(items)} 个最新上架")
-            
-            if items:
-                for item in items:
-                    try:
-                        manga_info = {}
-                        
-                        # 提取链接
-                        link_elem = item.xpath('.//a')
-                        if link_elem:
-                            href = link_elem[0].get('href')
-                            if href:
-                                manga_info['link'] = normalize_image_url(href)
-                        
-                        # 提取标题
-                        title = item.xpath('.//h3/text()')
-                        if title:
-                            manga_info['title'] = title[0].strip()
-                        
-                        # 提取图片
-                        img = item.xpath('.//img')
-                        if img:
-                            src = img[0].get('src') or img[0].get('data-src')
-                            if src:
-                                manga_info['cover'] = normalize_image_url(src)
-                        
-                        if manga_info.get('title') and manga_info.get('link'):
-                            logger.info(f"找到最新上架: {manga_info['title']}")
-                            new_manga.append(manga_info)
-                            
-                    except Exception as e:
-                        logger.error(f"处理最新上架项时出错: {str(e)}")
-                        continue
-                
-                # 如果找到了数据就不再尝试其他选择器
-                if new_manga:
-                    break
+        # 首先尝试使用 cloudscraper
+        logger.info(f"刷新首页栏目: {', '.join(missing)}，尝试使用 Cloudscraper 获取数据...")
+        fetched = await get_page_content_with_cloudscraper(missing)
         
-        return new_manga
-    except Exception as e:
-        logger.error(f"提取最新上架列表时出错: {str(e)}")
-        return []
+        if not (fetched and any(fetched.values())) and layout_monitor.allow_fallback('home'):
+            logger.info("Cloudscraper 未获取到数据，尝试使用 Playwright...")
+            fetched = await get_home_sections_with_playwright(missing)
+        
+        if fetched:
+            # 缓存结果
+            cache_home_sections(fetched)
+            home_data.update({section: fetched.get(section) for section in missing})
+    return home_data
 
 @app.get("/api/manga/home")
 async def get_home_page():
-    """获取首页数据"""
+    """获取首页数据（各栏目分别缓存，只刷新已过期的栏目）"""
     try:
         logger.info("接收到首页数据请求")
-        
-        # 尝试从缓存获取
-        cached_data = cache.get('home_page')
-        if cached_data:
-            logger.info("从缓存返回首页数据")
-            return {
-                'code': 200,
-                'message': 'success',
-                'data': cached_data,
-                'timestamp': int(datetime.now().timestamp())
-            }
-        
-        # 首先尝试使用 cloudscraper
-        logger.info("尝试使用 Cloudscraper 获取数据...")
-        home_data = await get_page_content_with_cloudscraper()
-        
-        if not home_data or not any([
-            home_data.get('updates'),
-            home_data.get('hot_updates'),
-            home_data.get('popular_manga'),
-            home_data.get('new_manga')
-        ]):
-            logger.info("Cloudscraper 未获取到数据，尝试使用 Playwright...")
-            # 获取页面
-            page = await browser_manager.get_page()
-            try:
-                # 设置请求拦截
-                logger.info("设置资源拦截...")
-                await page.route("**/*.{png,jpg,jpeg,gif,svg,css,woff2,woff}", lambda route: route.abort())
-                await page.route("**/*{analytics,tracker,advertisement,ad,stats}*", lambda route: route.abort())
-                
-                # 设置请求头
-                await page.set_extra_http_headers(DEFAULT_HEADERS)
-                
-                # 访问页面，使用较短的超时时间
-                logger.info("正在访问页面...")
-                try:
-                    # 只等待 DOM 加载完成
-                    response = await page.goto(
-                        'https://g-mh.org/',
-                        wait_until='domcontentloaded',
-                        timeout=15000
-                    )
-                    
-                    if response:
-                        logger.info(f"页面响应状态码: {response.status}")
-                        logger.info(f"页面响应头: {response.headers}")
-                    
-                except Exception as e:
-                    logger.error(f"访问页面失败: {str(e)}")
-                    return {
-                        'code': 500,
-                        'message': '访问页面失败',
-                        'data': None,
-                        'timestamp': int(datetime.now().timestamp())
-                    }
-                
-                # 固定等待 2 秒，让页面有时间渲染
-                logger.info("等待页面渲染...")
-                await page.wait_for_timeout(2000)
-                
-                # 获取页面内容
-                try:
-                    logger.info("获取页面内容...")
-                    content = await page.content()
-                    if not content:
-                        raise Exception("页面内容为空")
-                    
-                    # 保存页面内容用于调试
-                    debug_content_path = os.path.join(DATA_DIR, 'debug_home_page.html')
-                    with open(debug_content_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    logger.info(f"页面内容已保存到: {debug_content_path}")
-                    
-                    # 保存页面截图用于调试
-                    debug_screenshot_path = os.path.join(DATA_DIR, 'debug_home_page.png')
-                    await page.screenshot(path=debug_screenshot_path, full_page=True)
-                    logger.info(f"页面截图已保存到: {debug_screenshot_path}")
-                    
-                    tree = etree.HTML(content)
-                    
-                    # 提取数据
-                    logger.info("开始提取数据...")
-                    updates = extract_updates(tree)
-                    hot_updates = extract_hot_updates(tree)
-                    popular = extract_popular_manga(tree)
-                    new_manga = extract_new_manga(tree)
-                    
-                    logger.info(f"找到 {len(updates)} 个最新更新")
-                    logger.info(f"找到 {len(hot_updates)} 个热门更新")
-                    logger.info(f"找到 {len(popular)} 个人气排行")
-                    logger.info(f"找到 {len(new_manga)} 个最新上架")
-                    
-                    home_data = {
-                        'updates': updates,
-                        'hot_updates': hot_updates,
-                        'popular_manga': popular,
-                        'new_manga': new_manga
-                    }
-                    
-                except Exception as e:
-                    logger.error(f"提取数据时出错: {str(e)}")
-                    return {
-                        'code': 500,
-                        'message': '提取数据失败',
-                        'data': None,
-                        'timestamp': int(datetime.now().timestamp())
-                    }
-                    
-            finally:
-                try:
-                    await browser_manager.close()
-                except Exception as e:
-                    logger.error(f"关闭浏览器失败: {str(e)}")
+        home_data = await load_home_sections(HOME_SECTIONS)
         
         # 检查是否成功获取数据
-        if home_data and any([
-            home_data.get('updates'),
-            home_data.get('hot_updates'),
-            home_data.get('popular_manga'),
-            home_data.get('new_manga')
-        ]):
-            # 缓存结果
-            logger.info("缓存首页数据...")
-            cache.set('home_page', home_data)
-            
+        if any(home_data.values()):
             return {
                 'code': 200,
                 'message': 'success',
-                'data': home_data,
+                'data': {section: to_dicts(items) for section, items in home_data.items()},
                 'timestamp': int(datetime.now().timestamp())
             }
         else:
@@ -1180,6 +778,41 @@ async def get_home_page():
             'timestamp': int(datetime.now().timestamp())
         }
 
+@app.get("/api/manga/home/{section}")
+async def get_home_section(section: str):
+    """获取首页单个栏目（updates、hot_updates、popular_manga、new_manga）"""
+    if section not in HOME_SECTION_CONFIG['ttl']:
+        return {
+            'code': 400,
+            'message': f"未知栏目: {section}，可选: {', '.join(HOME_SECTIONS)}",
+            'data': None,
+            'timestamp': int(datetime.now().timestamp())
+        }
+    try:
+        items = (await load_home_sections([section]))[section]
+        if items:
+            return {
+                'code': 200,
+                'message': 'success',
+                'data': to_dicts(items),
+                'timestamp': int(datetime.now().timestamp())
+            }
+        logger.warning(f"未获取到首页栏目 {section} 的数据")
+        return {
+            'code': 404,
+            'message': '未找到有效数据',
+            'data': None,
+            'timestamp': int(datetime.now().timestamp())
+        }
+    except Exception as e:
+        logger.error(f"获取首页栏目 {section} 时出错: {str(e)}")
+        return {
+            'code': 500,
+            'message': str(e),
+            'data': None,
+            'timestamp': int(datetime.now().timestamp())
+        }
+
 class LazyJSONResponse:
     """支持懒加载的JSON响应类"""
     def __init__(self):
@@ -1236,8 +869,8 @@ async def get_chapter_content(manga_path: str, request: Request):
         # 首先尝试使用 cloudscraper
         image_urls, prev_chapter, next_chapter = await get_chapter_content_with_cloudscraper(chapter_url)
         
-        # 如果 cloudscraper 失败，尝试使用 playwright
-        if not image_urls:
+        # 如果 cloudscraper 失败，尝试使用 playwright（章节页面布局降级时只按间隔探测）
+        if not image_urls and layout_monitor.allow_fallback('chapter'):
             logger.info("Cloudscraper 失败，尝试使用 Playwright...")
             image_urls, prev_chapter, next_chapter = await get_chapter_content_with_playwright(chapter_url)
             
@@ -1258,19 +891,9 @@ async def get_chapter_content(manga_path: str, request: Request):
                 manga_id = path_parts[0]
                 chapter_id = path_parts[1]
                 
-                # 创建图片对象列表
-                images = []
-                for idx, url in enumerate(image_urls):
-                    image = Image(
-                        manga_id=manga_id,
-                        chapter_id=chapter_id,
-                        url=url,
-                        order=idx
-                    )
-                    images.append(image)
-                    
-                # 批量保存图片信息
-                await db_manager.save_images(images)
+                # 批量保存图片引用
+                images = [ImageRef(url, idx) for idx, url in enumerate(image_urls)]
+                await db_manager.save_images(manga_id, chapter_id, images)
                 logger.info(f"成功保存 {len(images)} 张图片信息到数据库")
                 
         except Exception as e:
@@ -1314,16 +937,8 @@ async def proxy_manga(manga_path: str):
     try:
         logger.info(f"接收到代理请求: {manga_path}")
         
-        # 构建章节页面URL
-        if manga_path.startswith('manga/'):
-            chapter_url = f"https://g-mh.org/{manga_path}"
-        else:
-            # 检查路径格式
-            parts = manga_path.split('/')
-            if len(parts) >= 2:  # 格式应该是: zongyoulaoshiyaoqingjiazhang-19262/29403-7911216-85
-                chapter_url = f"https://g-mh.org/manga/{manga_path}"
-            else:
-                chapter_url = f"https://g-mh.org/manga/{manga_path}"
+        # 构建章节页面URL（manga/ 前缀可有可无，例如 zongyoulaoshiyaoqingjiazhang-19262/29403-7911216-85）
+        chapter_url = url_canonicalizer.canonicalize(manga_path, 'chapter').canonical
                 
         logger.info(f"获取章节页面: {chapter_url}")
         
@@ -1342,123 +957,36 @@ async def proxy_manga(manga_path: str):
         # 首先尝试使用 cloudscraper
         image_urls, prev_chapter, next_chapter = await get_chapter_content_with_cloudscraper(chapter_url)
         
-        # 如果 cloudscraper 失败，尝试使用 playwright
-        if not image_urls:
+        # 如果 cloudscraper 失败，尝试使用 playwright（章节页面布局降级时只按间隔探测）
+        if not image_urls and layout_monitor.allow_fallback('chapter'):
             logger.info("Cloudscraper 失败，尝试使用 Playwright...")
-            # 获取页面
-            page = await browser_manager.get_page()
+            # 访问章节页面并等待图片就绪
+            logger.info("正在访问章节页面...")
+            rendered = await browser_worker_pool.run('render_page', url=chapter_url, page_type='chapter', snapshot=True)
             
-            try:
-                # 访问章节页面
-                logger.info("正在访问章节页面...")
-                response = await page.goto(chapter_url, wait_until='networkidle', timeout=60000)
-                
-                if response.status != 200:
-                    logger.error(f"页面访问失败，状态码: {response.status}")
-                    return {
-                        'code': response.status,
-                        'message': f"页面访问失败，状态码: {response.status}",
-                        'data': None,
-                        'timestamp': int(datetime.now().timestamp())
-                    }
-                
-                # 等待页面加载完成
-                logger.info("等待页面加载完成...")
-                await page.wait_for_load_state('networkidle')
-                await page.wait_for_timeout(3000)  # 等待3秒确保动态内容加载完成
-                
-                # 获取页面内容
-                logger.info("获取页面内容...")
-                content = await page.content()
-                
-                # 记录页面内容的一部分用于调试
-                logger.debug(f"[Playwright] 页面内容片段: {content[:500]}")
-                
-                # 解析HTML内容
-                logger.info("解析HTML内容...")
-                tree = etree.HTML(content)
-                
-                # 提取所有图片URL
-                image_urls = []
-                
-                # 查找所有可能的图片容器
-                logger.info("查找图片容器...")
-                selectors = [
-                    '//div[contains(@class, "chapter-img")]//img',
-                    '//div[contains(@class, "rd-article")]//img',
-                    '//div[contains(@class, "chapter-content")]//img',
-                    '//div[contains(@class, "manga-page")]//img',
-                    '//div[contains(@class, "manga-image")]//img',
-                    '//div[contains(@class, "comic-page")]//img',
-                    '//div[contains(@class, "rd-article-content")]//img',
-                    '//div[contains(@class, "rd-article")]//div[contains(@class, "text-center")]//img',
-                    '//div[contains(@class, "rd-article")]//p//img',
-                    '//div[contains(@class, "rd-article")]//div//img',
-                    '//div[contains(@class, "chapter-content")]//div//img',
-                    '//div[contains(@class, "chapter-content")]//p//img',
-                    '//img[contains(@class, "chapter-img")]',
-                    '//img[contains(@class, "manga-image")]',
-                    '//img[contains(@class, "comic-image")]'
-                ]
-                
-                for selector in selectors:
-                    containers = tree.xpath(selector)
-                    logger.info(f"[Playwright] 使用选择器 '{selector}' 找到 {len(containers)} 个图片容器")
-                    
-                    for img in containers:
-                        # 检查多个可能的属性
-                        for attr in ['src', 'data-src', 'data-original', 'data-url', 'data-image', 'data-lazyload', 'data-lazy']:
-                            src = img.get(attr)
-                            if src:
-                                logger.info(f"[Playwright] 找到图片URL ({attr}): {src}")
-                                if any(domain in src for domain in ['g-mh.online/hp/', 'baozimh.org', 'godamanga.online', 'mhcdn.xyz', 'mangafuna.xyz']) and not ('cover' in src):
-                                    if src not in image_urls:  # 去重
-                                        image_urls.append(src)
-                                        break
-                
-                logger.info(f"[Playwright] 总共找到 {len(image_urls)} 个有效图片URL")
-                
-                # 提取上一章和下一章链接
-                prev_chapter = None
-                next_chapter = None
-                
-                # 查找导航链接
-                logger.info("查找导航链接...")
-                nav_selectors = [
-                    '//a[contains(@class, "chapter-nav")]',
-                    '//a[contains(@class, "prev-chapter")]',
-                    '//a[contains(@class, "next-chapter")]',
-                    '//a[contains(text(), "上一章")]',
-                    '//a[contains(text(), "下一章")]',
-                    '//a[contains(@class, "rd-prev-chapter")]',
-                    '//a[contains(@class, "rd-next-chapter")]',
-                    '//a[contains(@class, "prev")]',
-                    '//a[contains(@class, "next")]',
-                    '//a[contains(@class, "pre-chapter")]',
-                    '//a[contains(@class, "next-chapter")]',
-                    '//a[contains(@title, "上一章")]',
-                    '//a[contains(@title, "下一章")]'
-                ]
-                
-                nav_links = []
-                for selector in nav_selectors:
-                    links = tree.xpath(selector)
-                    logger.info(f"[Playwright] 使用选择器 '{selector}' 找到 {len(links)} 个导航链接")
-                    nav_links.extend(links)
-                
-                for link in nav_links:
-                    href = link.get('href')
-                    if href:
-                        text = ''.join(link.xpath('.//text()')).strip()
-                        title = link.get('title', '')
-                        logger.info(f"[Playwright] 导航链接: text='{text}', title='{title}', href='{href}'")
-                        if '上一' in text or '上一' in title:
-                            prev_chapter = href.replace('https://g-mh.org/', '')
-                        elif '下一' in text or '下一' in title:
-                            next_chapter = href.replace('https://g-mh.org/', '')
-                
-            finally:
-                await browser_manager.close()
+            if rendered['status'] != 200:
+                logger.error(f"页面访问失败，状态码: {rendered['status']}")
+                return {
+                    'code': rendered['status'],
+                    'message': f"页面访问失败，状态码: {rendered['status']}",
+                    'data': None,
+                    'timestamp': int(datetime.now().timestamp())
+                }
+            
+            # 获取页面内容
+            logger.info("获取页面内容...")
+            content = rendered['html']
+            
+            # 记录页面内容的一部分用于调试
+            logger.debug(f"[Playwright] 页面内容片段: {content[:500]}")
+            
+            # 解析HTML内容，一次提取图片和导航链接
+            logger.info("解析HTML内容...")
+            chapter_data = await parse_pool.extract('chapter', content)
+            image_urls = chapter_data['images']
+            prev_chapter = chapter_data.get('prev_chapter')
+            next_chapter = chapter_data.get('next_chapter')
+            logger.info(f"[Playwright] 总共找到 {len(image_urls)} 个有效图片URL")
         
         result_data = {
             'images': image_urls,
@@ -1489,116 +1017,58 @@ async def proxy_manga(manga_path: str):
             'timestamp': int(datetime.now().timestamp())
         }
 
-def extract_chapter_number(chapter_link: str) -> int:
-    """
-    从章节链接中提取章节序号
-    例如：从 '/manga/yishijieluyingliaoyushenghuo/32382-046010880-12' 提取 12
-    """
-    try:
-        # 使用正则表达式提取最后的数字
-        match = re.search(r'-(\d+)$', chapter_link)
-        if match:
-            return int(match.group(1))
-        return 0
-    except Exception:
-        return 0
-
-async def get_chapters_from_list_page(chapter_url: str) -> List[dict]:
+def get_chapter_list_url(manga_url: str) -> str:
+    """漫画页面对应的完整章节列表页地址"""
+    manga_id = manga_url.rstrip('/').split('/')[-1]
+    return f"https://m.g-mh.org/chapterlist/{manga_id}"
+
+async def extract_chapter_links(content, page_type: str = 'manga', content_type: Optional[str] = None) -> List[ChapterRef]:
+    """提取漫画页面或章节列表页中的章节链接（链接为 /manga/ 之后的相对路径）"""
+    data = await parse_pool.extract(page_type, content, content_type, ['chapters'])
+    chapters = data.get('chapters', [])
+    logger.info(f"找到 {len(chapters)} 个章节")
+    return chapters
+
+async def get_chapters_from_list_page(chapter_url: str) -> List[ChapterRef]:
     """
     从章节列表页面获取章节信息
     """
     try:
-        page = await browser_manager.get_page()
-        
-        try:
-            logger.info(f"访问章节列表页面: {chapter_url}")
-            
-            # 设置请求头
-            await page.set_extra_http_headers({
+        logger.info(f"访问章节列表页面: {chapter_url}")
+        
+        # 访问页面并等待章节列表加载，按调试采样规则保存页面截图
+        rendered = await browser_worker_pool.run(
+            'render_page',
+            url=chapter_url,
+            page_type='chapter_list',
+            headers={
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
                 'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8'
-            })
-            
-            # 访问页面
-            await page.goto(chapter_url, timeout=30000)
-            await page.wait_for_load_state('networkidle')
-            await page.wait_for_load_state('domcontentloaded')
-            await page.wait_for_load_state('load')
-            
-            # 等待章节列表加载
-            await page.wait_for_timeout(5000)
-            
-            # 保存页面截图（用于调试）
-            screenshot_path = os.path.join(DATA_DIR, 'chapter_list_page.png')
-            await page.screenshot(path=screenshot_path, full_page=True)
-            logger.info(f"章节列表页面截图已保存到: {screenshot_path}")
-            
-            # 获取页面内容
-            content = await page.content()
-            
-            # 保存页面内容（用于调试）
-            content_path = os.path.join(DATA_DIR, 'chapter_list_page.html')
-            with open(content_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            logger.info(f"章节列表页面内容已保存到: {content_path}")
-            
-            tree = etree.HTML(content)
-            
-            # 提取章节列表
-            chapters = []
-            # 在 cloudscraper 函数中增加更灵活的选择器
-
-            chapter_selectors = [
-                '//*[contains(@class, "chapter")]//a',  # 更宽松的类名匹配
-                '//a[contains(@href, "chapter")]',       # 通过链接特征匹配
-                '//*[contains(text(), "第")]//ancestor::a' # 通过章节标题文字特征匹配
-            ]
-            
-            for selector in chapter_selectors:
-                chapter_list = tree.xpath(selector)
-                if chapter_list:
-                    logger.info(f"使用选择器 '{selector}' 找到 {len(chapter_list)} 个章节")
-                    for chapter in chapter_list:
-                        try:
-                            chapter_info = {}
-                            
-                            # 提取章节链接
-                            href = chapter.get('href')
-                            if href:
-                                chapter_info['link'] = urljoin('https://g-mh.org/', href)
-                                
-                            # 提取章节标题
-                            title = chapter.xpath('.//text()')
-                            if title:
-                                chapter_info['title'] = ''.join(title).strip()
-                                
-                            if chapter_info.get('link') and chapter_info.get('title'):
-                                # 检查是否已存在相同的章节
-                                if not any(c['link'] == chapter_info['link'] for c in chapters):
-                                    chapters.append(chapter_info)
-                                
-                        except Exception as e:
-                            logger.error(f"处理章节信息时出错: {str(e)}")
-                            continue
-                    
-                    # 如果找到了章节，就不再继续尝试其他选择器
-                    if chapters:
-                        break
-            
-            # 按照章节序号排序
-            chapters.sort(key=lambda x: extract_chapter_number(x['link']))
-            
-            return chapters
-            
-        finally:
-            await browser_manager.close()
+            },
+            debug_name='chapter_list_page'
+        )
+        
+        # 获取页面内容
+        content = rendered['html']
+        
+        # 提取章节列表
+        chapters = await extract_chapter_links(content, 'chapter_list')
+        
+        # 按照章节序号排序
+        chapters = build_chapter_list(chapters)
+        
+        # 按采样或提取失败保存页面内容用于调试
+        debug_capture.capture('chapter_list_page.html', content, failed=not chapters)
+        
+        return chapters
             
     except Exception as e:
         logger.error(f"从章节列表页面获取章节信息时出错: {str(e)}")
         return []
 
-async def get_manga_info_with_cloudscraper(manga_url: str) -> Tuple[dict, List[dict]]:
+async def get_manga_info_with_cloudscraper(manga_url: str, fields: Optional[List[str]] = None) -> Tuple[dict, List[ChapterRef]]:
+    """获取漫画信息和章节列表；fields 指定时只提取这些字段，不需要章节时不请求章节列表页"""
     try:
         scraper = cloudscraper.create_scraper(
             browser={
@@ -1611,204 +1081,55 @@ async def get_manga_info_with_cloudscraper(manga_url: str) -> Tuple[dict, List[d
         
         logger.info(f"使用 Cloudscraper 访问漫画页面: {manga_url}")
         loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None, 
-            lambda: scraper.get(
-                manga_url,
-                allow_redirects=True,
-                timeout=30
+        # 漫画页面和完整章节列表页并行请求
+        want_chapters = fields is None or 'chapters' in fields
+        chapter_list_url = get_chapter_list_url(manga_url)
+        requests_to_send = [loop.run_in_executor(None, lambda: scraper.get(manga_url, allow_redirects=True, timeout=30))]
+        if want_chapters:
+            requests_to_send.append(
+                loop.run_in_executor(None, lambda: scraper.get(chapter_list_url, allow_redirects=True, timeout=30))
             )
-        )
+        response, *rest = await asyncio.gather(*requests_to_send, return_exceptions=True)
+        chapters_response = rest[0] if rest else None
+        if isinstance(response, Exception):
+            raise response
         
         if response.status_code == 200:
-            if '<html' not in response.text.lower():
+            if not looks_like_html(response.content):
                 logger.warning("响应内容可能不是有效的HTML")
                 return None, []
                 
-            tree = etree.HTML(str(BeautifulSoup(response.content, 'html.parser')))
-            
-            # 保存页面内容用于调试
-            debug_time = datetime.now().strftime('%Y%m%d_%H%M%S')
-            debug_content_path = os.path.join(DATA_DIR, f'debug_manga_page_{debug_time}.html')
-            with open(debug_content_path, 'w', encoding='utf-8') as f:
-                f.write(response.text)
-            logger.info(f"页面内容已保存到: {debug_content_path}")
-            
-            # 提取漫画信息
-            manga_info = {}
-            
-            # 提取封面图片
-            cover_img = tree.xpath('/html/body/main/div[2]/div[2]/div[1]/div/div[1]/div[1]/div/div/img')
-            if cover_img:
-                manga_info['cover'] = normalize_image_url(cover_img[0].get('src', ''))
-                
-            # 提取标题和状态
-            title_elem = tree.xpath('/html/body/main/div[2]/div[2]/div[2]/div[1]/div[1]/div[1]/h1/text()')
-            status_elem = tree.xpath('/html/body/main/div[2]/div[2]/div[2]/div[1]/div[1]/div[1]/h1/span/text()')
-            if title_elem:
-                manga_info['title'] = title_elem[0].strip()
-            if status_elem:
-                manga_info['status'] = status_elem[0].strip()
-            
-            # 提取作者信息
-            author_elem = tree.xpath('/html/body/main/div[2]/div[2]/div[2]/div[1]/div[1]/div[2]/a')
-            if author_elem:
-                author_info = {
-                    'names': [],
-                    'links': []
-                }
-                # 获取所有作者标签
-                for author in author_elem:
-                    name = ''.join(author.xpath('.//text()')).strip()
-                    if name:
-                        author_info['names'].append(name)
-                        author_info['links'].append(urljoin('https://g-mh.org/', author.get('href', '')))
-                manga_info['author'] = author_info
-            
-            # 提取类型信息
-            type_elem = tree.xpath('/html/body/main/div[2]/div[2]/div[2]/div[1]/div[1]/div[3]/a')
-            if type_elem:
-                type_info = {
-                    'names': [],
-                    'links': []
-                }
-                # 获取所有类型标签
-                for type_tag in type_elem:
-                    name = ''.join(type_tag.xpath('.//text()')).strip()
-                    if name:
-                        type_info['names'].append(name)
-                        type_info['links'].append(urljoin('https://g-mh.org/', type_tag.get('href', '')))
-                manga_info['type'] = type_info
-            
-            # 提取简介
-            description = tree.xpath('/html/body/main/div[2]/div[2]/div[2]/div[1]/div[1]/p/text()')
-            if description:
-                manga_info['description'] = description[0].strip()
-                
-            # 直接从当前页面提取章节列表
-            logger.info("尝试从当前页面提取章节列表...")
-            chapters = []
-            
-            # 使用多个选择器尝试获取章节列表
-            chapter_selectors = [
-                '//div[contains(@class, "chapter-list")]//a',
-                '//div[contains(@class, "chapters")]//a',
-                '/html/body/main/div/div[3]/div[3]//a',
-                '/html/body/main/div/div[3]/div[3]/div[1]//a',
-                '//div[contains(@class, "manga-chapters")]//a',
-                '//div[contains(@class, "chapter-items")]//a'
-            ]
-            
-            for selector in chapter_selectors:
-                logger.info(f"尝试使用选择器: {selector}")
-                chapter_elements = await page.query_selector_all(
-                    'xpath=//div[contains(@class, "chapter")]//a >> ' +
-                    'css=div.chapter-item > a'
-            )
-                if chapter_elements:
-                    logger.info(f"使用选择器 '{selector}' 找到 {len(chapter_elements)} 个章节")
-                    for chapter in chapter_elements:
-                        try:
-                            href = chapter.get('href')
-                            title = ''.join(chapter.xpath('.//text()')).strip()
-                            
-                            if href and title:
-                                chapter_info = {
-                                    'title': title,
-                                    'link': href.replace('https://g-mh.org/manga/', '')
-                                }
-                                
-                                if not any(c['link'] == chapter_info['link'] for c in chapters):
-                                    chapters.append(chapter_info)
-                                    logger.info(f"找到章节: {title} - {href}")
-                        except Exception as e:
-                            logger.error(f"处理章节元素时出错: {str(e)}")
-                            continue
-                    
-                    if chapters:  # 如果找到了章节，就跳出循环
-                        break
-            
-            if not chapters:
-                logger.warning("在当前页面未找到章节，尝试获取完整章节列表...")
-                # 获取漫画ID
-                manga_id = manga_url.split('/')[-1]
-                logger.info(f"提取到漫画ID: {manga_id}")
-                
-                # 尝试不同的章节列表URL格式
-                chapter_list_urls = [
-                    f"https://m.g-mh.org/chapterlist/{manga_id}",
-                    # f"https://g-mh.org/manga/{manga_id}/chapters",
-                    # f"https://g-mh.org/manga/{manga_id}/all-chapters"
-                ]
-                
-                for chapter_url in chapter_list_urls:
-                    try:
-                        logger.info(f"尝试访问章节列表URL: {chapter_url}")
-                        chapters_response = await loop.run_in_executor(
-                            None,
-                            lambda: scraper.get(
-                                chapter_url,
-                                allow_redirects=True,
-                                timeout=30
-                            )
-                        )
-                        
-                        if chapters_response.status_code == 200:
-                            # 保存章节列表内容用于调试
-                            debug_chapters_path = os.path.join(DATA_DIR, f'debug_chapters_{debug_time}_{chapter_list_urls.index(chapter_url)}.html')
-                            with open(debug_chapters_path, 'w', encoding='utf-8') as f:
-                                f.write(chapters_response.text)
-                            logger.info(f"章节列表内容已保存到: {debug_chapters_path}")
-                            
-                            chapters_tree = etree.HTML(str(BeautifulSoup(chapters_response.content, 'html.parser')))
-                            
-                            # 尝试不同的选择器
-                            for selector in chapter_selectors:
-                                chapter_elements = chapters_tree.xpath(selector)
-                                if chapter_elements:
-                                    logger.info(f"在章节列表页面使用选择器 '{selector}' 找到 {len(chapter_elements)} 个章节")
-                                    for chapter in chapter_elements:
-                                        try:
-                                            href = chapter.get('href')
-                                            title = ''.join(chapter.xpath('.//text()')).strip()
-                                            
-                                            if href and title:
-                                                chapter_info = {
-                                                    'title': title,
-                                                    'link': href.replace('https://g-mh.org/manga/', '')
-                                                }
-                                                
-                                                if not any(c['link'] == chapter_info['link'] for c in chapters):
-                                                    chapters.append(chapter_info)
-                                                    logger.info(f"找到章节: {title} - {href}")
-                                        except Exception as e:
-                                            logger.error(f"处理章节元素时出错: {str(e)}")
-                                            continue
-                                    
-                                    if chapters:  # 如果找到了章节，就跳出循环
-                                        break
-                            
-                            if chapters:  # 如果找到了章节，就跳出URL循环
-                                break
-                            
-                    except Exception as e:
-                        logger.error(f"访问章节列表URL {chapter_url} 时出错: {str(e)}")
-                        continue
+            # 一次提取请求的漫画信息字段和当前页面的章节列表
+            manga_info = await parse_pool.extract('manga', response.content, response.headers.get('content-type'), fields)
+            chapters = manga_info.pop('chapters', [])
+            
+            # 合并并行获取的完整章节列表
+            list_chapters = []
+            if chapters_response is None:
+                pass
+            elif isinstance(chapters_response, Exception):
+                logger.error(f"访问章节列表URL {chapter_list_url} 时出错: {str(chapters_response)}")
+            elif chapters_response.status_code == 200:
+                list_chapters = await extract_chapter_links(
+                    chapters_response.content, 'chapter_list', chapters_response.headers.get('content-type')
+                )
+                logger.info(f"在章节列表页面找到 {len(list_chapters)} 个章节")
+            else:
+                logger.warning(f"章节列表页面请求失败，状态码: {chapters_response.status_code}")
             
+            # 合并两个来源（章节列表页优先），按链接去重并按章节序号排序
+            chapters = build_chapter_list(list_chapters, chapters)
             logger.info(f"总共找到 {len(chapters)} 个章节")
             
-            # 按照章节序号排序
-            chapters.sort(key=lambda x: extract_chapter_number(x['link']))
-            
-            # 保存提取结果到调试文件
-            debug_result = {
-                'manga_info': manga_info,
-                'chapters': chapters
-            }
-            debug_result_file = os.path.join(DATA_DIR, f'debug_manga_result_{debug_time}.json')
-            with open(debug_result_file, 'w', encoding='utf-8') as f:
-                json.dump(debug_result, f, ensure_ascii=False, indent=2)
-            logger.info(f"提取结果已保存到: {debug_result_file}")
+            # 按采样或提取失败保存页面内容和提取结果用于调试
+            if debug_capture.should_capture(failed=want_chapters and not chapters):
+                debug_capture.write('manga_page.html', response.text)
+                if chapters_response is not None and not isinstance(chapters_response, Exception):
+                    debug_capture.write('manga_chapters.html', chapters_response.text)
+                debug_capture.write('manga_result.json', {
+                    'manga_info': manga_info,
+                    'chapters': chapters
+                })
             
             return manga_info, chapters
                 
@@ -1820,227 +1141,67 @@ async def get_manga_info_with_cloudscraper(manga_url: str) -> Tuple[dict, List[d
         logger.error(f"获取漫画信息时出错: {str(e)}")
         return None, []
 
-async def get_manga_info_with_playwright(manga_url: str) -> Tuple[dict, List[dict]]:
+async def get_manga_info_with_playwright(manga_url: str, fields: Optional[List[str]] = None) -> Tuple[dict, List[ChapterRef]]:
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                locale='zh-CN',
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
-            )
-            
-            page = await context.new_page()
-            logger.info(f"访问漫画页面: {manga_url}")
-            
-            try:
-                response = await page.goto(manga_url, timeout=30000)
-                if not response:
-                    raise Exception("页面加载失败")
-                    
-                # 等待页面加载完成
-                await page.wait_for_load_state('networkidle')
-                # 等待主要内容加载
-                await page.wait_for_selector('main', timeout=10000)
-                
-                # 获取页面内容
-                content = await page.content()
-                chapters_tree = etree.HTML(str(BeautifulSoup(content, 'html.parser')))
-                
-                # 使用更灵活的选择器
-                chapter_selectors = [
-                    '//div[contains(@class, "chapter-list")]//a',  # 方法1：通过class
-                    '//main//div[contains(@class, "chapter")]//a',  # 方法2：通过main下的chapter
-                    '/html/body/main/div/div[3]/div[3]/div[1]//a',  # 方法3：直接路径
-                    '//div[contains(@class, "manga-chapters")]//a'  # 方法4：其他可能的class
-                ]
-                
-                chapters = []
-                for selector in chapter_selectors:
-                    chapter_list = chapters_tree.xpath(selector)
-                    if chapter_list:
-                        logger.info(f"使用选择器 '{selector}' 找到 {len(chapter_list)} 个章节")
-                        break
-                
-                if not chapter_list:
-                    logger.warning("未找到章节列表，尝试其他方法")
-                    # 尝试使用Playwright的选择器
-                    chapter_elements = await page.query_selector_all('div.chapter-list a, div.manga-chapters a')
-                    if chapter_elements:
-                        chapter_list = []
-                        for element in chapter_elements:
-                            href = await element.get_attribute('href')
-                            text = await element.text_content()
-                            chapter_list.append({'href': href, 'text': text})
-                        logger.info(f"使用Playwright选择器找到 {len(chapter_list)} 个章节")
-                
-                # 处理章节信息
-                for chapter in chapter_list:
-                    try:
-                        if isinstance(chapter, dict):
-                            # 来自Playwright的结果
-                            href = chapter['href']
-                            title = chapter['text'].strip()
-                        else:
-                            # 来自XPath的结果
-                            href = chapter.get('href')
-                            title = ''.join(chapter.xpath('.//text()')).strip()
-                        
-                        if href and title:
-                            chapter_info = {
-                                'title': title,
-                                'link': href.replace('https://g-mh.org/manga/', '')
-                            }
-                            
-                            if not any(c['link'] == chapter_info['link'] for c in chapters):
-                                chapters.append(chapter_info)
-                                logger.info(f"找到章节: {title} - {href}")
-                                
-                    except Exception as e:
-                        logger.error(f"处理章节信息时出错: {str(e)}")
-                        continue
+        logger.info(f"访问漫画页面: {manga_url}")
+        # 在浏览器池中打开页面并等待主要内容加载
+        rendered = await browser_worker_pool.run('render_page', url=manga_url, page_type='manga', snapshot=True)
+        if not rendered['html']:
+            raise Exception("页面加载失败")
+            
+        # 获取页面内容（只包含漫画信息和章节列表的子树）
+        content = rendered['html']
+        # 一次提取请求的漫画信息字段和章节列表
+        manga_info = await parse_pool.extract('manga', content, None, fields)
+        chapters = manga_info.pop('chapters', [])
+        logger.info(f"找到 {len(chapters)} 个章节")
+        
+        # 按采样或提取失败保存页面内容用于调试
+        failed = (fields is None or 'chapters' in fields) and not chapters
+        if fields is None or 'author' in fields:
+            failed = failed or not manga_info.get('author', {}).get('names')
+        debug_capture.capture('manga_page_playwright.html', content, failed=failed)
+        
+        # 按照章节序号排序
+        chapters = build_chapter_list(chapters)
+        
+        return manga_info, chapters
 
-                # 获取漫画信息
-                manga_info = {}
-                
-                # 等待标题元素加载
-                await page.wait_for_selector('h1', timeout=5000)
-                title_element = await page.query_selector('h1')
-                if title_element:
-                    manga_info['title'] = await title_element.text_content()
-                    
-                # 提取封面图片
-                cover_img = chapters_tree.xpath('//div[contains(@class, "manga-cover")]//img | //div[contains(@class, "cover")]//img')
-                if cover_img:
-                    manga_info['cover'] = normalize_image_url(cover_img[0].get('src', ''))
-                    
-                # 提取作者信息
-                author_info = {
-                    'names': [],
-                    'links': []
-                }
-                # 尝试多个可能的作者选择器
-                author_selectors = [
-                    '//div[contains(text(), "作者：")]/following-sibling::div//a',
-                    '//div[contains(text(), "作者:")]/following-sibling::div//a',
-                    '//div[contains(text(), "作者")]/following-sibling::div//a',
-                    '//div[contains(text(), "作家")]/following-sibling::div//a',
-                    '//div[contains(@class, "author")]//a',
-                    '//div[contains(@class, "manga-author")]//a',
-                    '//div[contains(@class, "info")]//div[contains(text(), "作者")]/following-sibling::div//a'
-                ]
-                
-                # 记录页面内容用于调试
-                debug_content = etree.tostring(chapters_tree, encoding='unicode', pretty_print=True)
-                logger.debug(f"页面内容:\n{debug_content}")
-                
-                for selector in author_selectors:
-                    logger.debug(f"尝试作者选择器: {selector}")
-                    author_elements = chapters_tree.xpath(selector)
-                    if author_elements:
-                        logger.info(f"使用选择器 '{selector}' 找到 {len(author_elements)} 个作者")
-                        for author in author_elements:
-                            name = ''.join(author.xpath('.//text()')).strip()
-                            href = author.get('href')
-                            logger.debug(f"找到作者: name='{name}', href='{href}'")
-                            if name:
-                                author_info['names'].append(name)
-                                if href:
-                                    author_info['links'].append(normalize_manga_url(href))
-                        if author_info['names']:  # 如果找到了作者信息，就跳出循环
-                            break
-                            
-                manga_info['author'] = author_info
-                
-                # 提取类型信息
-                type_info = {
-                    'names': [],
-                    'links': []
-                }
-                # 尝试多个可能的类型选择器
-                type_selectors = [
-                    '//div[contains(text(), "类型：")]/following-sibling::div//a',
-                    '//div[contains(text(), "类型:")]/following-sibling::div//a',
-                    '//div[contains(text(), "类型")]/following-sibling::div//a',
-                    '//div[contains(@class, "flex")]//div[text()="类型："]//following-sibling::div//a',
-                    '//div[contains(@class, "flex")]//div[text()="类型:"]//following-sibling::div//a',
-                    '//div[contains(@class, "flex")]//div[contains(text(), "类型")]//following-sibling::div//a',
-                    '//div[contains(@class, "flex")]//div[contains(text(), "分类")]//following-sibling::div//a',
-                    '//div[contains(@class, "info")]//div[contains(text(), "类型")]//following-sibling::div//a',
-                    '//div[contains(@class, "info")]//div[contains(text(), "分类")]//following-sibling::div//a',
-                    '//div[contains(@class, "genre")]//a',
-                    '//div[contains(@class, "manga-genre")]//a'
-                ]
-                
-                for selector in type_selectors:
-                    logger.debug(f"尝试类型选择器: {selector}")
-                    type_elements = chapters_tree.xpath(selector)
-                    if type_elements:
-                        logger.info(f"使用选择器 '{selector}' 找到 {len(type_elements)} 个类型")
-                        for type_tag in type_elements:
-                            name = ''.join(type_tag.xpath('.//text()')).strip()
-                            href = type_tag.get('href')
-                            logger.debug(f"找到类型: name='{name}', href='{href}'")
-                            if name:
-                                type_info['names'].append(name)
-                                if href:
-                                    type_info['links'].append(normalize_manga_url(href))
-                        if type_info['names']:  # 如果找到了类型信息，就跳出循环
-                            break
-                            
-                manga_info['type'] = type_info
-                
-                # 提取简介
-                description_selectors = [
-                    '//div[contains(@class, "flex")]//p[string-length(text()) > 10]/text()',
-                    '//div[contains(@class, "description")]//p[string-length(text()) > 10]/text()',
-                    '//div[contains(@class, "summary")]//p[string-length(text()) > 10]/text()',
-                    '//div[contains(@class, "manga-description")]//p[string-length(text()) > 10]/text()',
-                    '//div[contains(@class, "info")]//div[contains(text(), "简介") or contains(text(), "描述")]//following-sibling::div//p/text()'
-                ]
-                
-                for selector in description_selectors:
-                    description = chapters_tree.xpath(selector)
-                    if description:
-                        manga_info['description'] = description[0].strip()
-                        break
-                
-                # 提取状态
-                status_selectors = [
-                    '//h1//span/text()',
-                    '//div[contains(@class, "status")]//text()',
-                    '//div[contains(@class, "info")]//div[contains(text(), "状态")]//following-sibling::div//text()'
-                ]
-                
-                for selector in status_selectors:
-                    status_element = chapters_tree.xpath(selector)
-                    if status_element:
-                        manga_info['status'] = status_element[0].strip()
-                        break
-                
-                # 按照章节序号排序
-                chapters.sort(key=lambda x: extract_chapter_number(x['link']))
-                
-                return manga_info, chapters
-
-            except Exception as e:
-                logger.error(f"获取漫画信息时出错: {str(e)}")
-                raise
-            finally:
-                await page.close()
-                
     except Exception as e:
         logger.error(f"Playwright操作出错: {str(e)}")
         return None, []
 
+async def get_manga_detail_with_playwright(manga_url: str, fields: Optional[List[str]] = None) -> Tuple[dict, List[ChapterRef]]:
+    """在浏览器池的两个标签页中并行加载漫画页面和完整章节列表页，合并两者的章节（不需要章节时只加载漫画页面）"""
+    if fields is not None and 'chapters' not in fields:
+        return await get_manga_info_with_playwright(manga_url, fields)
+    (manga_info, chapters), list_chapters = await asyncio.gather(
+        get_manga_info_with_playwright(manga_url, fields),
+        get_chapters_from_list_page(get_chapter_list_url(manga_url))
+    )
+    if list_chapters:
+        logger.info(f"章节列表页找到 {len(list_chapters)} 个章节，漫画页面找到 {len(chapters)} 个章节")
+        chapters = build_chapter_list(list_chapters, chapters)
+        manga_info = manga_info or {}
+    return manga_info, chapters
+
 @app.get("/api/manga/chapter/{manga_path}")
-async def get_manga_chapters(manga_path: str):
+async def get_manga_chapters(manga_path: str, fields: Optional[str] = None):
+    """获取漫画信息和章节列表
+
+    fields 为逗号分隔的字段名（cover,title,status,author,type,description,chapters），
+    指定时只提取和返回这些字段，不需要章节时不请求章节列表页；只有完整结果才写入数据库。
+    """
+    try:
+        requested = resolve_fields('manga', fields)
+    except ValueError as e:
+        return {"code": 400, "message": str(e), "data": None}
     try:
         # 获取章节列表
-        chapters = await get_manga_info_with_cloudscraper(f"https://g-mh.org/manga/{manga_path}")
+        chapters = await get_manga_info_with_cloudscraper(f"https://g-mh.org/manga/{manga_path}", requested)
         
-        if not chapters[0] and not chapters[1]:
-            chapters = await get_manga_info_with_playwright(f"https://g-mh.org/manga/{manga_path}")
+        if not chapters[0] and not chapters[1] and layout_monitor.allow_fallback('manga'):
+            chapters = await get_manga_detail_with_playwright(f"https://g-mh.org/manga/{manga_path}", requested)
         
         manga_info, chapter_list = chapters
         
@@ -2058,36 +1219,132 @@ async def get_manga_chapters(manga_path: str):
             cover=manga_info.get("cover", "")
         )
         
-        # 保存 manga 信息
-        await db_manager.save_manga(manga, manga_path)
+        # 保存 manga 信息（部分字段的结果会用空值覆盖已保存的信息，不写入）
+        if requested is None:
+            await db_manager.save_manga(manga, manga_path)
         
-        # 删除旧的章节数据
-        await db_manager.db[MONGO_COLLECTION_CHAPTERS].delete_many({"manga_id": manga_path})
+        want_chapters = requested is None or 'chapters' in requested
+        if want_chapters:
+            # 分批写入新的章节数据（order 为排序后的位置），完成后删除不在新列表中的旧章节
+            await db_manager.replace_chapters(manga_path, chapter_list, CHAPTER_STREAM_CONFIG['db_batch_size'])
         
-        # 保存新的章节数据
-        for i, chapter in enumerate(chapter_list, 1):
-            chapter_data = ChapterInfo(
-                manga_id=manga_path,
-                chapter_id=f"{manga_path}_chapter_{i}",
-                title=chapter.get("title", ""),
-                link=chapter.get("link", "").replace("/manga/", ""),
-                order=i
-            )
-            await db_manager.save_chapter(chapter_data)
-        
-        result = {
-            "manga_info": manga.dict(),
-            "chapters": chapter_list
-        }
+        # 只序列化请求的字段
+        if requested is None:
+            result = {"manga_info": manga.dict(), "chapters": to_dicts(chapter_list)}
+        else:
+            result = {}
+            info_fields = [name for name in requested if name != 'chapters']
+            if info_fields:
+                result["manga_info"] = manga.dict(include={'manga_id', *info_fields})
+            if want_chapters:
+                result["chapters"] = to_dicts(chapter_list)
         
         return {"code": 200, "message": "success", "data": result}
     except Exception as e:
         logger.error(f"Error in get_manga_chapters: {str(e)}")
         return {"code": 500, "message": str(e)}
 
+async def stream_chapter_list(chapter_list_url: str,
+                              parser: ChapterStreamParser) -> AsyncGenerator[List[ChapterRef], None]:
+    """边下载边解析章节列表页，每解析完一块响应产出其中的章节，全部章节保存在 parser.chapters 中
+
+    下载在线程中进行（cloudscraper 是同步接口），通过有界队列把响应块交给事件循环解析，
+    解析跟不上时下载线程等待；调用方提前结束时通知下载线程停止并关闭连接。
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=CHAPTER_STREAM_CONFIG['queue_chunks'])
+    chunk_size = CHAPTER_STREAM_CONFIG['read_chunk_kb'] * 1024
+    stopped = threading.Event()
+
+    def put(item):
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def download():
+        try:
+            scraper = cloudscraper.create_scraper(
+                browser={
+                    'browser': 'chrome',
+                    'platform': 'darwin',
+                    'desktop': True,
+                    'custom': 'Chrome/131.0.0.0'
+                }
+            )
+            with scraper.get(chapter_list_url, allow_redirects=True, timeout=30, stream=True) as response:
+                if response.status_code != 200:
+                    raise Exception(f"章节列表页面请求失败，状态码: {response.status_code}")
+                put(('content_type', response.headers.get('content-type')))
+                for chunk in response.iter_content(chunk_size):
+                    if stopped.is_set():
+                        return
+                    put(('chunk', chunk))
+            put(('done', None))
+        except Exception as e:
+            if not stopped.is_set():
+                put(('error', e))
+
+    producer = loop.run_in_executor(None, download)
+    try:
+        while True:
+            kind, value = await queue.get()
+            if kind == 'content_type':
+                parser.content_type = value
+            elif kind == 'chunk':
+                chapters = parser.feed(value)
+                if chapters:
+                    yield chapters
+            elif kind == 'error':
+                raise value
+            else:
+                chapters = parser.close()
+                if chapters:
+                    yield chapters
+                break
+    finally:
+        stopped.set()
+        # 腾出队列空间，让阻塞在 put 上的下载线程能看到停止标记
+        while not queue.empty():
+            queue.get_nowait()
+        await producer
+
+@app.get("/api/manga/chapter/{manga_path}/stream")
+async def stream_manga_chapters(manga_path: str):
+    """流式返回章节列表（NDJSON，每行一个章节，最后一行为汇总）
+
+    章节按章节列表页中的顺序边解析边返回（只含 title 和 link）；列表完整后与
+    /api/manga/chapter/{manga_path} 一样按章节序号排序、确定 order 并写入数据库，
+    中途失败时不改动已保存的章节。
+    """
+    chapter_list_url = get_chapter_list_url(f"https://g-mh.org/manga/{manga_path}")
+
+    async def generate() -> AsyncGenerator[str, None]:
+        parser = ChapterStreamParser()
+        try:
+            async for chapters in stream_chapter_list(chapter_list_url, parser):
+                yield '\n'.join(
+                    json.dumps({'title': chapter.title, 'link': chapter.link}, ensure_ascii=False)
+                    for chapter in chapters
+                ) + '\n'
+            chapter_list = build_chapter_list(parser.chapters)
+            if chapter_list:
+                await db_manager.replace_chapters(manga_path, chapter_list, CHAPTER_STREAM_CONFIG['db_batch_size'])
+            total = len(chapter_list)
+            summary = {'code': 200 if total else 404, 'message': 'success' if total else '未找到章节', 'total': total}
+            if parser.reselected:
+                # 流式返回的章节与最终结果不一致，以数据库和 /api/manga/chapter/{manga_path} 为准
+                summary['reselected'] = True
+        except Exception as e:
+            logger.error(f"流式获取章节列表时出错: {str(e)}")
+            summary = {'code': 500, 'message': str(e), 'total': parser.count}
+        summary['timestamp'] = int(datetime.now().timestamp())
+        yield json.dumps(summary, ensure_ascii=False) + '\n'
+
+    return StreamingResponse(generate(), media_type='application/x-ndjson')
+
 @app.get("/api/stats")
 async def get_server_stats():
     """获取服务器性能统计信息"""
+    # 启用进程池时 API 进程不使用本地浏览器，浏览器相关统计在各工作进程的统计中
+    local_browser = not browser_worker_pool.started
     return {
         'code': 200,
         'message': 'success',
@@ -2099,111 +1356,40 @@ async def get_server_stats():
                 'min': MIN_CONCURRENT_REQUESTS
             },
             'queue_size': request_queue.qsize(),
-            'cache_stats': cache.get_stats()
+            'cache_stats': cache.get_stats(),
+            'resource_blocking': resource_policy.get_stats() if local_browser else None,
+            'asset_cache': asset_cache.get_stats() if local_browser else None,
+            'static_render': static_render_selector.get_stats() if local_browser else None,
+            'debug_capture': debug_capture.get_stats(),
+            'selectors': get_selector_stats(),
+            'parse_pool': parse_pool.get_stats(),
+            'layout': layout_monitor.get_stats(),
+            'browser': browser_manager.get_stats() if local_browser else None,
+            'browser_workers': await browser_worker_pool.get_stats()
         },
         'timestamp': int(datetime.now().timestamp())
     }
 
-# 修改CacheManager类以支持命中统计
-class CacheManager:
-    def __init__(self, ttl=86400):  # 默认缓存时间改为24小时
-        self.cache = {}
-        self.ttl = ttl
-        self.hits = 0
-        self.misses = 0
-        self.lock = Lock()
-        
-    def get(self, key: str) -> Any:
-        """获取缓存数据，带过期检查"""
-        with self.lock:
-            if key in self.cache:
-                data, timestamp = self.cache[key]
-                if time.time() - timestamp <= self.ttl:
-                    self.hits += 1
-                    logger.debug(f"缓存命中: {key}")
-                    return data
-                else:
-                    logger.debug(f"缓存过期: {key}")
-                    del self.cache[key]
-            self.misses += 1
-            logger.debug(f"缓存未命中: {key}")
-            return None
+@app.get("/api/admin/traces")
+async def list_traces():
+    """列出已保存的慢导航 trace"""
+    return {
+        'code': 200,
+        'message': 'success',
+        'data': {
+            'stats': trace_recorder.get_stats(),
+            'traces': trace_recorder.list_traces()
+        },
+        'timestamp': int(datetime.now().timestamp())
+    }
 
-    def set(self, key: str, value: Any) -> None:
-        """设置缓存数据"""
-        with self.lock:
-            self.cache[key] = (value, time.time())
-            logger.debug(f"设置缓存: {key}")
-
-    def clear(self) -> None:
-        """清除所有缓存"""
-        with self.lock:
-            self.cache.clear()
-            self.hits = 0
-            self.misses = 0
-            logger.info("清除所有缓存")
-            
-    def remove_expired(self) -> None:
-        """移除过期的缓存项"""
-        with self.lock:
-            current_time = time.time()
-            expired_keys = [
-                key for key, (_, timestamp) in self.cache.items()
-                if current_time - timestamp > self.ttl
-            ]
-            for key in expired_keys:
-                del self.cache[key]
-            if expired_keys:
-                logger.info(f"移除 {len(expired_keys)} 个过期缓存项")
-                
-    def get_stats(self) -> dict:
-        """获取缓存统计信息"""
-        with self.lock:
-            total_requests = self.hits + self.misses
-            hit_rate = (self.hits / total_requests * 100) if total_requests > 0 else 0
-            return {
-                'size': len(self.cache),
-                'hits': self.hits,
-                'misses': self.misses,
-                'hit_rate': f"{hit_rate:.2f}%",
-                'total_requests': total_requests
-            }
-            
-    async def warm_up(self):
-        """预热缓存"""
-        try:
-            logger.info("开始预热缓存...")
-            # 获取首页数据
-            home_data = await get_page_content_with_cloudscraper()
-            if not home_data:
-                logger.info("使用 Cloudscraper 预热失败，尝试使用 Playwright...")
-                home_data = await get_page_content_with_playwright()
-                
-            if home_data and any([
-                home_data.get('updates'),
-                home_data.get('hot_updates'),
-                home_data.get('popular_manga'),
-                home_data.get('new_manga')
-            ]):
-                self.set('home_page', home_data)
-                logger.info("缓存预热成功")
-                
-                # 预热热门漫画数据
-                hot_updates = home_data.get('hot_updates', [])
-                for manga in hot_updates[:5]:  # 只预热前5个热门漫画
-                    if 'link' in manga:
-                        manga_path = manga['link'].replace('https://g-mh.org/manga/', '')
-                        manga_info, chapters = await get_manga_info_with_cloudscraper(f"https://g-mh.org/manga/{manga_path}")
-                        if manga_info or chapters:
-                            self.set(f'chapters_{manga_path}', {
-                                'manga_info': manga_info,
-                                'chapters': chapters
-                            })
-                            logger.info(f"预热漫画数据: {manga_path}")
-            else:
-                logger.warning("缓存预热失败：未获取到有效数据")
-        except Exception as e:
-            logger.error(f"缓存预热时出错: {str(e)}")
+@app.get("/api/admin/traces/{trace_name}")
+async def download_trace(trace_name: str):
+    """下载 trace 文件，使用 `playwright show-trace <文件>` 查看"""
+    path = trace_recorder.trace_path(trace_name)
+    if not path:
+        raise HTTPException(status_code=404, detail="trace 不存在")
+    return FileResponse(path, media_type='application/zip', filename=os.path.basename(path))
 
 # 添加中间件来记录请求处理时间
 @app.middleware("http")
@@ -2259,11 +1445,8 @@ async def get_chapter_content_with_cloudscraper(chapter_url: str) -> Tuple[List[
         # 检查是否需要解决 Turnstile
         if response.status_code == 403 or 'cf_clearance' not in scraper.cookies:
             logger.info("检测到需要解决 Turnstile 验证...")
-            # 创建 Turnstile 解决器
-            solver = TurnstileSolver(headless=True, debug=True)  # 确保使用无头模式
-            
-            # 获取验证结果
-            result = await solver.solve(chapter_url)
+            # 在浏览器池中解决 Turnstile 并获取验证结果
+            result = await browser_worker_pool.run('solve_turnstile', url=chapter_url)
             
             # 注释掉有问题的代码
             # if not result or 'cf_clearance' not in result.get('cookies', {}):
@@ -2283,52 +1466,22 @@ async def get_chapter_content_with_cloudscraper(chapter_url: str) -> Tuple[List[
         logger.info(f"响应内容预览: {response.text[:1000]}")
 
         if response.status_code == 200:
-            # 保存响应内容用于调试
-            debug_file = os.path.join(DATA_DIR, 'cloudscraper_chapter_debug.html')
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(response.text)
-            logger.info(f"调试内容已保存到: {debug_file}")
-
-            # 使用 lxml 解析 HTML
+            # 解析 HTML，一次提取图片和导航链接
             logger.info("开始解析HTML内容...")
-            tree = html.fromstring(response.content)
-            
-            # 提取图片 URL
-            logger.info("开始提取图片URL...")
-            image_elements = tree.xpath('//div[@class="imglist"]//img')
-            image_urls = []
-            for img in image_elements:
-                img_url = img.get('src', '')
-                if img_url:
-                    image_urls.append(img_url)
-                    logger.info(f"找到图片URL: {img_url}")
-            logger.info(f"总共找到 {len(image_urls)} 张图片")
-
-            # 提取导航链接
-            logger.info("开始提取导航链接...")
-            prev_chapter = None
-            next_chapter = None
-            
-            prev_link = tree.xpath('//a[@class="prev"]/@href')
-            if prev_link:
-                prev_chapter = prev_link[0].replace('https://g-mh.org/', '')
-                logger.info(f"找到上一章链接: {prev_chapter}")
-
-            next_link = tree.xpath('//a[@class="next"]/@href')
-            if next_link:
-                next_chapter = next_link[0].replace('https://g-mh.org/', '')
-                logger.info(f"找到下一章链接: {next_chapter}")
-
-            # 保存提取结果到调试文件
-            debug_result = {
-                'image_urls': image_urls,
-                'prev_chapter': prev_chapter,
-                'next_chapter': next_chapter
-            }
-            debug_result_file = os.path.join(DATA_DIR, 'cloudscraper_chapter_result.json')
-            with open(debug_result_file, 'w', encoding='utf-8') as f:
-                json.dump(debug_result, f, ensure_ascii=False, indent=2)
-            logger.info(f"提取结果已保存到: {debug_result_file}")
+            chapter_data = await parse_pool.extract('chapter', response.content, response.headers.get('content-type'))
+            image_urls = chapter_data['images']
+            prev_chapter = chapter_data.get('prev_chapter')
+            next_chapter = chapter_data.get('next_chapter')
+            logger.info(f"总共找到 {len(image_urls)} 张图片，上一章: {prev_chapter}，下一章: {next_chapter}")
+
+            # 按采样或提取失败保存响应内容和提取结果用于调试
+            if debug_capture.should_capture(failed=not image_urls):
+                debug_capture.write('cloudscraper_chapter.html', response.text)
+                debug_capture.write('cloudscraper_chapter_result.json', {
+                    'image_urls': image_urls,
+                    'prev_chapter': prev_chapter,
+                    'next_chapter': next_chapter
+                })
 
             return image_urls, prev_chapter, next_chapter
         else:
@@ -2346,9 +1499,7 @@ async def get_chapter_content_with_playwright(chapter_url: str) -> Tuple[List[st
     """使用 Playwright 获取章节内容"""
     try:
         logger.info("初始化内容提取器...")
-        extractor = ContentExtractor(debug=True, headless=True)
-        
-        result = await extractor.extract_content(chapter_url)
+        result = await browser_worker_pool.run('extract_content', url=chapter_url)
         
         if result:
             images = result.get('images', [])
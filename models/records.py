@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+# 提取结果使用的紧凑记录
+# 使用 __slots__ 的 dataclass，没有每个实例的 __dict__ 和 pydantic 校验开销；
+# 上千章的章节列表、每章上百张图片都按记录保存和缓存，写库和返回时再转换为 dict/BSON 文档。
+# API 响应统一经 to_dicts 转换（不交给 FastAPI 按 dataclasses.asdict 递归转换），
+# to_dict 的字段与改用记录之前提取器返回的 dict 一致：提取不到的可选字段（空字符串、没有名次）不出现
+
+
+@dataclass(slots=True)
+class UpdateRecord:
+    """首页最新更新"""
+    title: str
+    link: str
+    time: str = ''
+    chapter: str = ''
+    cover: str = ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {'title': self.title, 'link': self.link}
+        if self.time:
+            record['time'] = self.time
+        if self.chapter:
+            record['chapter'] = self.chapter
+        if self.cover:
+            record['cover'] = self.cover
+        return record
+
+
+@dataclass(slots=True)
+class MangaCard:
+    """首页栏目和搜索结果中的漫画卡片，rank 只在排行榜中有值"""
+    title: str
+    link: str
+    cover: str = ''
+    rank: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {'title': self.title, 'link': self.link}
+        if self.cover:
+            record['cover'] = self.cover
+        if self.rank is not None:
+            record['rank'] = self.rank
+        return record
+
+
+@dataclass(slots=True)
+class ChapterRef:
+    """章节引用，link 为 /manga/ 之后的相对路径，order 为排序后的位置（从 1 开始，只写入数据库）"""
+    title: str
+    link: str
+    order: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'title': self.title, 'link': self.link}
+
+    def chapter_id(self, manga_id: str) -> str:
+        return f'{manga_id}_chapter_{self.order}'
+
+    def to_document(self, manga_id: str, now: datetime) -> Dict[str, Any]:
+        """章节集合中的文档（字段与 models.manga.ChapterInfo 一致）"""
+        return {
+            'manga_id': manga_id,
+            'chapter_id': self.chapter_id(manga_id),
+            'title': self.title,
+            'link': self.link,
+            'order': self.order,
+            'updated_at': now
+        }
+
+
+@dataclass(slots=True)
+class ImageRef:
+    """章节图片引用"""
+    url: str
+    order: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'url': self.url, 'order': self.order}
+
+    def to_document(self, manga_id: str, chapter_id: str, now: datetime) -> Dict[str, Any]:
+        """图片集合中的文档（字段与 models.manga.Image 一致），image_id 由章节和页码确定"""
+        return {
+            'image_id': f'{chapter_id}_{self.order}',
+            'chapter_id': chapter_id,
+            'manga_id': manga_id,
+            'url': self.url,
+            'order': self.order,
+            'updated_at': now
+        }
+
+
+RECORD_TYPES = (UpdateRecord, MangaCard, ChapterRef, ImageRef)
+
+
+def to_dicts(records: Optional[Iterable[Any]]) -> List[Dict[str, Any]]:
+    """记录列表转换为 API 响应中的 dict 列表"""
+    return [record.to_dict() for record in records or ()]
+
+
+def to_jsonable(value: Any) -> Any:
+    """json.dumps 的 default 钩子：记录转换为 dict"""
+    if isinstance(value, RECORD_TYPES):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,32 @@
+from extractors.chapter_list import ChapterListBuilder, build_chapter_list, chapter_number
+from models.records import ChapterRef
+
+
+def _chapter(title, number=None, prefix='32382-046010880'):
+    link = f'abc/{prefix}-{number}' if number is not None else f'abc/{title}'
+    return ChapterRef(title=title, link=link)
+
+
+def test_chapter_number():
+    assert chapter_number('/manga/abc/32382-046010880-12') == 12
+    assert chapter_number('/manga/abc/extra') == 0
+    assert chapter_number('') == 0
+
+
+def test_dedup_keeps_first_seen():
+    builder = ChapterListBuilder()
+    assert builder.add(_chapter('第1话', 1))
+    assert not builder.add(_chapter('第1话（重复）', 1))
+    assert not builder.add(ChapterRef(title='空链接', link=''))
+    assert builder.extend([_chapter('第2话', 2), _chapter('第2话（重复）', 2)]) == 1
+    assert [chapter.title for chapter in builder.build()] == ['第1话', '第2话']
+
+
+def test_sort_is_stable():
+    # 没有序号的章节序号都为 0，排在最前并保持加入顺序；序号相同的章节同样保持加入顺序
+    chapters = build_chapter_list(
+        [_chapter('第3话', 3), _chapter('番外B'), _chapter('第1话', 1)],
+        [_chapter('番外A'), _chapter('第1话（重复）', 1), _chapter('第2话', 2), _chapter('第2话（另一源）', 2, '99999')]
+    )
+    assert [chapter.title for chapter in chapters] == ['番外B', '番外A', '第1话', '第2话', '第2话（另一源）', '第3话']
+    assert [chapter.order for chapter in chapters] == [1, 2, 3, 4, 5, 6]
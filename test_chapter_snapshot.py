@@ -0,0 +1,29 @@
+from config.settings import DOM_SNAPSHOT_CONFIG
+from utils.dom_snapshot import wrap_snapshot
+from utils.parse_pool import extract_document
+
+# 章节页的图片容器和翻页链接，快照脚本会按 DOM_SNAPSHOT_CONFIG['chapter'] 收集这些子树
+IMGLIST = (
+    '<div class="imglist">'
+    '<img src="https://g-mh.online/hp/abc/0001.webp">'
+    '<img data-src="https://g-mh.online/hp/abc/0002.webp">'
+    '<img src="https://g-mh.online/hp/logo.png">'
+    '</div>'
+)
+PREV = '<a class="prev" href="https://g-mh.org/manga/abc/100">上一章</a>'
+NEXT = '<a class="next" href="https://g-mh.org/manga/abc/102">下一章</a>'
+
+
+def test_chapter_snapshot_selectors_cover_imglist():
+    assert 'div.imglist' in DOM_SNAPSHOT_CONFIG['chapter']
+
+
+def test_chapter_snapshot_extracts_images():
+    document = wrap_snapshot('第101话', [PREV, IMGLIST, NEXT])
+    result = extract_document('chapter', document)
+    assert result['images'] == [
+        'https://g-mh.online/hp/abc/0001.webp',
+        'https://g-mh.online/hp/abc/0002.webp'
+    ]
+    assert result['prev_chapter'] == 'manga/abc/100'
+    assert result['next_chapter'] == 'manga/abc/102'
@@ -0,0 +1,57 @@
+from extractors.chapter_stream import ChapterStreamParser, iter_chapters
+from extractors.selector_registry import SELECTOR_REGISTRY
+from utils.parse_pool import extract_document
+
+
+def _chapter_list_page(count):
+    links = ''.join(
+        f'<li><a href="/manga/abc/32382-046010880-{i}" title="第{i}话">第{i}话 标题{"很长" * 20}</a></li>'
+        for i in range(1, count + 1)
+    )
+    return (f'<html><head><meta charset="utf-8"><title>章节列表</title></head><body>'
+            f'<div class="chapter-items"><ul>{links}</ul></div></body></html>').encode('utf-8')
+
+
+def _chunks(content, size):
+    return [content[start:start + size] for start in range(0, len(content), size)]
+
+
+def _stream(content, size):
+    parser = ChapterStreamParser('text/html; charset=utf-8')
+    chapters = []
+    for chunk in _chunks(content, size):
+        chapters.extend(parser.feed(chunk))
+    chapters.extend(parser.close())
+    return parser, chapters
+
+
+def test_chunked_matches_full_parse():
+    # 超过 _MIN_COLLECT_BYTES，覆盖按比例间隔求值和跨块截断的链接
+    content = _chapter_list_page(1500)
+    expected = extract_document('chapter_list', content, 'text/html; charset=utf-8', ['chapters'])['chapters']
+    assert len(expected) == 1500
+    for size in (7, 1024, 64 * 1024, len(content)):
+        parser, chapters = _stream(content, size)
+        assert chapters == expected
+        assert parser.chapters == expected
+        assert not parser.reselected
+
+
+def test_iter_chapters_yields_all_batches():
+    content = _chapter_list_page(200)
+    expected = extract_document('chapter_list', content, None, ['chapters'])['chapters']
+    batches = list(iter_chapters(_chunks(content, 4096)))
+    assert all(batches)
+    assert [chapter for batch in batches for chapter in batch] == expected
+
+
+def test_reselects_earlier_selector_at_close(monkeypatch):
+    # chapter-list 声明在 chapter-items 之前，但出现在文档后部：流式结果在结束时改为与整页提取一致。
+    # 两个选择器都有匹配时整页提取的结果取决于自适应排序，这里按声明顺序比较
+    monkeypatch.setattr(SELECTOR_REGISTRY['chapter_list'].parts['chapters'].candidates, 'adaptive', False)
+    late = ''.join(f'<a href="/manga/abc/late-{i}">第{i}话</a>' for i in range(1, 4))
+    content = _chapter_list_page(50).replace(b'</body>', f'<div class="chapter-list">{late}</div></body>'.encode())
+    expected = extract_document('chapter_list', content, None, ['chapters'])['chapters']
+    parser, _ = _stream(content, 512)
+    assert parser.reselected
+    assert parser.chapters == expected
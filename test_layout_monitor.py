@@ -0,0 +1,70 @@
+from utils.html_parser import parse_html
+from utils.layout_monitor import CHALLENGE_LAYOUT, EMPTY_LAYOUT, LayoutMonitor, layout_fingerprint
+
+CONFIG = {
+    'enabled': True,
+    'drift_threshold': 2,
+    'probe_interval': 300,
+    'known_fingerprints': 8,
+    'required_fields': {'chapter': ['images']}
+}
+
+
+def _fingerprint(body):
+    return layout_fingerprint(parse_html(f'<html><head><title>第1话</title></head><body>{body}</body></html>'))
+
+
+def _chapter_page(image, title='第1话'):
+    return f'<main><h1>{title}</h1><div class="imglist"><img src="{image}"></div><div class="nav"><a>下一章</a></div></main>'
+
+
+def test_same_skeleton_same_fingerprint():
+    # 文字、属性和图片地址不参与计算
+    assert _fingerprint(_chapter_page('a.webp')) == _fingerprint(_chapter_page('b.webp', '第2话'))
+    # 区块增删改变指纹
+    assert _fingerprint(_chapter_page('a.webp')) != _fingerprint('<main><div class="reader"><img></div></main>')
+
+
+def test_special_fingerprints():
+    assert layout_fingerprint(None) == EMPTY_LAYOUT
+    challenge = parse_html('<html><head><title>Just a moment...</title></head><body><div></div></body></html>')
+    assert layout_fingerprint(challenge) == CHALLENGE_LAYOUT
+
+
+def test_known_skeleton_is_not_drift():
+    monitor = LayoutMonitor(CONFIG)
+    fingerprint = _fingerprint(_chapter_page('a.webp'))
+    monitor.observe('chapter', fingerprint, {'images': ['a.webp']})
+    # 已知布局下字段为空属于内容本身
+    for _ in range(5):
+        monitor.observe('chapter', fingerprint, {'images': []})
+    assert not monitor.is_degraded('chapter')
+    assert monitor.allow_fallback('chapter')
+    assert monitor.get_stats()['page_types']['chapter']['drift_events'] == 0
+
+
+def test_changed_skeleton_is_flagged():
+    monitor = LayoutMonitor(CONFIG)
+    monitor.observe('chapter', _fingerprint(_chapter_page('a.webp')), {'images': ['a.webp']})
+    changed = _fingerprint('<main><div class="reader"><img></div></main>')
+    monitor.observe('chapter', changed, {'images': []})
+    assert not monitor.is_degraded('chapter')
+    monitor.observe('chapter', changed, {'images': []})
+    assert monitor.is_degraded('chapter')
+    # 降级后回退只按探测间隔放行
+    assert not monitor.allow_fallback('chapter')
+    stats = monitor.get_stats()
+    assert stats['degraded'] == ['chapter']
+    assert stats['page_types']['chapter']['drift_events'] == 1
+    assert stats['page_types']['chapter']['skipped_fallbacks'] == 1
+    # 新布局提取完整后解除降级
+    monitor.observe('chapter', changed, {'images': ['a.webp']})
+    assert not monitor.is_degraded('chapter')
+
+
+def test_challenge_pages_do_not_count():
+    monitor = LayoutMonitor(CONFIG)
+    for _ in range(5):
+        monitor.observe('chapter', CHALLENGE_LAYOUT, {'images': []})
+    assert not monitor.is_degraded('chapter')
+    assert monitor.get_stats()['page_types']['chapter']['challenges'] == 5
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from extractors.selector_registry import SELECTOR_REGISTRY, ItemList
+from models.records import ChapterRef, ImageRef, MangaCard, UpdateRecord, to_dicts, to_jsonable
+from utils.html_parser import parse_html
+
+HOME = '''<html><head><title>首页</title></head><body>
+<a class="slicarda" href="/manga/abc">
+  <img class="slicardimg" src="https://cncover.godamanga.online/abc.jpg">
+  <h3 class="slicardtitle">漫画A</h3><p class="slicardtagp">3分钟前</p><p class="slicardtitlep">第12话</p>
+</a>
+<a class="slicarda" href="/manga/def"><h3 class="slicardtitle">漫画B</h3></a>
+<div class="hot-updates">
+  <div class="manga-item"><a href="/manga/abc"><img src="https://cncover.godamanga.online/abc.jpg"><h3>漫画A</h3></a></div>
+  <div class="manga-item"><a href="/manga/def"><h3>漫画B</h3></a></div>
+</div>
+<div class="rank-section">
+  <div class="manga-item"><a href="/manga/abc"><img src="https://cncover.godamanga.online/abc.jpg"><h3>漫画A</h3></a></div>
+  <div class="manga-item"><a href="/manga/def"><h3>漫画B</h3></a></div>
+</div>
+</body></html>'''
+
+SEARCH = '''<html><body><div class="cardlist">
+  <div class="pb-2"><a href="/manga/abc"><img src="/covers/abc.jpg"></a><h3 class="cardtitle">漫画A</h3></div>
+  <div class="pb-2"><a href="/manga/def"></a><h3 class="cardtitle">漫画B</h3></div>
+</div></body></html>'''
+
+CHAPTER_LIST = '''<html><body><div class="chapter-list">
+  <a href="/manga/abc/32382-046010880-1">第1话</a><a href="/manga/abc/32382-046010880-2">第2话</a>
+</div></body></html>'''
+
+CASES = [
+    ('home', HOME, 'updates'),
+    ('home', HOME, 'hot_updates'),
+    ('home', HOME, 'popular_manga'),
+    ('search', SEARCH, 'manga_list'),
+    ('chapter_list', CHAPTER_LIST, 'chapters')
+]
+
+
+def _as_dicts(items: ItemList) -> ItemList:
+    """同一列表项定义不指定记录类型，得到改用记录之前提取器返回的 dict"""
+    return ItemList(items.name, items.candidates.expressions, items.fields, items.required,
+                    items.rank, items.unique)
+
+
+@pytest.mark.parametrize('page_type, html, name', CASES)
+def test_to_dict_matches_old_dicts(page_type, html, name):
+    items = SELECTOR_REGISTRY[page_type].parts[name]
+    tree = parse_html(html)
+    records = items.extract(tree)
+    expected = _as_dicts(items).extract(tree)
+    assert len(records) == 2
+    assert to_dicts(records) == expected
+
+
+def test_record_dicts():
+    assert UpdateRecord('漫画A', 'https://g-mh.org/manga/abc', '3分钟前', '第12话', 'c.jpg').to_dict() == \
+        {'title': '漫画A', 'link': 'https://g-mh.org/manga/abc', 'time': '3分钟前', 'chapter': '第12话', 'cover': 'c.jpg'}
+    assert MangaCard('漫画A', 'https://g-mh.org/manga/abc', 'c.jpg', rank=1).to_dict() == \
+        {'title': '漫画A', 'link': 'https://g-mh.org/manga/abc', 'cover': 'c.jpg', 'rank': 1}
+    # order 只写入数据库，不出现在 API 响应中
+    assert ChapterRef('第1话', 'abc/1', order=3).to_dict() == {'title': '第1话', 'link': 'abc/1'}
+    assert ImageRef('https://g-mh.online/hp/abc/1.webp', 1).to_dict() == \
+        {'url': 'https://g-mh.online/hp/abc/1.webp', 'order': 1}
+    assert to_dicts(None) == []
+
+
+def test_to_jsonable():
+    data = {'chapters': [ChapterRef('第1话', 'abc/1', order=1)], 'cover': MangaCard('漫画A', 'abc')}
+    assert json.loads(json.dumps(data, default=to_jsonable)) == \
+        {'chapters': [{'title': '第1话', 'link': 'abc/1'}], 'cover': {'title': '漫画A', 'link': 'abc'}}
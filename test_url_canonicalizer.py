@@ -0,0 +1,67 @@
+from urllib.parse import quote
+
+import pytest
+
+from config.settings import URL_CANONICAL_CONFIG
+from utils.url_canonicalizer import CanonicalUrl, UrlCanonicalizer, url_canonicalizer
+
+
+def test_role_lookup():
+    assert url_canonicalizer.role('g-mh.org') == 'site'
+    assert url_canonicalizer.role('www.g-mh.org') == 'site'
+    # 域名/首段路径 优先于域名，首段不匹配时没有角色
+    assert url_canonicalizer.role('g-mh.online', '/hp/abc/1.webp') == 'image'
+    assert url_canonicalizer.role('g-mh.online', '/other/1.webp') is None
+    # 配置的子域名优先于上级域名
+    assert url_canonicalizer.role('cncover.godamanga.online') == 'cover'
+    assert url_canonicalizer.role('img.godamanga.online') == 'image'
+    assert url_canonicalizer.role('pro-api.mgsearcher.com') == 'image_proxy'
+    assert url_canonicalizer.role('example.com') is None
+
+
+def test_site_pages():
+    assert url_canonicalizer.canonicalize('/manga/abc', 'page') == \
+        CanonicalUrl('https://g-mh.org/manga/abc', 'manga/abc')
+    assert url_canonicalizer.canonicalize('https://g-mh.org/manga/abc', 'page').display == 'manga/abc'
+    assert url_canonicalizer.canonicalize('//example.com/a', 'page') == \
+        CanonicalUrl('https://example.com/a', 'https://example.com/a')
+
+
+def test_manga_and_chapter_links():
+    expected = CanonicalUrl('https://g-mh.org/manga/abc/32382-046010880-12', 'abc/32382-046010880-12')
+    for link in ('https://g-mh.org/manga/abc/32382-046010880-12', '/manga/abc/32382-046010880-12',
+                 'manga/abc/32382-046010880-12', 'abc/32382-046010880-12'):
+        assert url_canonicalizer.canonicalize(link, 'chapter') == expected
+    # 站外链接保留完整地址
+    assert url_canonicalizer.canonicalize('https://example.com/manga/abc', 'manga').display == \
+        'https://example.com/manga/abc'
+
+
+def test_chapter_images():
+    url = 'https://g-mh.online/hp/abc/0001.webp'
+    assert url_canonicalizer.canonicalize('//g-mh.online/hp/abc/0001.webp', 'image') == CanonicalUrl(url, url)
+    assert url_canonicalizer.is_chapter_image(url)
+    assert not url_canonicalizer.is_chapter_image('https://g-mh.online/hp/logo.png')
+    assert not url_canonicalizer.is_chapter_image('https://cncover.godamanga.online/abc.jpg')
+    assert not url_canonicalizer.is_chapter_image('https://example.com/abc/0001.webp')
+    assert url_canonicalizer.chapter_images([url, '//g-mh.online/hp/abc/0001.webp', 'data:image/png;base64,x']) == [url]
+
+
+def test_covers():
+    cover = 'https://cncover.godamanga.online/abc.jpg'
+    proxied = URL_CANONICAL_CONFIG['cover_proxy'].format(url=quote(cover, safe=''))
+    assert url_canonicalizer.canonicalize(cover, 'cover') == CanonicalUrl(cover, proxied)
+    # 不是封面域名的封面地址原样展示
+    other = 'https://g-mh.online/hp/abc/cover.jpg'
+    assert url_canonicalizer.canonicalize(other, 'cover') == CanonicalUrl(other, other)
+    without_proxy = UrlCanonicalizer({**URL_CANONICAL_CONFIG, 'cover_proxy': None})
+    assert without_proxy.canonicalize(cover, 'cover').display == cover
+
+
+def test_other_schemes_and_empty():
+    assert url_canonicalizer.canonicalize('javascript:void(0)', 'chapter') == \
+        CanonicalUrl('javascript:void(0)', 'javascript:void(0)')
+    assert url_canonicalizer.canonicalize(None) == CanonicalUrl('', '')
+    assert url_canonicalizer.display(['/manga/abc', None, '/manga/abc'], 'page') == ['manga/abc', '', 'manga/abc']
+    with pytest.raises(ValueError):
+        url_canonicalizer.canonicalize_many(['/a'], 'unknown')
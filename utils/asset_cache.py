@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+from playwright.async_api import Route
+from config.settings import ASSET_CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 不写入缓存的响应头：内容已由 Playwright 解码，长度和编码需由浏览器重新计算
+_SKIPPED_HEADERS = {
+    'content-length', 'content-encoding', 'transfer-encoding', 'connection',
+    'set-cookie', 'date', 'age', 'expires', 'etag', 'last-modified'
+}
+
+
+class AssetCache:
+    """浏览器静态资源的本地磁盘缓存
+
+    在路由拦截中为站点的静态资源（按配置的资源类型，默认只有 JS）提供响应，缓存保存在磁盘上，
+    因此新建上下文、重启浏览器和其他工作进程都可以复用，不必重新下载框架包。
+    """
+    def __init__(self, config: Optional[dict] = None):
+        config = config or ASSET_CACHE_CONFIG
+        self.enabled = config.get('enabled', True)
+        self.directory = config.get('directory')
+        self.resource_types = set(config.get('resource_types', []))
+        self.hosts = tuple(config.get('hosts', []))
+        self.max_age = config.get('max_age', 7 * 24 * 3600)
+        self.max_size = config.get('max_size_mb', 200) * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_served = 0
+        self._size: Optional[int] = None  # 本进程估算的磁盘占用，首次写入时扫描目录初始化
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def cacheable(self, method: str, resource_type: str, url: str) -> bool:
+        """判断请求是否可以由缓存提供"""
+        if not self.enabled or method != 'GET' or resource_type not in self.resource_types:
+            return False
+        host = (urlsplit(url).hostname or '').lower()
+        return any(host == domain or host.endswith('.' + domain) for domain in self.hosts)
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key + '.json'), os.path.join(self.directory, key + '.body')
+
+    def _load(self, url: str) -> Optional[Tuple[dict, bytes]]:
+        """读取未过期的缓存条目"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('url') != url or time.time() - meta.get('stored_at', 0) >= self.max_age:
+                return None
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            # 更新访问时间，淘汰时按最近使用排序
+            os.utime(meta_path, None)
+            return meta, body
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, url: str, status: int, headers: dict, body: bytes):
+        """写入缓存条目，先写临时文件再替换，避免多个工作进程读到半个文件"""
+        meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url,
+            'status': status,
+            'headers': headers,
+            'stored_at': time.time(),
+            'size': len(body)
+        }
+        suffix = f'.{os.getpid()}.tmp'
+        with open(body_path + suffix, 'wb') as f:
+            f.write(body)
+        os.replace(body_path + suffix, body_path)
+        with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + suffix, meta_path)
+
+        if self._size is None:
+            self._size = self._scan()[0]
+        else:
+            self._size += len(body)
+        if self._size > self.max_size:
+            self._evict()
+
+    def _scan(self) -> Tuple[int, list]:
+        """统计缓存目录占用，返回 (总字节数, [(访问时间, 元数据路径, 大小)])"""
+        total = 0
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.directory, name)
+            try:
+                size = os.path.getsize(meta_path[:-5] + '.body')
+                entries.append((os.path.getmtime(meta_path), meta_path, size))
+                total += size
+            except OSError:
+                continue
+        return total, entries
+
+    def _evict(self):
+        """按最近使用时间淘汰条目，直到占用降到上限的 80%"""
+        total, entries = self._scan()
+        target = self.max_size * 0.8
+        for _, meta_path, size in sorted(entries):
+            if total <= target:
+                break
+            for path in (meta_path, meta_path[:-5] + '.body'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            self.evictions += 1
+        self._size = total
+
+    async def handle(self, route: Route) -> bool:
+        """尝试用缓存响应请求，返回请求是否已处理"""
+        request = route.request
+        if not self.cacheable(request.method, request.resource_type, request.url):
+            return False
+
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, self._load, request.url)
+        if cached:
+            meta, body = cached
+            self.hits += 1
+            self.bytes_served += len(body)
+            await route.fulfill(status=meta['status'], headers=meta['headers'], body=body)
+            return True
+
+        self.misses += 1
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception as e:
+            # 交回浏览器按正常网络请求处理
+            logger.debug(f"获取静态资源失败 {request.url}: {str(e)}")
+            return False
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _SKIPPED_HEADERS}
+        cache_control = response.headers.get('cache-control', '').lower()
+        if response.status == 200 and 'no-store' not in cache_control:
+            try:
+                await loop.run_in_executor(None, self._store, request.url, response.status, headers, body)
+                self.stores += 1
+            except OSError as e:
+                logger.warning(f"写入静态资源缓存失败: {str(e)}")
+        await route.fulfill(status=response.status, headers=headers, body=body)
+        return True
+
+    def get_stats(self) -> dict:
+        """获取缓存命中统计"""
+        total_requests = self.hits + self.misses
+        hit_rate = (self.hits / total_requests * 100) if total_requests > 0 else 0
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': f"{hit_rate:.2f}%",
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'bytes_served': self.bytes_served
+        }
+
+
+# 全局共享的静态资源缓存
+asset_cache = AssetCache()
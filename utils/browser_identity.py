@@ -0,0 +1,138 @@
+import os
+import time
+import random
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from config.settings import BROWSER_CONTEXT_CONFIG, BROWSER_IDENTITIES, BROWSER_IDENTITY_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 页面请求结果
+OUTCOME_SUCCESS = 'success'
+OUTCOME_CHALLENGE = 'challenge'
+OUTCOME_FAILURE = 'failure'
+
+# Cloudflare 验证页的状态码和标题特征
+_CHALLENGE_STATUSES = (403, 429, 503)
+_CHALLENGE_TITLES = ('just a moment', 'attention required', '请稍候')
+
+
+def is_challenge(status: Optional[int], title: str) -> bool:
+    """根据响应状态码和页面标题判断是否遇到了 Cloudflare 验证"""
+    title = (title or '').lower()
+    return status in _CHALLENGE_STATUSES or any(marker in title for marker in _CHALLENGE_TITLES)
+
+
+@dataclass
+class BrowserIdentity:
+    name: str
+    user_agent: str
+    platform: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    viewport: Dict[str, int] = field(default_factory=lambda: {'width': 1920, 'height': 1080})
+    locale: str = 'zh-CN'
+    timezone_id: str = 'Asia/Shanghai'
+    proxy: Optional[dict] = None
+    health: float = 1.0
+    cooldown_until: float = 0
+    successes: int = 0
+    challenges: int = 0
+    failures: int = 0
+
+    def context_options(self) -> dict:
+        """该身份的浏览器上下文配置"""
+        options = BROWSER_CONTEXT_CONFIG.copy()
+        headers = dict(BROWSER_CONTEXT_CONFIG.get('extra_http_headers', {}))
+        headers.update(self.headers)
+        headers['Accept-Language'] = f"{self.locale},{self.locale.split('-')[0]};q=0.9,en;q=0.8"
+        options.update({
+            'user_agent': self.user_agent,
+            'viewport': dict(self.viewport),
+            'locale': self.locale,
+            'timezone_id': self.timezone_id,
+            'extra_http_headers': headers
+        })
+        if self.proxy:
+            options['proxy'] = self.proxy
+        return options
+
+    def navigator_overrides(self) -> dict:
+        """注入页面的 navigator 属性，与 UA 保持一致"""
+        return {
+            'platform': self.platform,
+            'languages': [self.locale, self.locale.split('-')[0]]
+        }
+
+
+class IdentityPool:
+    """浏览器身份池
+
+    按健康度加权选择身份分摊请求：成功缓慢恢复健康度，遇到验证大幅降低；
+    低于下限的身份进入冷却并丢弃 cookies，冷却期间请求由其他身份承担。
+    """
+    def __init__(self, identities: Optional[List[dict]] = None, config: Optional[dict] = None):
+        config = config or BROWSER_IDENTITY_CONFIG
+        self.success_recovery = config.get('success_recovery', 0.2)
+        self.challenge_penalty = config.get('challenge_penalty', 0.3)
+        self.failure_penalty = config.get('failure_penalty', 0.8)
+        self.min_health = config.get('min_health', 0.2)
+        self.cooldown = config.get('cooldown', 300)
+        self.reset_health = config.get('reset_health', 0.5)
+        self.storage_dir = config.get('storage_dir')
+        self.identities: Dict[str, BrowserIdentity] = {}
+        for options in identities or BROWSER_IDENTITIES:
+            identity = BrowserIdentity(**options)
+            self.identities[identity.name] = identity
+
+    def get(self, name: str) -> BrowserIdentity:
+        return self.identities[name]
+
+    def choose(self) -> BrowserIdentity:
+        """按健康度加权随机选择一个未冷却的身份；全部冷却时选择最早结束冷却的身份"""
+        now = time.time()
+        available = [identity for identity in self.identities.values() if identity.cooldown_until <= now]
+        if not available:
+            return min(self.identities.values(), key=lambda identity: identity.cooldown_until)
+        return random.choices(available, weights=[identity.health for identity in available])[0]
+
+    def record(self, name: str, outcome: str) -> bool:
+        """记录一次请求结果，返回身份是否因此进入冷却"""
+        identity = self.identities.get(name)
+        if not identity:
+            return False
+        if outcome == OUTCOME_SUCCESS:
+            identity.successes += 1
+            identity.health += (1.0 - identity.health) * self.success_recovery
+            return False
+        if outcome == OUTCOME_CHALLENGE:
+            identity.challenges += 1
+            identity.health *= self.challenge_penalty
+        else:
+            identity.failures += 1
+            identity.health *= self.failure_penalty
+
+        if identity.health < self.min_health and identity.cooldown_until <= time.time():
+            identity.cooldown_until = time.time() + self.cooldown
+            identity.health = self.reset_health
+            logger.warning(f"浏览器身份 {name} 健康度过低，冷却 {self.cooldown} 秒")
+            return True
+        return False
+
+    def storage_state_path(self, name: str) -> str:
+        """身份 cookies（storage state）的保存路径"""
+        return os.path.join(self.storage_dir, f'{name}.json')
+
+    def get_stats(self) -> dict:
+        """获取各身份的健康度和请求统计"""
+        now = time.time()
+        return {
+            identity.name: {
+                'health': round(identity.health, 3),
+                'cooling_down': identity.cooldown_until > now,
+                'successes': identity.successes,
+                'challenges': identity.challenges,
+                'failures': identity.failures
+            }
+            for identity in self.identities.values()
+        }
@@ -0,0 +1,155 @@
+import time
+import logging
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+from utils.content_extractor import ContentExtractor
+from utils.turnstile_solver import TurnstileSolver
+from config.settings import DOM_SNAPSHOT_CONFIG
+from utils.page_readiness import wait_for_page_ready, check_page_complete
+from utils.dom_snapshot import snapshot_html
+from utils.resource_policy import resource_policy
+from utils.asset_cache import asset_cache
+from utils.static_render import static_render_selector
+from utils.debug_capture import debug_capture
+from utils.trace_recorder import trace_recorder
+from utils.navigation_metrics import navigation_histogram
+from utils.warm_navigation import NAVIGATION_CLIENT, NAVIGATION_WARM, navigation_mode, client_navigate
+from utils.browser_identity import OUTCOME_SUCCESS, OUTCOME_CHALLENGE, OUTCOME_FAILURE, is_challenge
+
+logger = logging.getLogger(__name__)
+
+
+async def render_page(manager, url: str, page_type: str, headers: Optional[Dict[str, str]] = None,
+                      debug_name: Optional[str] = None, navigation_timeout: int = 30000,
+                      snapshot: bool = False) -> Dict[str, Any]:
+    """打开页面并等待就绪，返回页面 HTML
+
+    目标内容在服务端 HTML 中的页面类型先用禁用 JavaScript 的轻量页面加载，
+    内容不完整时回退到完整浏览器。snapshot 为 True 时只返回 DOM_SNAPSHOT_CONFIG
+    中该页面类型所需子树组成的 HTML。设置 debug_name 时按调试采样规则保存整页截图。
+
+    轻量模式和回退使用同一个浏览器身份，请求结果计入该身份的健康度。
+
+    Returns:
+        dict: {'url': 最终URL, 'status': 响应状态码, 'ready': 是否就绪, 'html': 页面HTML,
+               'javascript': 是否启用JS, 'identity': 浏览器身份}
+    """
+    identity = manager.choose_identity()
+    if static_render_selector.should_try(page_type):
+        try:
+            rendered = await _render(manager, url, page_type, headers, debug_name, navigation_timeout, snapshot, identity, False)
+        except Exception as e:
+            logger.warning(f"轻量模式加载页面失败 ({page_type}): {str(e)}")
+            rendered = None
+        complete = bool(rendered and rendered['ready'])
+        static_render_selector.record(page_type, complete)
+        if complete:
+            return rendered
+        logger.info(f"轻量模式内容不完整，回退到完整浏览器 ({page_type}): {url}")
+        rendered = await _render(manager, url, page_type, headers, debug_name, navigation_timeout, snapshot, identity, True)
+        if rendered['ready']:
+            # 完整浏览器可能刚通过验证，同步 cookies 供轻量模式后续使用
+            await manager.sync_static_cookies(identity)
+        return rendered
+    return await _render(manager, url, page_type, headers, debug_name, navigation_timeout, snapshot, identity, True)
+
+
+async def _render(manager, url: str, page_type: str, headers: Optional[Dict[str, str]],
+                  debug_name: Optional[str], navigation_timeout: int, snapshot: bool,
+                  identity: str, javascript: bool) -> Dict[str, Any]:
+    page = await manager.get_page(javascript=javascript, identity=identity)
+    try:
+        if headers:
+            # UA 相关请求头由浏览器身份决定，避免与身份的指纹不一致
+            headers = {
+                name: value for name, value in headers.items()
+                if name.lower() != 'user-agent' and not name.lower().startswith('sec-ch-ua')
+            }
+            await page.set_extra_http_headers(headers)
+        traced = await trace_recorder.begin(page.context, url)
+        start_time = time.time()
+        mode = navigation_mode(page, url, javascript)
+        try:
+            if mode == NAVIGATION_CLIENT and await client_navigate(page, url, page_type):
+                # 文档已由站点返回过，客户端导航成功即视为 200
+                status, ready = 200, True
+            else:
+                if mode == NAVIGATION_CLIENT:
+                    mode = NAVIGATION_WARM
+                response = await page.goto(url, wait_until='domcontentloaded', timeout=navigation_timeout)
+                status = response.status if response else None
+                if javascript:
+                    ready = await wait_for_page_ready(page, page_type)
+                else:
+                    ready = bool(response and response.ok) and await check_page_complete(page, page_type)
+        finally:
+            elapsed_ms = (time.time() - start_time) * 1000
+            navigation_histogram.record(page_type, mode, elapsed_ms)
+            if traced:
+                await trace_recorder.end(page.context, url, elapsed_ms)
+        if ready:
+            await manager.record_outcome(page, OUTCOME_SUCCESS)
+        elif is_challenge(status, await page.title()):
+            await manager.record_outcome(page, OUTCOME_CHALLENGE)
+        elif javascript:
+            # 轻量模式内容不完整通常是页面需要脚本，不计入身份健康度
+            await manager.record_outcome(page, OUTCOME_FAILURE)
+        if debug_name and debug_capture.should_capture(failed=not ready):
+            debug_capture.write(f"{debug_name}.png", await page.screenshot(full_page=True))
+        if snapshot and page_type in DOM_SNAPSHOT_CONFIG:
+            content = await snapshot_html(page, DOM_SNAPSHOT_CONFIG[page_type])
+        else:
+            content = await page.content()
+        return {
+            'url': page.url,
+            'status': status,
+            'ready': ready,
+            'html': content,
+            'javascript': javascript,
+            'identity': identity
+        }
+    finally:
+        await manager.recycle_page(page)
+
+
+async def extract_content(manager, url: str) -> Dict[str, Any]:
+    """使用 ContentExtractor 提取章节图片和导航"""
+    extractor = ContentExtractor(debug=True, headless=True)
+    return await extractor.extract_content(url)
+
+
+async def solve_turnstile(manager, url: str) -> Optional[Dict[str, Any]]:
+    """使用 TurnstileSolver 获取验证 cookies"""
+    solver = TurnstileSolver(headless=True, debug=True)
+    result = await solver.solve(url)
+    return asdict(result) if result else None
+
+
+async def browser_stats(manager) -> Dict[str, Any]:
+    """获取执行任务的浏览器的统计信息"""
+    return {
+        'browser': manager.get_stats(),
+        'resource_blocking': resource_policy.get_stats(),
+        'asset_cache': asset_cache.get_stats(),
+        'static_render': static_render_selector.get_stats(),
+        'debug_capture': debug_capture.get_stats(),
+        'traces': trace_recorder.get_stats(),
+        'navigation': navigation_histogram.get_stats()
+    }
+
+
+# 浏览器任务类型 -> 处理函数，处理函数的参数和返回值都必须可以 pickle
+BROWSER_JOB_HANDLERS = {
+    'render_page': render_page,
+    'extract_content': extract_content,
+    'solve_turnstile': solve_turnstile,
+    'stats': browser_stats
+}
+
+
+async def execute_browser_job(manager, job_type: str, params: Dict[str, Any]) -> Any:
+    """使用给定的 BrowserManager 执行一个浏览器任务"""
+    handler = BROWSER_JOB_HANDLERS.get(job_type)
+    if not handler:
+        raise ValueError(f"未知的浏览器任务类型: {job_type}")
+    return await handler(manager, **params)
@@ -1,178 +1,331 @@
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+import os
+import json
 import logging
 import asyncio
-from config.settings import BROWSER_CONFIG, BROWSER_CONTEXT_CONFIG, DEFAULT_HEADERS
+from typing import Dict, Optional, Tuple
+from config.settings import BROWSER_CONFIG
+from utils.resource_policy import resource_policy
+from utils.browser_supervisor import BrowserSupervisor
+from utils.browser_identity import BrowserIdentity, IdentityPool
+from utils.trace_recorder import trace_recorder
+from utils.warm_navigation import keep_warm
 
 logger = logging.getLogger(__name__)
 
 class BrowserManager:
     def __init__(self):
         self.browser: Browser = None
-        self.context: BrowserContext = None
         self.playwright = None
         self.max_retries = 3
         self.retry_delay = 0.5  # 减少重试延迟
         self._lock = asyncio.Lock()
         self._page_pool = []  # 页面池
         self.max_pool_size = 5  # 最大页面池大小
+        self.identities = IdentityPool()
+        # 各身份的上下文 {(身份名, 是否启用JS): BrowserContext}，禁用 JS 的为轻量上下文
+        self.contexts: Dict[Tuple[str, bool], BrowserContext] = {}
+        self._context_keys: Dict[BrowserContext, Tuple[str, bool]] = {}
+        self._pages_in_use = {}  # 各上下文已借出的页面数 {BrowserContext: int}
+        self._retiring_contexts = []  # 已回收、等待借出页面归还后关闭的上下文
+        self.closing = False  # 主动关闭浏览器时置位，避免被当作崩溃重启
+        self.supervisor = BrowserSupervisor(self)
         
     async def init_browser(self) -> Browser:
         """初始化浏览器实例"""
         async with self._lock:
-            for attempt in range(self.max_retries):
-                try:
+            return await self._ensure_browser()
+
+    async def _ensure_browser(self) -> Browser:
+        """启动浏览器（调用方需持有 self._lock）"""
+        for attempt in range(self.max_retries):
+            try:
+                if not self.playwright:
+                    self.playwright = await async_playwright().start()
                     if not self.playwright:
-                        self.playwright = await async_playwright().start()
-                        if not self.playwright:
-                            raise Exception("无法初始化playwright")
+                        raise Exception("无法初始化playwright")
+                
+                if not self.browser or not self.browser.is_connected():
+                    # 优化浏览器配置
+                    browser_config = BROWSER_CONFIG.copy()
+                    browser_config.update({
+                        'args': [
+                            '--disable-gpu',
+                            '--disable-dev-shm-usage',
+                            '--disable-setuid-sandbox',
+                            '--no-first-run',
+                            '--no-sandbox',
+                            '--disable-extensions',
+                            '--disable-features=site-per-process',
+                            '--disable-software-rasterizer',
+                            '--window-size=1920,1080',
+                            '--start-maximized',
+                            '--disable-infobars',
+                            '--lang=zh-CN,zh',
+                            '--hide-scrollbars',
+                            '--mute-audio',
+                            '--disable-notifications',
+                            '--disable-popup-blocking',
+                            '--disable-component-extensions-with-background-pages',
+                            '--disable-default-apps',
+                            '--metrics-recording-only',
+                            '--ignore-certificate-errors',
+                            '--ignore-ssl-errors',
+                            '--ignore-certificate-errors-spki-list',
+                            '--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
+                        ]
+                    })
+                    self.browser = await self.playwright.chromium.launch(**browser_config)
+                    self.supervisor.attach_browser(self.browser)
                     
-                    if not self.browser or not self.browser.is_connected():
-                        # 优化浏览器配置
-                        browser_config = BROWSER_CONFIG.copy()
-                        browser_config.update({
-                            'args': [
-                                '--disable-gpu',
-                                '--disable-dev-shm-usage',
-                                '--disable-setuid-sandbox',
-                                '--no-first-run',
-                                '--no-sandbox',
-                                '--no-zygote',
-                                '--single-process',
-                                '--disable-extensions',
-                                '--disable-features=site-per-process',
-                                '--disable-software-rasterizer',
-                                '--window-size=1920,1080',
-                                '--start-maximized',
-                                '--disable-infobars',
-                                '--lang=zh-CN,zh',
-                                '--hide-scrollbars',
-                                '--mute-audio',
-                                '--disable-notifications',
-                                '--disable-popup-blocking',
-                                '--disable-component-extensions-with-background-pages',
-                                '--disable-default-apps',
-                                '--metrics-recording-only',
-                                '--ignore-certificate-errors',
-                                '--ignore-ssl-errors',
-                                '--ignore-certificate-errors-spki-list',
-                                '--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
-                            ]
-                        })
-                        self.browser = await self.playwright.chromium.launch(**browser_config)
-                        
-                    return self.browser
-                except Exception as e:
-                    logger.error(f"初始化浏览器失败 (尝试 {attempt + 1}/{self.max_retries}): {str(e)}")
-                    await self.cleanup()
-                    if attempt < self.max_retries - 1:
-                        await asyncio.sleep(self.retry_delay)
-                        continue
-                    raise
+                return self.browser
+            except Exception as e:
+                logger.error(f"初始化浏览器失败 (尝试 {attempt + 1}/{self.max_retries}): {str(e)}")
+                await self._cleanup_unlocked()
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self.retry_delay)
+                    continue
+                raise
         
-    async def init_context(self, browser: Browser) -> BrowserContext:
-        """初始化浏览器上下文"""
+    async def init_context(self, browser: Browser, identity: Optional[str] = None,
+                           javascript: bool = True) -> BrowserContext:
+        """初始化指定身份的浏览器上下文"""
         async with self._lock:
-            for attempt in range(self.max_retries):
+            chosen = self.identities.get(identity) if identity else self.identities.choose()
+            return await self._ensure_context(browser, chosen, javascript)
+
+    async def _ensure_context(self, browser: Browser, identity: BrowserIdentity,
+                              javascript: bool = True) -> BrowserContext:
+        """创建身份对应的浏览器上下文（调用方需持有 self._lock）
+
+        启用 JS 的上下文载入该身份保存的 cookies；禁用 JS 的轻量上下文不注入反检测脚本，
+        创建时沿用同一身份启用 JS 的上下文的 cookies（包括 Cloudflare 验证结果）。
+        """
+        key = (identity.name, javascript)
+        context = self.contexts.get(key)
+        if context:
+            return context
+
+        for attempt in range(self.max_retries):
+            try:
+                context_config = identity.context_options()
+                context_config['java_script_enabled'] = javascript
+                storage_state = self.identities.storage_state_path(identity.name)
+                if javascript and os.path.exists(storage_state):
+                    context_config['storage_state'] = storage_state
+                context = await browser.new_context(**context_config)
+                
+                # 设置全局超时
+                context.set_default_timeout(30000)  # 30秒
+                context.set_default_navigation_timeout(30000)  # 30秒
+                
+                # 上下文级别的资源拦截和慢导航 trace
+                await resource_policy.apply(context)
+                await trace_recorder.attach(context)
+                self.supervisor.attach_context(context, f"{identity.name}{'' if javascript else ':static'}")
+                
+                # 设置 Cookie
+                await context.add_cookies([{
+                    'name': 'locale',
+                    'value': identity.locale,
+                    'domain': 'g-mh.org',
+                    'path': '/'
+                }, {
+                    'name': 'timezone',
+                    'value': identity.timezone_id,
+                    'domain': 'g-mh.org',
+                    'path': '/'
+                }, {
+                    'name': 'theme',
+                    'value': 'dark',
+                    'domain': 'g-mh.org',
+                    'path': '/'
+                }])
+                source = self.contexts.get((identity.name, True))
+                if not javascript and source:
+                    await context.add_cookies(await source.cookies())
+                
+                self.contexts[key] = context
+                self._context_keys[context] = key
+                return context
+            except Exception as e:
+                logger.error(f"初始化浏览器上下文失败 (尝试 {attempt + 1}/{self.max_retries}): {str(e)}")
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self.retry_delay)
+                    continue
+                raise
+
+    def choose_identity(self) -> str:
+        """按健康度选择一个浏览器身份"""
+        return self.identities.choose().name
+
+    def page_identity(self, page: Page) -> Optional[str]:
+        """页面所属的浏览器身份"""
+        key = self._context_keys.get(page.context)
+        return key[0] if key else None
+
+    async def record_outcome(self, page: Page, outcome: str):
+        """记录页面请求结果；身份因验证或失败进入冷却时回收其上下文并丢弃 cookies"""
+        name = self.page_identity(page)
+        if not name or not self.identities.record(name, outcome):
+            return
+        async with self._lock:
+            for javascript in (True, False):
+                await self._retire_context((name, javascript), 'challenged')
+            try:
+                os.remove(self.identities.storage_state_path(name))
+            except OSError:
+                pass
+
+    async def sync_static_cookies(self, identity: str):
+        """把身份的 cookies 同步到其轻量上下文，供回退到完整浏览器通过验证后使用"""
+        async with self._lock:
+            source = self.contexts.get((identity, True))
+            target = self.contexts.get((identity, False))
+            if source and target:
                 try:
-                    if not self.context:
-                        # 优化上下文配置
-                        context_config = BROWSER_CONTEXT_CONFIG.copy()
-                        context_config.update({
-                            'viewport': {'width': 1920, 'height': 1080},
-                            'bypass_csp': True,  # 绕过内容安全策略
-                            'ignore_https_errors': True,  # 忽略HTTPS错误
-                            'java_script_enabled': True,
-                            'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-                            'locale': 'zh-CN',
-                            'timezone_id': 'Asia/Shanghai',
-                            'geolocation': {'latitude': 31.2304, 'longitude': 121.4737},
-                            'permissions': ['geolocation'],
-                            'color_scheme': 'dark',
-                            'reduced_motion': 'no-preference',
-                            'has_touch': False,
-                            'is_mobile': False,
-                            'device_scale_factor': 1,
-                            'extra_http_headers': {
-                                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-                                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                                'Accept-Encoding': 'gzip, deflate, br',
-                                'Connection': 'keep-alive',
-                                'Upgrade-Insecure-Requests': '1',
-                                'Sec-Fetch-Site': 'none',
-                                'Sec-Fetch-Mode': 'navigate',
-                                'Sec-Fetch-User': '?1',
-                                'Sec-Fetch-Dest': 'document',
-                                'sec-ch-ua': '"Chromium";v="122", "Not(A:Brand";v="24", "Google Chrome";v="122"',
-                                'sec-ch-ua-mobile': '?0',
-                                'sec-ch-ua-platform': '"macOS"'
-                            }
-                        })
-                        self.context = await browser.new_context(**context_config)
-                        
-                        # 设置全局超时
-                        self.context.set_default_timeout(30000)  # 30秒
-                        self.context.set_default_navigation_timeout(30000)  # 30秒
-                        
-                        # 设置 Cookie
-                        await self.context.add_cookies([{
-                            'name': 'locale',
-                            'value': 'zh-CN',
-                            'domain': 'g-mh.org',
-                            'path': '/'
-                        }, {
-                            'name': 'timezone',
-                            'value': 'Asia/Shanghai',
-                            'domain': 'g-mh.org',
-                            'path': '/'
-                        }, {
-                            'name': 'theme',
-                            'value': 'dark',
-                            'domain': 'g-mh.org',
-                            'path': '/'
-                        }])
-                        
-                    return self.context
+                    await target.add_cookies(await source.cookies())
                 except Exception as e:
-                    logger.error(f"初始化浏览器上下文失败 (尝试 {attempt + 1}/{self.max_retries}): {str(e)}")
-                    if attempt < self.max_retries - 1:
-                        await asyncio.sleep(self.retry_delay)
-                        continue
-                    raise
-        
-    async def get_page(self) -> Page:
-        """获取配置好的页面实例"""
+                    logger.error(f"同步轻量上下文 cookies 失败: {str(e)}")
+
+    async def get_page(self, javascript: bool = True, identity: Optional[str] = None) -> Page:
+        """获取配置好的页面实例
+
+        Args:
+            javascript: False 时返回禁用 JavaScript 的轻量页面，用完后同样交给 recycle_page
+            identity: 指定浏览器身份，默认按健康度选择
+        """
         async with self._lock:
-            # 尝试从页面池中获取可用页面
-            while self._page_pool:
-                page = self._page_pool.pop()
+            chosen = self.identities.get(identity) if identity else self.identities.choose()
+            key = (chosen.name, javascript)
+
+            # 达到导航次数或存活时间上限的上下文先回收再分配页面
+            context = self.contexts.get(key)
+            if context:
+                reason = self.supervisor.context_recycle_reason(context, include_memory=False)
+                if reason:
+                    await self._retire_context(key, reason)
+                    context = None
+
+            # 尝试从页面池中获取该上下文的可用页面
+            for page in [page for page in self._page_pool if context and page.context is context]:
+                self._page_pool.remove(page)
                 try:
                     if await self._is_page_usable(page):
+                        self._mark_in_use(page)
                         return page
                 except:
-                    continue
+                    pass
+                await self._close_page(page)
             
             for attempt in range(self.max_retries):
                 try:
-                    if not self.browser or not self.browser.is_connected():
-                        self.browser = await self.init_browser()
-                    
-                    if not self.context:
-                        self.context = await self.init_context(self.browser)
+                    browser = await self._ensure_browser()
+                    context = await self._ensure_context(browser, chosen, javascript)
                     
-                    page = await self.context.new_page()
+                    page = await context.new_page()
                     if not page:
                         raise Exception("无法创建新页面")
                     
-                    await self.setup_page(page)
+                    if javascript:
+                        await self.setup_page(page, chosen)
+                    self._mark_in_use(page)
                     return page
                     
                 except Exception as e:
                     logger.error(f"获取页面实例失败 (尝试 {attempt + 1}/{self.max_retries}): {str(e)}")
-                    await self.cleanup()
+                    if self.browser and self.browser.is_connected():
+                        # 只回收出错的上下文，其他身份正在进行的请求不受影响
+                        await self._retire_context(key, 'page_error')
+                    else:
+                        # 浏览器已断开，下次尝试时重新启动
+                        self._forget_browser()
                     if attempt < self.max_retries - 1:
                         await asyncio.sleep(self.retry_delay)
                         continue
                     raise Exception(f"无法获取页面实例: {str(e)}")
+
+    def _mark_in_use(self, page: Page):
+        """记录页面被借出"""
+        self._pages_in_use[page.context] = self._pages_in_use.get(page.context, 0) + 1
+
+    def _release(self, page: Page) -> BrowserContext:
+        """记录页面归还，返回页面所属上下文"""
+        context = page.context
+        count = self._pages_in_use.get(context, 0) - 1
+        if count > 0:
+            self._pages_in_use[context] = count
+        else:
+            self._pages_in_use.pop(context, None)
+        return context
+
+    async def _retire_context(self, key: Tuple[str, bool], reason: str):
+        """回收指定身份的上下文（调用方需持有 self._lock）
+
+        池中页面立即关闭；仍有页面借出时延迟到最后一个页面归还后再关闭上下文，
+        避免打断正在进行的请求。正常回收时保存身份的 cookies，下次创建上下文时载入。
+        """
+        old_context = self.contexts.pop(key, None)
+        if not old_context:
+            return
+        self._context_keys.pop(old_context, None)
+        self.supervisor.on_context_retired(old_context, reason)
+
+        pooled_pages = [page for page in self._page_pool if page.context is old_context]
+        self._page_pool = [page for page in self._page_pool if page.context is not old_context]
+        for page in pooled_pages:
+            await self._close_page(page)
+
+        name, javascript = key
+        if javascript and reason != 'challenged':
+            try:
+                path = self.identities.storage_state_path(name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                await old_context.storage_state(path=path)
+            except Exception as e:
+                logger.error(f"保存身份 {name} 的 cookies 失败: {str(e)}")
+
+        if self._pages_in_use.get(old_context):
+            self._retiring_contexts.append(old_context)
+        else:
+            await self._close_context(old_context)
+
+    async def recycle_context(self, context: BrowserContext, reason: str):
+        """回收指定上下文，下次获取该身份的页面时创建新上下文"""
+        async with self._lock:
+            key = self._context_keys.get(context)
+            if key:
+                await self._retire_context(key, reason)
+
+    async def restart_browser(self):
+        """浏览器断开后重启，等待中的 get_page 调用会在重启完成后拿到新浏览器的页面"""
+        async with self._lock:
+            if self.browser and self.browser.is_connected():
+                return
+            logger.info("重启浏览器...")
+            self._forget_browser()
+            await self._ensure_browser()
+
+    def _forget_browser(self):
+        """丢弃已断开浏览器的状态，旧浏览器的页面和上下文已随连接断开失效（调用方需持有 self._lock）"""
+        self._page_pool = []
+        self._pages_in_use = {}
+        self._retiring_contexts = []
+        self.contexts = {}
+        self._context_keys = {}
+        self.supervisor.forget_contexts()
+        self.browser = None
+
+    def get_stats(self) -> dict:
+        """获取浏览器统计信息"""
+        stats = self.supervisor.get_stats()
+        stats.update({
+            'pooled_pages': len(self._page_pool),
+            'pages_in_use': sum(self._pages_in_use.values()),
+            'retiring_contexts': len(self._retiring_contexts),
+            'identities': self.identities.get_stats()
+        })
+        return stats
     
     async def _is_page_usable(self, page: Page) -> bool:
         """检查页面是否可用"""
@@ -182,8 +335,8 @@ class BrowserManager:
         except:
             return False
         
-    async def setup_page(self, page: Page):
-        """设置页面配置"""
+    async def setup_page(self, page: Page, identity: BrowserIdentity):
+        """设置页面配置，注入的 navigator 属性与身份的 UA 保持一致"""
         if not page:
             raise Exception("页面实例为空")
             
@@ -192,9 +345,6 @@ class BrowserManager:
             page.set_default_timeout(30000)  # 30秒
             page.set_default_navigation_timeout(30000)  # 30秒
 
-            # 设置请求拦截
-            await page.route("**/*.{png,jpg,jpeg,gif,svg}", lambda route: route.abort())
-            
             # 启用JavaScript
             await page.evaluate("""
                 // 清除控制台输出
@@ -206,11 +356,11 @@ class BrowserManager:
             """)
             
             # 添加反爬虫JavaScript
-            await page.add_init_script("""
+            await page.add_init_script(f"const __gmhIdentity = {json.dumps(identity.navigator_overrides())};" + """
                 Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
                 Object.defineProperty(navigator, 'plugins', { get: () => [1, 2, 3, 4, 5] });
-                Object.defineProperty(navigator, 'languages', { get: () => ['zh-CN', 'zh'] });
-                Object.defineProperty(navigator, 'platform', { get: () => 'MacIntel' });
+                Object.defineProperty(navigator, 'languages', { get: () => __gmhIdentity.languages });
+                Object.defineProperty(navigator, 'platform', { get: () => __gmhIdentity.platform });
                 Object.defineProperty(navigator, 'hardwareConcurrency', { get: () => 8 });
                 Object.defineProperty(navigator, 'deviceMemory', { get: () => 8 });
                 Object.defineProperty(navigator, 'maxTouchPoints', { get: () => 0 });
@@ -272,25 +422,33 @@ class BrowserManager:
             logger.error(f"设置页面配置失败: {str(e)}")
             raise
             
-    async def _handle_route(self, route):
-        """处理资源请求"""
-        if route.request.resource_type in ['image', 'stylesheet', 'font']:
-            await route.abort()
-        elif route.request.resource_type == 'script':
-            await route.continue_()
-        else:
-            await route.continue_()
-        
     async def recycle_page(self, page: Page):
-        """回收页面到页面池"""
-        if len(self._page_pool) < self.max_pool_size:
+        """回收页面到页面池
+
+        页面重置在锁外进行，期间页面仍计为借出，所属上下文被回收时会等它归还后再关闭；
+        重置完成后在锁内确认上下文仍然有效才放回页面池。
+        """
+        reusable = page.context in self._context_keys and len(self._page_pool) < self.max_pool_size
+        if reusable:
             try:
                 await page.evaluate("window.stop()")  # 停止所有正在进行的请求
-                await page.evaluate("window.location.href = 'about:blank'")  # 重置页面
-                self._page_pool.append(page)
+                if not keep_warm(page.url):
+                    await page.evaluate("window.location.href = 'about:blank'")  # 重置页面
             except:
+                reusable = False
+
+        async with self._lock:
+            context = self._release(page)
+            if context not in self._context_keys:
+                # 页面属于已回收的上下文，最后一个页面归还时关闭该上下文
                 await self._close_page(page)
-        else:
+                if context in self._retiring_contexts and not self._pages_in_use.get(context):
+                    self._retiring_contexts.remove(context)
+                    await self._close_context(context)
+                return
+            if reusable and len(self._page_pool) < self.max_pool_size:
+                self._page_pool.append(page)
+                return
             await self._close_page(page)
             
     async def _close_page(self, page: Page):
@@ -299,39 +457,54 @@ class BrowserManager:
             await page.close()
         except Exception as e:
             logger.error(f"关闭页面失败: {str(e)}")
+
+    async def _close_context(self, context: BrowserContext):
+        """安全关闭上下文"""
+        try:
+            await context.close()
+        except Exception as e:
+            logger.error(f"关闭上下文失败: {str(e)}")
         
     async def cleanup(self):
         """清理资源"""
         async with self._lock:
-            try:
-                # 清理页面池
-                while self._page_pool:
-                    page = self._page_pool.pop()
-                    await self._close_page(page)
+            await self._cleanup_unlocked()
+
+    async def _cleanup_unlocked(self):
+        """清理资源（调用方需持有 self._lock）"""
+        self.closing = True
+        try:
+            # 清理页面池
+            while self._page_pool:
+                page = self._page_pool.pop()
+                await self._close_page(page)
+            
+            for context in self._retiring_contexts:
+                await self._close_context(context)
+            self._retiring_contexts = []
+            self._pages_in_use = {}
+            
+            for key in list(self.contexts):
+                await self._retire_context(key, 'cleanup')
                 
-                if self.context:
-                    try:
-                        await self.context.close()
-                    except Exception as e:
-                        logger.error(f"关闭上下文失败: {str(e)}")
-                    self.context = None
-                    
-                if self.browser:
-                    try:
-                        await self.browser.close()
-                    except Exception as e:
-                        logger.error(f"关闭浏览器失败: {str(e)}")
-                    self.browser = None
-                    
-                if self.playwright:
-                    try:
-                        await self.playwright.stop()
-                    except Exception as e:
-                        logger.error(f"停止playwright失败: {str(e)}")
-                    self.playwright = None
-                    
-            except Exception as e:
-                logger.error(f"清理资源时出错: {str(e)}")
+            if self.browser:
+                try:
+                    await self.browser.close()
+                except Exception as e:
+                    logger.error(f"关闭浏览器失败: {str(e)}")
+                self.browser = None
+                
+            if self.playwright:
+                try:
+                    await self.playwright.stop()
+                except Exception as e:
+                    logger.error(f"停止playwright失败: {str(e)}")
+                self.playwright = None
+                
+        except Exception as e:
+            logger.error(f"清理资源时出错: {str(e)}")
+        finally:
+            self.closing = False
         
     async def close(self):
         """关闭浏览器资源"""
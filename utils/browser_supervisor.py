@@ -0,0 +1,246 @@
+import os
+import time
+import logging
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from playwright.async_api import Browser, BrowserContext, Page
+from config.settings import BROWSER_SUPERVISOR_CONFIG
+
+try:
+    import psutil
+except ImportError:  # psutil 为可选依赖，Linux 下回退到读取 /proc
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+_CHROMIUM_PROCESS_NAMES = ('chrome', 'chromium', 'headless_shell')
+
+
+def _chromium_rss_from_proc() -> Optional[int]:
+    """通过 /proc 统计当前进程下所有 Chromium 子孙进程的 RSS（字节）"""
+    if not os.path.isdir('/proc'):
+        return None
+    parents: Dict[int, int] = {}
+    names: Dict[int, str] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                stat = f.read()
+            # 进程名位于括号内，可能包含空格
+            name = stat[stat.index('(') + 1:stat.rindex(')')]
+            ppid = int(stat[stat.rindex(')') + 2:].split()[1])
+            parents[int(entry)] = ppid
+            names[int(entry)] = name.lower()
+        except (OSError, ValueError):
+            continue
+
+    descendants = set()
+    frontier = [os.getpid()]
+    while frontier:
+        current = frontier.pop()
+        for pid, ppid in parents.items():
+            if ppid == current and pid not in descendants:
+                descendants.add(pid)
+                frontier.append(pid)
+
+    total = 0
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    for pid in descendants:
+        if not any(name in names.get(pid, '') for name in _CHROMIUM_PROCESS_NAMES):
+            continue
+        try:
+            with open(f'/proc/{pid}/statm', 'r') as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+def chromium_rss() -> Optional[int]:
+    """统计当前进程启动的 Chromium 进程树的 RSS（字节），无法统计时返回 None"""
+    if psutil is not None:
+        try:
+            total = 0
+            for child in psutil.Process().children(recursive=True):
+                try:
+                    if any(name in child.name().lower() for name in _CHROMIUM_PROCESS_NAMES):
+                        total += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total
+        except psutil.Error:
+            return None
+    return _chromium_rss_from_proc()
+
+
+class BrowserSupervisor:
+    """监控 BrowserManager 管理的浏览器
+
+    记录浏览器与上下文的存活时间、导航次数、内存占用和崩溃情况，
+    按导航次数、存活时间或内存上限回收上下文，并在浏览器断开后自动重启。
+    """
+    def __init__(self, manager, config: Optional[dict] = None):
+        self.manager = manager
+        self.config = config or BROWSER_SUPERVISOR_CONFIG
+        self.browser_launched_at: Optional[float] = None
+        # 各上下文的创建时间和导航次数 {BrowserContext: {'name': str, 'created_at': float, 'navigations': int}}
+        self._contexts: Dict[BrowserContext, dict] = {}
+        self.browser_launches = 0
+        self.browser_restarts = 0
+        self.disconnects = 0
+        self.page_crashes = 0
+        self.context_recycles: Dict[str, int] = {}
+        self.browser_rss: Optional[int] = None
+        self.page_js_heap = 0
+        self.last_sample_at: Optional[float] = None
+        self._restart_task: Optional[asyncio.Task] = None
+
+    def attach_browser(self, browser: Browser):
+        """记录新启动的浏览器并监听断开事件"""
+        self.browser_launched_at = time.time()
+        self.browser_launches += 1
+        browser.on('disconnected', self._on_disconnected)
+
+    def attach_context(self, context: BrowserContext, name: str):
+        """记录新创建的上下文并监听其页面"""
+        self._contexts[context] = {'name': name, 'created_at': time.time(), 'navigations': 0}
+        context.on('page', self.attach_page)
+
+    def attach_page(self, page: Page):
+        """监听页面的导航和崩溃事件"""
+        page.on('framenavigated', lambda frame: self._on_navigated(page, frame))
+        page.on('crash', self._on_page_crash)
+
+    def _on_navigated(self, page: Page, frame):
+        state = self._contexts.get(page.context)
+        if frame.parent_frame is None and state:
+            state['navigations'] += 1
+
+    def _on_page_crash(self, page: Page):
+        self.page_crashes += 1
+        logger.error(f"页面渲染进程崩溃: {page.url}")
+
+    def _on_disconnected(self, browser: Browser):
+        # 主动关闭或已被替换的浏览器断开时不需要重启
+        if self.manager.closing or browser is not self.manager.browser:
+            return
+        self.disconnects += 1
+        logger.error("浏览器连接已断开")
+        if self.config.get('restart_on_disconnect', True):
+            if not self._restart_task or self._restart_task.done():
+                self._restart_task = asyncio.ensure_future(self._restart())
+
+    async def _restart(self):
+        try:
+            await self.manager.restart_browser()
+            self.browser_restarts += 1
+            logger.info("浏览器已重启")
+        except Exception as e:
+            logger.error(f"重启浏览器失败: {str(e)}")
+
+    def on_context_retired(self, context: BrowserContext, reason: str):
+        self.context_recycles[reason] = self.context_recycles.get(reason, 0) + 1
+        state = self._contexts.pop(context, None)
+        name = state['name'] if state else ''
+        logger.info(f"回收浏览器上下文 {name}，原因: {reason}")
+
+    def forget_contexts(self):
+        """浏览器重启后旧上下文已全部失效"""
+        self._contexts = {}
+
+    def context_recycle_reason(self, context: BrowserContext, include_memory: bool = True) -> Optional[str]:
+        """判断上下文是否需要回收，返回回收原因
+
+        内存占用由巡检采样，采样前对所有上下文都成立，获取页面时的检查应传入 include_memory=False。
+        """
+        state = self._contexts.get(context)
+        if not state:
+            return None
+        if state['navigations'] >= self.config['max_context_navigations']:
+            return 'navigations'
+        if time.time() - state['created_at'] >= self.config['max_context_age']:
+            return 'age'
+        if include_memory and self._over_memory_ceiling():
+            return 'memory'
+        return None
+
+    def _over_memory_ceiling(self) -> bool:
+        ceiling = self.config.get('memory_ceiling_mb')
+        return bool(ceiling and self.browser_rss is not None and self.browser_rss >= ceiling * 1024 * 1024)
+
+    def contexts_to_recycle(self) -> List[Tuple[BrowserContext, str]]:
+        """列出需要回收的上下文；超过内存上限时只回收导航次数最多的一个，避免同时重建全部上下文"""
+        due = []
+        for context in list(self._contexts):
+            reason = self.context_recycle_reason(context, include_memory=False)
+            if reason:
+                due.append((context, reason))
+        if not due and self._contexts and self._over_memory_ceiling():
+            busiest = max(self._contexts, key=lambda context: self._contexts[context]['navigations'])
+            due.append((busiest, 'memory'))
+        return due
+
+    async def sample_memory(self):
+        """采样浏览器进程树 RSS 和各页面的 JS 堆大小"""
+        loop = asyncio.get_event_loop()
+        self.browser_rss = await loop.run_in_executor(None, chromium_rss)
+
+        heap = 0
+        for context in list(self._contexts):
+            for page in list(context.pages):
+                try:
+                    heap += await page.evaluate(
+                        "() => (performance.memory && performance.memory.usedJSHeapSize) || 0"
+                    )
+                except Exception:
+                    continue
+        self.page_js_heap = heap
+        self.last_sample_at = time.time()
+
+    async def check(self):
+        """执行一次巡检"""
+        await self.sample_memory()
+        browser = self.manager.browser
+        if browser is None:
+            return
+        if not browser.is_connected():
+            await self._restart()
+            return
+        for context, reason in self.contexts_to_recycle():
+            await self.manager.recycle_context(context, reason)
+
+    async def run(self):
+        """后台巡检循环"""
+        interval = self.config['check_interval']
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"浏览器巡检出错: {str(e)}")
+
+    def get_stats(self) -> dict:
+        """获取浏览器监控统计信息"""
+        now = time.time()
+        browser = self.manager.browser
+        return {
+            'browser_connected': bool(browser and browser.is_connected()),
+            'browser_age_seconds': round(now - self.browser_launched_at, 1) if self.browser_launched_at else None,
+            'browser_launches': self.browser_launches,
+            'browser_restarts': self.browser_restarts,
+            'disconnects': self.disconnects,
+            'page_crashes': self.page_crashes,
+            'contexts': {
+                state['name']: {
+                    'age_seconds': round(now - state['created_at'], 1),
+                    'navigations': state['navigations']
+                }
+                for state in self._contexts.values()
+            },
+            'context_recycles': dict(self.context_recycles),
+            'browser_rss_bytes': self.browser_rss,
+            'page_js_heap_bytes': self.page_js_heap,
+            'last_sample_at': int(self.last_sample_at) if self.last_sample_at else None
+        }
@@ -0,0 +1,353 @@
+import time
+import uuid
+import pickle
+import asyncio
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from config.settings import BROWSER_WORKER_CONFIG, LOG_CONFIG
+from utils.browser_jobs import execute_browser_job, browser_stats
+
+logger = logging.getLogger(__name__)
+
+# IPC 任务协议
+#   任务（API 进程 -> 工作进程，每个工作进程一个任务队列）:
+#       {'id': str, 'type': str, 'params': dict}，None 表示退出
+#   控制消息（API 进程 -> 工作进程，每个工作进程一个控制队列，不占用任务并发数）:
+#       {'id': str, 'type': 'stats'} 查询统计，{'id': str, 'type': 'cancel'} 取消任务，None 表示退出
+#   结果（工作进程 -> API 进程，共用一个结果队列）:
+#       {'id': str, 'ok': bool, 'result': Any, 'error': str, 'worker': int, 'elapsed': float}
+
+# 工作进程记住的已取消任务数量（取消消息可能先于任务出队到达）
+_CANCELLED_MEMORY = 1000
+
+
+class BrowserJobError(Exception):
+    """浏览器任务执行失败"""
+    pass
+
+
+def _worker_main(index: int, job_queue, control_queue, result_queue, concurrency: int):
+    """工作进程入口"""
+    logging.basicConfig(level=LOG_CONFIG['level'], format=LOG_CONFIG['format'])
+    asyncio.run(_worker_loop(index, job_queue, control_queue, result_queue, concurrency))
+
+
+async def _worker_loop(index: int, job_queue, control_queue, result_queue, concurrency: int):
+    """工作进程主循环：拥有独立的 BrowserManager，并发执行任务
+
+    先取得并发名额再从队列取任务，达到并发上限时任务留在队列中；
+    统计查询和取消走独立的控制队列，不会排在任务后面。
+    """
+    from utils.browser_manager import BrowserManager
+
+    manager = BrowserManager()
+    supervisor_task = asyncio.create_task(manager.supervisor.run())
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    running: Dict[str, asyncio.Task] = {}
+    cancelled: OrderedDict = OrderedDict()
+    control_task = asyncio.create_task(
+        _control_loop(index, manager, control_queue, result_queue, running, cancelled)
+    )
+    logger.info(f"浏览器工作进程 {index} 已启动")
+    try:
+        while True:
+            await semaphore.acquire()
+            job = await loop.run_in_executor(None, job_queue.get)
+            if job is None:
+                semaphore.release()
+                break
+            if cancelled.pop(job['id'], False):
+                semaphore.release()
+                continue
+            task = asyncio.create_task(_run_job(manager, job, result_queue, semaphore, index))
+            running[job['id']] = task
+            task.add_done_callback(lambda _, job_id=job['id']: running.pop(job_id, None))
+        if running:
+            await asyncio.gather(*running.values(), return_exceptions=True)
+    finally:
+        control_task.cancel()
+        supervisor_task.cancel()
+        await manager.close()
+        logger.info(f"浏览器工作进程 {index} 已退出")
+
+
+async def _control_loop(index: int, manager, control_queue, result_queue,
+                        running: Dict[str, asyncio.Task], cancelled: OrderedDict):
+    """处理控制消息：统计查询直接回复，取消消息取消正在执行的任务或标记尚未出队的任务"""
+    loop = asyncio.get_running_loop()
+    while True:
+        message = await loop.run_in_executor(None, control_queue.get)
+        if message is None:
+            return
+        if message['type'] == 'cancel':
+            task = running.get(message['id'])
+            if task:
+                logger.warning(f"浏览器工作进程 {index} 取消超时任务 {message['id']}")
+                task.cancel()
+            else:
+                cancelled[message['id']] = True
+                while len(cancelled) > _CANCELLED_MEMORY:
+                    cancelled.popitem(last=False)
+            continue
+        try:
+            reply = {'id': message['id'], 'ok': True, 'result': await browser_stats(manager), 'error': None}
+        except Exception as e:
+            reply = {'id': message['id'], 'ok': False, 'result': None, 'error': f"{type(e).__name__}: {str(e)}"}
+        reply.update({'worker': index, 'elapsed': 0.0})
+        result_queue.put(reply)
+
+
+async def _run_job(manager, job: dict, result_queue, semaphore: asyncio.Semaphore, index: int):
+    """执行单个任务并回传结果"""
+    start_time = time.time()
+    try:
+        result = await execute_browser_job(manager, job['type'], job['params'])
+        # 提前确认结果可以序列化，否则结果会在队列的后台线程中静默丢失
+        pickle.dumps(result)
+        message = {'id': job['id'], 'ok': True, 'result': result, 'error': None}
+    except Exception as e:
+        logger.error(f"执行浏览器任务 {job['type']} 出错: {str(e)}")
+        message = {'id': job['id'], 'ok': False, 'result': None, 'error': f"{type(e).__name__}: {str(e)}"}
+    finally:
+        semaphore.release()
+    message.update({'worker': index, 'elapsed': time.time() - start_time})
+    result_queue.put(message)
+
+
+class BrowserWorkerPool:
+    """本地浏览器工作进程池
+
+    BrowserManager、ContentExtractor 和 TurnstileSolver 的任务在独立进程中执行，
+    API 进程只做任务分发，浏览器的启动、崩溃和回收不再占用 API 的事件循环。
+    未启用时任务直接在当前进程中使用 local_manager 执行。
+    """
+    def __init__(self, local_manager, config: Optional[dict] = None):
+        config = config or BROWSER_WORKER_CONFIG
+        self.local_manager = local_manager
+        self.enabled = config.get('enabled', False)
+        self.size = config.get('workers', 2)
+        self.concurrency = config.get('concurrency', 4)
+        self.job_timeout = config.get('job_timeout', 120)
+        self.max_attempts = config.get('max_attempts', 2)
+        self.monitor_interval = config.get('monitor_interval', 1.0)
+        self._mp = multiprocessing.get_context('spawn')
+        self._workers: List[dict] = []
+        self._pending: Dict[str, dict] = {}
+        self._result_queue = None
+        self._reader: Optional[threading.Thread] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.started = False
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.requeued = 0
+        self.worker_restarts = 0
+
+    async def start(self):
+        """启动工作进程"""
+        if not self.enabled or self.started:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._result_queue = self._mp.Queue()
+        self._workers = [self._spawn_worker(index) for index in range(self.size)]
+        self._reader = threading.Thread(target=self._read_results, name='browser-worker-results', daemon=True)
+        self._reader.start()
+        self._monitor_task = asyncio.create_task(self._monitor())
+        self.started = True
+        logger.info(f"浏览器工作进程池已启动，共 {self.size} 个进程")
+
+    def _spawn_worker(self, index: int) -> dict:
+        job_queue = self._mp.Queue()
+        control_queue = self._mp.Queue()
+        process = self._mp.Process(
+            target=_worker_main,
+            args=(index, job_queue, control_queue, self._result_queue, self.concurrency),
+            name=f'browser-worker-{index}',
+            daemon=True
+        )
+        process.start()
+        return {'index': index, 'process': process, 'queue': job_queue, 'control': control_queue,
+                'inflight': set(), 'completed': 0}
+
+    async def run(self, job_type: str, timeout: Optional[float] = None, **params) -> Any:
+        """执行浏览器任务：启用进程池时分发到工作进程，否则在当前进程执行"""
+        if not self.started:
+            return await execute_browser_job(self.local_manager, job_type, params)
+        return await self.submit(job_type, timeout=timeout, **params)
+
+    async def submit(self, job_type: str, timeout: Optional[float] = None,
+                     worker_index: Optional[int] = None, **params) -> Any:
+        """提交任务到工作进程并等待结果，超时后通知工作进程取消任务"""
+        job = {'id': uuid.uuid4().hex, 'type': job_type, 'params': params}
+        future = self._loop.create_future()
+        self._pending[job['id']] = {'future': future, 'job': job, 'worker': None, 'attempts': 0}
+        self.submitted += 1
+        try:
+            self._dispatch(job['id'], worker_index)
+            return await asyncio.wait_for(future, timeout or self.job_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._cancel(job['id'])
+            raise BrowserJobError(f"浏览器任务 {job_type} 超时")
+        finally:
+            entry = self._pending.pop(job['id'], None)
+            if entry and entry['worker'] is not None:
+                entry['worker']['inflight'].discard(job['id'])
+
+    def _cancel(self, job_id: str):
+        """通知任务所在的工作进程取消任务"""
+        entry = self._pending.get(job_id)
+        if not entry or entry['worker'] is None:
+            return
+        try:
+            entry['worker']['control'].put({'id': job_id, 'type': 'cancel'})
+        except Exception as e:
+            logger.warning(f"发送取消消息失败: {str(e)}")
+
+    async def _query_stats(self, worker: dict, timeout: float = 5) -> dict:
+        """通过控制队列查询工作进程内浏览器的统计，不占用任务并发数"""
+        request_id = uuid.uuid4().hex
+        future = self._loop.create_future()
+        self._pending[request_id] = {'future': future, 'job': None, 'worker': None, 'attempts': 0, 'control': True}
+        try:
+            worker['control'].put({'id': request_id, 'type': 'stats'})
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _dispatch(self, job_id: str, worker_index: Optional[int] = None):
+        """把任务放入负载最低（或指定）的存活工作进程的队列"""
+        entry = self._pending[job_id]
+        if worker_index is not None:
+            worker = self._workers[worker_index]
+        else:
+            alive = [w for w in self._workers if w['process'].is_alive()] or self._workers
+            worker = min(alive, key=lambda w: len(w['inflight']))
+        entry['worker'] = worker
+        entry['attempts'] += 1
+        worker['inflight'].add(job_id)
+        worker['queue'].put(entry['job'])
+
+    def _read_results(self):
+        """后台线程：读取结果队列并交回事件循环"""
+        while True:
+            try:
+                message = self._result_queue.get()
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break
+            self._loop.call_soon_threadsafe(self._on_result, message)
+
+    def _on_result(self, message: dict):
+        entry = self._pending.get(message['id'])
+        if not entry:
+            return  # 已超时的任务
+        worker = entry['worker']
+        if worker is not None:
+            worker['inflight'].discard(message['id'])
+            worker['completed'] += 1
+        future = entry['future']
+        if future.done():
+            return
+        if entry.get('control'):
+            if message['ok']:
+                future.set_result(message['result'])
+            else:
+                future.set_exception(BrowserJobError(message['error']))
+            return
+        if message['ok']:
+            self.completed += 1
+            future.set_result(message['result'])
+        else:
+            self.failed += 1
+            future.set_exception(BrowserJobError(message['error']))
+
+    async def _monitor(self):
+        """检查工作进程存活，异常退出时重启进程并重新分发其未完成的任务"""
+        while True:
+            await asyncio.sleep(self.monitor_interval)
+            for position, worker in enumerate(self._workers):
+                if worker['process'].is_alive():
+                    continue
+                logger.error(f"浏览器工作进程 {worker['index']} 异常退出 (exitcode={worker['process'].exitcode})，正在重启")
+                self.worker_restarts += 1
+                orphaned = list(worker['inflight'])
+                self._workers[position] = self._spawn_worker(worker['index'])
+                for job_id in orphaned:
+                    entry = self._pending.get(job_id)
+                    if not entry or entry['future'].done():
+                        continue
+                    if entry['attempts'] < self.max_attempts:
+                        self.requeued += 1
+                        self._dispatch(job_id)
+                    else:
+                        self.failed += 1
+                        entry['future'].set_exception(BrowserJobError("浏览器工作进程异常退出"))
+
+    async def close(self):
+        """停止所有工作进程"""
+        if not self.started:
+            return
+        self.started = False
+        if self._monitor_task:
+            self._monitor_task.cancel()
+        for worker in self._workers:
+            try:
+                worker['queue'].put(None)
+                worker['control'].put(None)
+            except Exception:
+                pass
+        loop = asyncio.get_running_loop()
+        for worker in self._workers:
+            await loop.run_in_executor(None, worker['process'].join, 10)
+            if worker['process'].is_alive():
+                worker['process'].terminate()
+        self._result_queue.put(None)
+        for entry in self._pending.values():
+            if not entry['future'].done():
+                entry['future'].set_exception(BrowserJobError("浏览器工作进程池已关闭"))
+        logger.info("浏览器工作进程池已关闭")
+
+    async def get_stats(self) -> dict:
+        """获取进程池统计信息，包括各工作进程内浏览器的统计"""
+        stats = {
+            'enabled': self.enabled,
+            'started': self.started,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'timeouts': self.timeouts,
+            'requeued': self.requeued,
+            'worker_restarts': self.worker_restarts,
+            'pending': sum(1 for entry in self._pending.values() if not entry.get('control')),
+            'workers': []
+        }
+        if not self.started:
+            return stats
+
+        async def worker_stats(worker):
+            try:
+                return await self._query_stats(worker)
+            except asyncio.TimeoutError:
+                return {'error': '统计查询超时'}
+            except Exception as e:
+                return {'error': str(e)}
+
+        details = await asyncio.gather(*(worker_stats(worker) for worker in self._workers))
+        for worker, detail in zip(self._workers, details):
+            stats['workers'].append({
+                'index': worker['index'],
+                'pid': worker['process'].pid,
+                'alive': worker['process'].is_alive(),
+                'inflight': len(worker['inflight']),
+                'completed': worker['completed'],
+                **detail
+            })
+        return stats
@@ -12,7 +12,10 @@ class CacheManager:
             ttl: 缓存过期时间（秒），默认1小时
         """
         self.ttl = ttl
-        self.cache: Dict[str, Tuple[Any, float]] = {}
+        # 键 -> (数据, 写入时间, 过期时间)
+        self.cache: Dict[str, Tuple[Any, float, float]] = {}
+        self.hits = 0
+        self.misses = 0
         
     def get(self, key: str) -> Optional[Any]:
         """获取缓存数据
@@ -25,26 +28,29 @@ class CacheManager:
         """
         try:
             if key in self.cache:
-                data, timestamp = self.cache[key]
-                if time.time() - timestamp < self.ttl:
+                data, timestamp, ttl = self.cache[key]
+                if time.time() - timestamp < ttl:
+                    self.hits += 1
                     logger.debug(f"Cache hit for key: {key}")
                     return data
                 logger.debug(f"Cache expired for key: {key}")
                 del self.cache[key]
+            self.misses += 1
             return None
         except Exception as e:
             logger.error(f"Error getting cache for key {key}: {str(e)}")
             return None
         
-    def set(self, key: str, value: Any) -> None:
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
         """设置缓存数据
         
         Args:
             key: 缓存键
             value: 要缓存的数据
+            ttl: 这一项的过期时间（秒），默认使用全局过期时间
         """
         try:
-            self.cache[key] = (value, time.time())
+            self.cache[key] = (value, time.time(), self.ttl if ttl is None else ttl)
             logger.debug(f"Cache set for key: {key}")
         except Exception as e:
             logger.error(f"Error setting cache for key {key}: {str(e)}")
@@ -75,12 +81,24 @@ class CacheManager:
         try:
             current_time = time.time()
             expired_keys = [
-                key for key, (_, timestamp) in self.cache.items()
-                if current_time - timestamp >= self.ttl
+                key for key, (_, timestamp, ttl) in self.cache.items()
+                if current_time - timestamp >= ttl
             ]
             for key in expired_keys:
                 del self.cache[key]
             if expired_keys:
                 logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
         except Exception as e:
-            logger.error(f"Error cleaning up expired cache: {str(e)}") 
\ No newline at end of file
+            logger.error(f"Error cleaning up expired cache: {str(e)}") 
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        total_requests = self.hits + self.misses
+        hit_rate = (self.hits / total_requests * 100) if total_requests > 0 else 0
+        return {
+            'size': len(self.cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': f"{hit_rate:.2f}%",
+            'total_requests': total_requests
+        }
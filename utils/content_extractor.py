@@ -5,6 +5,9 @@ import asyncio
 from typing import Dict, Optional, Any, List, Tuple
 from dataclasses import dataclass
 from playwright.async_api import async_playwright, Page, BrowserContext
+from utils.page_readiness import wait_for_page_ready
+from utils.resource_policy import resource_policy
+from utils.url_canonicalizer import url_canonicalizer
 
 class CustomLogger(logging.Logger):
     COLORS = {
@@ -81,27 +84,24 @@ class ContentExtractor:
                     viewport={'width': 1920, 'height': 1080},
                     user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
                 )
+                await resource_policy.apply(context)
 
                 try:
                     page = await context.new_page()
                     page.set_default_timeout(30000)
                     
-                    # 设置请求拦截
-                    await page.route("**/*.{png,jpg,jpeg,gif,svg,css,woff2,woff}", lambda route: route.abort())
-                    await page.route("**/*{analytics,tracker,advertisement,ad,stats}*", lambda route: route.abort())
-                    
                     # 访问页面
                     logger.info(f"访问页面: {url}")
                     await page.goto(url, wait_until='domcontentloaded')
                     
-                    # 等待页面加载
+                    # 等待章节图片就绪
                     logger.info("等待页面加载...")
-                    await page.wait_for_load_state('networkidle', timeout=10000)
+                    await wait_for_page_ready(page, 'chapter')
                     
                     # 提取图片URL
                     logger.info("提取图片URL...")
-                    image_urls = await page.evaluate("""() => {
-                        const images = [];
+                    candidate_urls = await page.evaluate("""() => {
+                        const urls = [];
                         const seen = new Set();
                         
                         // 图片选择器列表
@@ -125,43 +125,22 @@ class ContentExtractor:
                         // 图片属性列表
                         const attributes = ['src', 'data-src', 'data-original', 'data-url', 'data-image', 'data-lazyload'];
                         
-                        // 有效域名列表
-                        const validDomains = [
-                            'g-mh.online/hp/',
-                            'baozimh.org',
-                            'godamanga.online',
-                            'mhcdn.xyz',
-                            'mangafuna.xyz',
-                            'g-mh.org',
-                            'g-mh.online',
-                            'g-mh.xyz'
-                        ];
-                        
-                        // 无效关键词列表
-                        const invalidKeywords = ['cover', 'avatar', 'logo', 'banner', 'ad', 'icon'];
-                        
-                        // 遍历所有选择器
+                        // 只收集候选地址，域名和关键词过滤在 Python 中按统一的域名表完成
                         selectors.forEach(selector => {
                             document.querySelectorAll(selector).forEach(img => {
-                                // 检查所有可能的属性
                                 attributes.forEach(attr => {
                                     const url = img.getAttribute(attr);
                                     if (url && !seen.has(url)) {
-                                        // 检查是否是有效的图片URL
-                                        const isValid = validDomains.some(domain => url.includes(domain)) &&
-                                                      !invalidKeywords.some(keyword => url.toLowerCase().includes(keyword));
-                                        
-                                        if (isValid) {
-                                            images.push(url);
-                                            seen.add(url);
-                                        }
+                                        urls.push(url);
+                                        seen.add(url);
                                     }
                                 });
                             });
                         });
                         
-                        return images;
+                        return urls;
                     }""")
+                    image_urls = url_canonicalizer.chapter_images(candidate_urls)
                     
                     logger.info(f"找到 {len(image_urls)} 个图片URL")
                     
@@ -195,8 +174,9 @@ class ContentExtractor:
                         logger.error(f"提取导航链接时出错: {str(e)}")
                     
                     # 处理导航链接
-                    prev_chapter = nav_data.get('prev', '').replace('https://g-mh.org/', '') if nav_data.get('prev') else None
-                    next_chapter = nav_data.get('next', '').replace('https://g-mh.org/', '') if nav_data.get('next') else None
+                    prev_chapter, next_chapter = (
+                        path or None for path in url_canonicalizer.display([nav_data.get('prev'), nav_data.get('next')], 'page')
+                    )
                     
                     result = {
                         'images': image_urls,
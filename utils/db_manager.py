@@ -1,5 +1,6 @@
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 from config.settings import (
     MONGO_URI, MONGO_DB, 
     MONGO_COLLECTION_MANGA,
@@ -7,6 +8,7 @@ from config.settings import (
     MONGO_COLLECTION_IMAGES
 )
 from models.manga import MangaInfo, Chapter, Image
+from models.records import ChapterRef, ImageRef
 import uuid
 from datetime import datetime
 from typing import Optional, List
@@ -111,31 +113,79 @@ class DBManager:
             logger.error(f"保存章节信息失败: {str(e)}")
             raise
             
-    async def save_images(self, images: list[Image]):
-        """批量保存图片信息"""
+    async def save_chapters(self, manga_id: str, chapters: List[ChapterRef], generation: Optional[str] = None):
+        """批量保存章节引用（一次 bulk_write，chapter_id 由漫画和章节位置确定）
+
+        指定 generation 时写入该代的暂存文档，不覆盖当前章节，由 replace_chapters 统一发布。
+        """
         try:
-            if not images:
+            if not chapters:
                 return
-                
-            # 为没有ID的图片生成ID
-            for image in images:
-                if not image.image_id:
-                    image.image_id = str(uuid.uuid4())
-                image.updated_at = datetime.now()
-                
-            # 批量更新
+            now = datetime.now()
+            staged = {"generation": generation, "staged": True} if generation else {}
             operations = [
-                {
-                    "update_one": {
-                        "filter": {"image_id": image.image_id},
-                        "update": {"$set": image.dict()},
-                        "upsert": True
-                    }
-                }
-                for image in images
+                UpdateOne(
+                    {"chapter_id": document["chapter_id"], **({"generation": generation} if generation else {})},
+                    {"$set": {**document, **staged}, "$setOnInsert": {"created_at": now}},
+                    upsert=True
+                )
+                for document in (chapter.to_document(manga_id, now) for chapter in chapters)
             ]
+            result = await self.db[MONGO_COLLECTION_CHAPTERS].bulk_write(operations, ordered=False)
+            logger.info(f"批量保存章节信息成功: {len(chapters)}章")
+            return result
+        except Exception as e:
+            logger.error(f"批量保存章节信息失败: {str(e)}")
+            raise
             
-            result = await self.db[MONGO_COLLECTION_IMAGES].bulk_write(operations)
+    async def replace_chapters(self, manga_id: str, chapters: List[ChapterRef], batch_size: int = 500):
+        """用完整的章节列表替换漫画的章节
+
+        新列表分批写入一个新的代（generation），写入期间是读取时忽略的暂存文档；
+        全部批次成功后才发布新一代并删除其他代的章节。任何批次失败时删除已写入的暂存文档，
+        当前章节不受影响。发布和删除是两条语句，之间读取可能同时看到新旧两代，由 get_chapters 去重。
+        """
+        collection = self.db[MONGO_COLLECTION_CHAPTERS]
+        generation = uuid.uuid4().hex
+        try:
+            for start in range(0, len(chapters), batch_size):
+                await self.save_chapters(manga_id, chapters[start:start + batch_size], generation)
+        except Exception:
+            try:
+                await collection.delete_many({"manga_id": manga_id, "generation": generation})
+            except Exception as e:
+                # 残留的暂存文档读取时被忽略，下次替换成功后删除
+                logger.error(f"清理暂存章节失败: {str(e)}")
+            raise
+        try:
+            await collection.update_many(
+                {"manga_id": manga_id, "generation": generation},
+                {"$unset": {"staged": ""}}
+            )
+            result = await collection.delete_many(
+                {"manga_id": manga_id, "generation": {"$ne": generation}}
+            )
+            if result.deleted_count:
+                logger.info(f"删除过期章节: {result.deleted_count}章")
+        except Exception as e:
+            logger.error(f"发布章节列表失败: {str(e)}")
+            raise
+
+    async def save_images(self, manga_id: str, chapter_id: str, images: List[ImageRef]):
+        """批量保存章节图片引用（image_id 由章节和页码确定，重复保存时覆盖）"""
+        try:
+            if not images:
+                return
+            now = datetime.now()
+            operations = [
+                UpdateOne(
+                    {"image_id": document["image_id"]},
+                    {"$set": document, "$setOnInsert": {"created_at": now}},
+                    upsert=True
+                )
+                for document in (image.to_document(manga_id, chapter_id, now) for image in images)
+            ]
+            result = await self.db[MONGO_COLLECTION_IMAGES].bulk_write(operations, ordered=False)
             logger.info(f"批量保存图片信息成功: {len(images)}张")
             return result
         except Exception as e:
@@ -159,11 +209,16 @@ class DBManager:
         """获取漫画的所有章节"""
         try:
             chapters = []
+            seen = set()
+            # 跳过未发布的暂存章节；替换过程中新旧两代同时存在时只保留较新的一条
             cursor = self.db[MONGO_COLLECTION_CHAPTERS].find(
-                {"manga_id": manga_id}
-            ).sort("order", 1)
+                {"manga_id": manga_id, "staged": {"$ne": True}}
+            ).sort([("order", 1), ("updated_at", -1)])
             
             async for doc in cursor:
+                if doc["chapter_id"] in seen:
+                    continue
+                seen.add(doc["chapter_id"])
                 chapters.append(Chapter(**doc))
             return chapters
         except Exception as e:
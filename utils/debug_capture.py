@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Any, Optional
+from config.settings import DEBUG_CAPTURE_CONFIG
+from models.records import to_jsonable
+
+logger = logging.getLogger(__name__)
+
+
+class DebugCapture:
+    """调试快照采集
+
+    默认关闭。开启后按采样率或仅在提取失败时保存页面 HTML、截图和提取结果，
+    写文件在线程池中异步完成，目录按文件数和总大小轮转。
+    """
+    def __init__(self, config: Optional[dict] = None):
+        config = config or DEBUG_CAPTURE_CONFIG
+        self.enabled = config.get('enabled', False)
+        self.sample_rate = config.get('sample_rate', 0.0)
+        self.on_failure = config.get('on_failure', True)
+        self.directory = config.get('directory')
+        self.max_files = config.get('max_files', 200)
+        self.max_total_bytes = config.get('max_total_mb', 100) * 1024 * 1024
+        self.max_file_bytes = config.get('max_file_mb', 5) * 1024 * 1024
+        self.captured = 0
+        self.skipped = 0
+        self.errors = 0
+        self.bytes_written = 0
+        self._write_lock = threading.Lock()
+        self._tasks = set()
+
+    def should_capture(self, failed: bool = False) -> bool:
+        """判断本次是否采集：提取失败时按 on_failure，否则按采样率"""
+        if not self.enabled:
+            return False
+        if failed and self.on_failure:
+            return True
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return True
+        self.skipped += 1
+        return False
+
+    def capture(self, name: str, data: Any, failed: bool = False) -> bool:
+        """按采样规则保存调试数据，返回是否已安排写入
+
+        Args:
+            name: 文件名（会自动加上时间戳前缀）
+            data: str、bytes，或可 JSON 序列化的对象
+            failed: 本次提取是否失败
+        """
+        if not self.should_capture(failed):
+            return False
+        self.write(name, data)
+        return True
+
+    def write(self, name: str, data: Any):
+        """不经采样判断直接安排写入，调用方需已通过 should_capture"""
+        self.captured += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_file(name, data)
+            return
+        task = loop.run_in_executor(None, self._write_file, name, data)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _write_file(self, name: str, data: Any):
+        try:
+            if isinstance(data, str):
+                payload = data.encode('utf-8')
+            elif isinstance(data, bytes):
+                payload = data
+            else:
+                payload = json.dumps(data, ensure_ascii=False, indent=2, default=to_jsonable).encode('utf-8')
+            payload = payload[:self.max_file_bytes]
+
+            now = time.time()
+            filename = f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(now))}_{int(now * 1000) % 1000:03d}_{name}"
+            with self._write_lock:
+                os.makedirs(self.directory, exist_ok=True)
+                path = os.path.join(self.directory, filename)
+                with open(path, 'wb') as f:
+                    f.write(payload)
+                self.bytes_written += len(payload)
+                self._rotate()
+            logger.info(f"调试数据已保存到: {path}")
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"保存调试数据失败 ({name}): {str(e)}")
+
+    def _rotate(self):
+        """删除最旧的文件，直到文件数和总大小都不超过上限"""
+        entries = []
+        for filename in os.listdir(self.directory):
+            path = os.path.join(self.directory, filename)
+            try:
+                entries.append((os.path.getmtime(path), path, os.path.getsize(path)))
+            except OSError:
+                continue
+        entries.sort()
+        total = sum(size for _, _, size in entries)
+        count = len(entries)
+        for _, path, size in entries:
+            if count <= self.max_files and total <= self.max_total_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            count -= 1
+            total -= size
+
+    def get_stats(self) -> dict:
+        """获取采集统计"""
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'on_failure': self.on_failure,
+            'captured': self.captured,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'bytes_written': self.bytes_written,
+            'pending_writes': len(self._tasks)
+        }
+
+
+# 全局共享的调试采集器
+debug_capture = DebugCapture()
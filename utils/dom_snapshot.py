@@ -0,0 +1,44 @@
+import html
+import logging
+from typing import List
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+# 按文档顺序收集匹配元素的 outerHTML；文档顺序下后代紧跟在祖先之后，
+# 只需和上一个选中的元素比较即可跳过已包含在快照中的后代
+_SNAPSHOT_SCRIPT = """
+(selectors) => {
+    const parts = [];
+    let last = null;
+    for (const element of document.querySelectorAll(selectors.join(','))) {
+        if (last && last.contains(element)) {
+            continue;
+        }
+        parts.push(element.outerHTML);
+        last = element;
+    }
+    return {title: document.title, parts};
+}
+"""
+
+
+def wrap_snapshot(title: str, parts: List[str]) -> str:
+    """把收集到的子树拼成最小 HTML 文档，提取器按整页相同的 XPath 处理"""
+    return f"<html><head><title>{html.escape(title)}</title></head><body>{''.join(parts)}</body></html>"
+
+
+async def snapshot_html(page: Page, selectors: List[str]) -> str:
+    """只序列化指定选择器匹配的子树，拼成一个最小 HTML 文档
+
+    Args:
+        page: Playwright 页面实例
+        selectors: CSS 选择器列表
+
+    Returns:
+        str: <html><head><title/></head><body>子树...</body></html>
+    """
+    snapshot = await page.evaluate(_SNAPSHOT_SCRIPT, selectors)
+    document = wrap_snapshot(snapshot['title'], snapshot['parts'])
+    logger.debug(f"DOM 快照: {len(snapshot['parts'])} 个子树，{len(document)} 字符")
+    return document
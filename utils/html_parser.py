@@ -0,0 +1,157 @@
+import re
+import codecs
+import logging
+import threading
+from typing import Callable, Dict, Optional, Union
+from lxml import html
+from config.settings import HTML_PARSER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 字节序标记
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be')
+)
+_HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_HTML_TAG = re.compile(rb'<html', re.I)
+# 只在文档开头查找 <meta charset>
+_META_SCAN_BYTES = 4096
+# 按超集解码，避免生僻字在子集编码下出错
+_SUPERSET_ENCODINGS = {
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+    'ascii': 'utf-8',
+    'iso-8859-1': 'windows-1252'
+}
+
+# lxml 解析器不能在线程间并发使用，按线程缓存各编码的解析器
+_local = threading.local()
+
+
+def _normalize_encoding(name: Optional[Union[str, bytes]]) -> Optional[str]:
+    if not name:
+        return None
+    if isinstance(name, bytes):
+        name = name.decode('ascii', 'ignore')
+    try:
+        name = codecs.lookup(name).name
+    except LookupError:
+        return None
+    return _SUPERSET_ENCODINGS.get(name, name)
+
+
+def detect_encoding(content: bytes, content_type: Optional[str] = None) -> str:
+    """检测 HTML 字节内容的编码：BOM > Content-Type 头 > <meta charset> > UTF-8"""
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return encoding
+    if content_type:
+        match = _HEADER_CHARSET.search(content_type)
+        encoding = _normalize_encoding(match.group(1)) if match else None
+        if encoding:
+            return encoding
+    match = _META_CHARSET.search(content, 0, _META_SCAN_BYTES)
+    encoding = _normalize_encoding(match.group(1)) if match else None
+    return encoding or 'utf-8'
+
+
+def _parser(encoding: str) -> html.HTMLParser:
+    parsers = getattr(_local, 'parsers', None)
+    if parsers is None:
+        parsers = _local.parsers = {}
+    parser = parsers.get(encoding)
+    if parser is None:
+        parser = parsers[encoding] = html.HTMLParser(encoding=encoding)
+    return parser
+
+
+# ---- 解析后端 ----
+# 每个后端是一个工厂函数，返回 parse(content: bytes, encoding: str) -> 文档根节点；
+# 依赖未安装时工厂抛出 ImportError。所有后端都必须生成 lxml 文档树，供选择器注册表的 XPath 使用
+
+def _lxml_backend() -> Callable:
+    def parse(content: bytes, encoding: str):
+        return html.document_fromstring(content, parser=_parser(encoding))
+    return parse
+
+
+def _html5_parser_backend() -> Callable:
+    try:
+        import html5_parser
+    except RuntimeError as e:
+        # 与 lxml 链接的 libxml2 版本不一致时导入会失败，按未安装处理
+        raise ImportError(str(e)) from e
+
+    def parse(content: bytes, encoding: str):
+        # lxml_html 树构建器直接生成 lxml.html 元素，不需要再转换
+        return html5_parser.parse(content, transport_encoding=encoding, treebuilder='lxml_html',
+                                  namespace_elements=False, keep_doctype=False)
+    return parse
+
+
+PARSER_BACKENDS: Dict[str, Callable[[], Callable]] = {
+    'lxml': _lxml_backend,
+    'html5-parser': _html5_parser_backend
+}
+
+
+def load_backend(name: str) -> Callable:
+    """按名称创建解析后端，名称未知或依赖未安装时抛出 ImportError"""
+    factory = PARSER_BACKENDS.get(name)
+    if factory is None:
+        raise ImportError(f"未知的HTML解析后端: {name}")
+    return factory()
+
+
+def _select_backend(config: dict):
+    """按配置选择解析后端，不可用时回退"""
+    name = config.get('backend', 'lxml')
+    fallback = config.get('fallback', 'lxml')
+    try:
+        return name, load_backend(name)
+    except ImportError as e:
+        logger.warning(f"HTML解析后端 {name} 不可用（{str(e)}），使用 {fallback}")
+        return fallback, load_backend(fallback)
+
+
+PARSER_BACKEND, _parse = _select_backend(HTML_PARSER_CONFIG)
+
+
+def looks_like_html(content: Union[str, bytes]) -> bool:
+    """不解码整个响应，直接检查内容中是否有 <html 标签"""
+    if isinstance(content, str):
+        return '<html' in content.lower()
+    return _HTML_TAG.search(content) is not None
+
+
+def parse_html(content: Union[str, bytes], content_type: Optional[str] = None):
+    """使用配置的解析后端将 HTML 一次解析为 lxml 文档树（根节点为 <html>）
+
+    Args:
+        content: 响应的原始字节或已解码的字符串（如 Playwright 的 page.content()）
+        content_type: 响应的 Content-Type 头，用于确定字节内容的编码
+
+    Returns:
+        lxml.html.HtmlElement: 文档根节点；内容为空时返回 None
+    """
+    if not content:
+        return None
+    if isinstance(content, str):
+        # 字符串统一按 UTF-8 交给解析器，避免文档内的编码声明与 str 冲突
+        content = content.encode('utf-8', 'surrogatepass')
+        encoding = 'utf-8'
+    else:
+        encoding = detect_encoding(content, content_type)
+    try:
+        return _parse(content, encoding)
+    except Exception as e:
+        logger.error(f"解析HTML失败: {str(e)}")
+        return None
+
+
+def parse_response(response):
+    """解析 requests/cloudscraper 响应，按响应头和文档声明确定编码"""
+    return parse_html(response.content, response.headers.get('content-type'))
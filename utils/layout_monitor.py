@@ -0,0 +1,156 @@
+import time
+import zlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from config.settings import LAYOUT_DRIFT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 特殊指纹：没有 <body> 的文档和 Cloudflare 验证页不参与漂移判断
+EMPTY_LAYOUT = 'empty'
+CHALLENGE_LAYOUT = 'challenge'
+_CHALLENGE_TITLES = ('Just a moment', 'Attention Required')
+
+
+def layout_fingerprint(tree) -> str:
+    """页面骨架指纹：<main>（没有时为 <body>）下两层元素的标签序列的 CRC32
+
+    只遍历两层直接子元素，不求值任何 XPath，开销可以忽略；文字和属性不参与计算，
+    内容更新不会改变指纹，布局调整（区块增删、层级变化）会改变指纹。
+    """
+    if tree is None:
+        return EMPTY_LAYOUT
+    title = tree.findtext('head/title') or ''
+    if title.startswith(_CHALLENGE_TITLES):
+        return CHALLENGE_LAYOUT
+    body = tree.find('body')
+    if body is None:
+        return EMPTY_LAYOUT
+    main = body.find('.//main')
+    root = main if main is not None else body
+    parts = [root.tag]
+    for child in root:
+        if isinstance(child.tag, str):
+            parts.append(child.tag + '(' + ','.join(
+                grandchild.tag for grandchild in child if isinstance(grandchild.tag, str)
+            ) + ')')
+    return f"{zlib.crc32('|'.join(parts).encode()):08x}"
+
+
+class LayoutMonitor:
+    """按页面类型检测布局漂移并控制昂贵的回退
+
+    提取完整（必需字段都有值）时记住当前指纹为正常布局；必需字段为空且指纹未知时累计，
+    连续达到阈值即判定漂移：记录漂移次数并将页面类型标记为降级。降级期间 allow_fallback
+    只按探测间隔放行，避免每个请求都把选择器失效变成一次 Playwright 抓取。
+    """
+    def __init__(self, config: Optional[dict] = None):
+        config = config or LAYOUT_DRIFT_CONFIG
+        self.enabled = config.get('enabled', True)
+        self.threshold = config.get('drift_threshold', 3)
+        self.probe_interval = config.get('probe_interval', 300)
+        self.max_known = config.get('known_fingerprints', 8)
+        self.required: Dict[str, tuple] = {
+            page_type: tuple(fields) for page_type, fields in config.get('required_fields', {}).items()
+        }
+        self._states: Dict[str, dict] = {}
+
+    def _state(self, page_type: str) -> dict:
+        return self._states.setdefault(page_type, {
+            'known': OrderedDict(),
+            'last_fingerprint': None,
+            'observations': 0,
+            'challenges': 0,
+            'misses': 0,
+            'drift_events': 0,
+            'degraded': False,
+            'degraded_since': None,
+            'last_probe': 0.0,
+            'probes': 0,
+            'skipped_fallbacks': 0
+        })
+
+    def observe(self, page_type: str, fingerprint: str, result: dict, fields: Optional[Iterable[str]] = None):
+        """记录一次提取的布局指纹和结果是否完整"""
+        required = self.required.get(page_type)
+        if not self.enabled or not required:
+            return
+        if fields is not None:
+            fields = set(fields)
+            required = tuple(name for name in required if name in fields)
+            if not required:
+                return
+        state = self._state(page_type)
+        state['observations'] += 1
+        state['last_fingerprint'] = fingerprint
+        if fingerprint in (EMPTY_LAYOUT, CHALLENGE_LAYOUT):
+            state['challenges'] += 1
+            return
+        known = state['known']
+        if all(result.get(name) for name in required):
+            known[fingerprint] = True
+            known.move_to_end(fingerprint)
+            while len(known) > self.max_known:
+                known.popitem(last=False)
+            state['misses'] = 0
+            if state['degraded']:
+                state['degraded'] = False
+                state['degraded_since'] = None
+                logger.info(f"{page_type} 页面提取恢复完整（布局 {fingerprint}），解除降级")
+            return
+        if fingerprint in known:
+            # 已知布局下字段为空属于内容本身（例如还没有章节），不是布局漂移
+            return
+        state['misses'] += 1
+        if state['misses'] >= self.threshold and not state['degraded']:
+            state['degraded'] = True
+            state['degraded_since'] = time.time()
+            state['drift_events'] += 1
+            state['last_probe'] = time.time()
+            logger.warning(f"{page_type} 页面布局疑似变化（指纹 {fingerprint}，已知 {list(known)}），"
+                           f"连续 {state['misses']} 次缺少 {', '.join(required)}，标记为降级")
+
+    def is_degraded(self, page_type: str) -> bool:
+        state = self._states.get(page_type)
+        return bool(state and state['degraded'])
+
+    def allow_fallback(self, page_type: str) -> bool:
+        """是否执行昂贵的回退（Playwright 抓取）；降级时只按探测间隔放行"""
+        state = self._states.get(page_type)
+        if not state or not state['degraded']:
+            return True
+        now = time.time()
+        if now - state['last_probe'] >= self.probe_interval:
+            state['last_probe'] = now
+            state['probes'] += 1
+            logger.info(f"{page_type} 页面处于降级状态，放行一次回退探测")
+            return True
+        state['skipped_fallbacks'] += 1
+        return False
+
+    def get_stats(self) -> dict:
+        """各页面类型的降级状态、漂移次数和跳过的回退次数"""
+        stats = {}
+        for page_type, state in sorted(self._states.items()):
+            stats[page_type] = {
+                'degraded': state['degraded'],
+                'degraded_seconds': round(time.time() - state['degraded_since']) if state['degraded_since'] else 0,
+                'drift_events': state['drift_events'],
+                'consecutive_misses': state['misses'],
+                'observations': state['observations'],
+                'challenges': state['challenges'],
+                'probes': state['probes'],
+                'skipped_fallbacks': state['skipped_fallbacks'],
+                'last_fingerprint': state['last_fingerprint'],
+                'known_fingerprints': list(state['known'])
+            }
+        return {
+            'enabled': self.enabled,
+            'degraded': sorted(page_type for page_type, state in self._states.items() if state['degraded']),
+            'page_types': stats
+        }
+
+
+# 全局共享的布局漂移检测
+layout_monitor = LayoutMonitor()
@@ -0,0 +1,52 @@
+import bisect
+from typing import Dict, List, Optional
+from config.settings import NAVIGATION_HISTOGRAM_BUCKETS
+
+
+class NavigationHistogram:
+    """导航耗时直方图，按页面类型和导航方式分别统计
+
+    导航方式：cold（新页面或跨源）、warm（页面已在站点源上）、client（站点前端路由）。
+    """
+    def __init__(self, buckets: Optional[List[int]] = None):
+        self.buckets = list(buckets or NAVIGATION_HISTOGRAM_BUCKETS)
+        self._series: Dict[str, dict] = {}
+
+    def record(self, page_type: str, mode: str, elapsed_ms: float):
+        """记录一次导航耗时"""
+        series = self._series.setdefault(f'{page_type}:{mode}', {
+            'count': 0,
+            'sum_ms': 0.0,
+            'counts': [0] * (len(self.buckets) + 1)
+        })
+        series['count'] += 1
+        series['sum_ms'] += elapsed_ms
+        series['counts'][bisect.bisect_left(self.buckets, elapsed_ms)] += 1
+
+    def _quantile(self, counts: List[int], total: int, q: float) -> Optional[int]:
+        """用桶上限估算分位数"""
+        target = total * q
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= target:
+                return self.buckets[index] if index < len(self.buckets) else None
+        return None
+
+    def get_stats(self) -> dict:
+        """获取各序列的次数、平均耗时、估算分位数和桶计数"""
+        labels = [f'<={bound}' for bound in self.buckets] + [f'>{self.buckets[-1]}']
+        stats = {}
+        for key, series in sorted(self._series.items()):
+            stats[key] = {
+                'count': series['count'],
+                'mean_ms': round(series['sum_ms'] / series['count']),
+                'p50_ms': self._quantile(series['counts'], series['count'], 0.5),
+                'p95_ms': self._quantile(series['counts'], series['count'], 0.95),
+                'buckets': dict(zip(labels, series['counts']))
+            }
+        return stats
+
+
+# 全局共享的导航耗时统计
+navigation_histogram = NavigationHistogram()
@@ -0,0 +1,96 @@
+import time
+import logging
+from typing import Optional
+from playwright.async_api import Page
+from config.settings import PAGE_READINESS_CONFIG, PAGE_READINESS_POLL_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# 在页面内轮询执行的就绪判断：目标元素已出现，且（可选）元素数量连续若干轮保持不变
+_READINESS_PREDICATE = """
+({selector, minCount, stableSelector, stableRounds}) => {
+    if (document.querySelectorAll(selector).length < minCount) {
+        return false;
+    }
+    if (!stableSelector || !stableRounds) {
+        return true;
+    }
+    const count = document.querySelectorAll(stableSelector).length;
+    const state = window.__gmhReadiness || (window.__gmhReadiness = {count: -1, rounds: 0});
+    if (count === state.count) {
+        state.rounds += 1;
+    } else {
+        state.count = count;
+        state.rounds = 0;
+    }
+    return state.rounds >= stableRounds;
+}
+"""
+
+
+def _fresh(selector: str) -> str:
+    """排除带 data-gmh-stale 标记（上一页面遗留）的元素"""
+    return ','.join(f'{part.strip()}:not([data-gmh-stale])' for part in selector.split(','))
+
+
+async def wait_for_page_ready(page: Page, page_type: str, timeout: Optional[int] = None,
+                              fresh_only: bool = False) -> bool:
+    """等待页面达到指定页面类型的就绪条件
+
+    代替固定时长的 wait_for_timeout 和 networkidle 等待：目标内容一旦就绪立即返回。
+
+    Args:
+        page: Playwright 页面实例
+        page_type: 页面类型，对应 PAGE_READINESS_CONFIG 中的键
+        timeout: 超时时间（毫秒），默认使用配置值
+        fresh_only: 只统计客户端导航后新渲染的元素
+
+    Returns:
+        bool: 是否在超时前就绪；超时不会抛出异常，调用方按当前内容继续处理
+    """
+    config = PAGE_READINESS_CONFIG.get(page_type)
+    if not config:
+        logger.warning(f"未知的页面类型: {page_type}，跳过就绪等待")
+        return False
+
+    timeout = timeout if timeout is not None else config['timeout']
+    stable_selector = config.get('stable_selector')
+    start_time = time.time()
+    try:
+        # 清除上一次导航遗留的稳定性计数
+        await page.evaluate("() => { delete window.__gmhReadiness; }")
+        await page.wait_for_function(
+            _READINESS_PREDICATE,
+            arg={
+                'selector': _fresh(config['selector']) if fresh_only else config['selector'],
+                'minCount': config.get('min_count', 1),
+                'stableSelector': _fresh(stable_selector) if fresh_only and stable_selector else stable_selector,
+                'stableRounds': config.get('stable_rounds', 0)
+            },
+            polling=PAGE_READINESS_POLL_INTERVAL,
+            timeout=timeout
+        )
+        logger.info(f"页面就绪 ({page_type})，耗时 {(time.time() - start_time) * 1000:.0f}ms")
+        return True
+    except Exception as e:
+        logger.warning(f"等待页面就绪超时 ({page_type}, {timeout}ms): {str(e)}")
+        return False
+
+
+async def check_page_complete(page: Page, page_type: str) -> bool:
+    """单次检查目标内容是否已在文档中
+
+    用于禁用 JavaScript 的页面：文档解析完成后 DOM 不会再变化，无需轮询等待。
+    """
+    config = PAGE_READINESS_CONFIG.get(page_type)
+    if not config:
+        logger.warning(f"未知的页面类型: {page_type}，跳过就绪检查")
+        return False
+    try:
+        count = await page.evaluate(
+            "(selector) => document.querySelectorAll(selector).length", config['selector']
+        )
+        return count >= config.get('min_count', 1)
+    except Exception as e:
+        logger.warning(f"检查页面内容失败 ({page_type}): {str(e)}")
+        return False
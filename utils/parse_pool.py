@@ -0,0 +1,126 @@
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Optional, Union
+from config.settings import PARSE_POOL_CONFIG, LOG_CONFIG
+from utils.html_parser import parse_html, PARSER_BACKEND
+from utils.layout_monitor import layout_fingerprint, layout_monitor
+from extractors.selector_registry import extract_page
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker():
+    logging.basicConfig(level=LOG_CONFIG['level'], format=LOG_CONFIG['format'])
+
+
+def _warm_up():
+    """空任务：提前启动工作进程并导入解析模块"""
+    return True
+
+
+def extract_document(page_type: str, content: Union[str, bytes], content_type: Optional[str] = None,
+                     fields: Optional[Iterable[str]] = None) -> dict:
+    """解析文档并按页面类型提取字段，返回只包含基本类型的结果（可在进程间传递）"""
+    return extract_page(page_type, parse_html(content, content_type), fields)
+
+
+def extract_with_layout(page_type: str, content: Union[str, bytes], content_type: Optional[str] = None,
+                        fields: Optional[Iterable[str]] = None) -> tuple:
+    """解析并提取，同时计算页面骨架指纹，返回 (提取结果, 指纹)"""
+    tree = parse_html(content, content_type)
+    return extract_page(page_type, tree, fields), layout_fingerprint(tree)
+
+
+class ParsePool:
+    """大文档解析进程池
+
+    lxml 解析和 XPath 提取是 CPU 密集操作，长篇漫画页面和上千章的章节列表会阻塞事件循环
+    数百毫秒。超过大小阈值的文档交给进程池解析，只把提取结果传回；小文档在当前进程解析更快。
+    """
+    def __init__(self, config: Optional[dict] = None):
+        config = config or PARSE_POOL_CONFIG
+        self.enabled = config.get('enabled', True)
+        self.workers = config.get('workers', 2)
+        self.threshold = config.get('offload_threshold_kb', 256) * 1024
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.inline = 0
+        self.offloaded = 0
+        self.fallbacks = 0
+        self.inline_seconds = 0.0
+        self.offloaded_seconds = 0.0
+
+    def start(self):
+        """创建进程池并预热工作进程"""
+        if not self.enabled or self._executor:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker
+        )
+        # 启动时预热全部工作进程，避免第一个大文档请求承担进程启动开销
+        for _ in range(self.workers):
+            self._executor.submit(_warm_up)
+        logger.info(f"解析进程池已创建，共 {self.workers} 个进程，阈值 {self.threshold // 1024}KB")
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def extract(self, page_type: str, content: Union[str, bytes], content_type: Optional[str] = None,
+                      fields: Optional[Iterable[str]] = None) -> dict:
+        """解析并提取页面，超过阈值的文档在进程池中执行，提取结果和布局指纹交给布局漂移检测
+
+        Args:
+            page_type: 页面类型，对应选择器注册表
+            content: 响应原始字节或页面 HTML 字符串
+            content_type: 响应的 Content-Type 头
+            fields: 只提取指定字段，默认全部
+        """
+        if not content:
+            return {}
+        fields = list(fields) if fields is not None else None
+        start_time = time.perf_counter()
+        if self._executor and len(content) >= self.threshold:
+            try:
+                loop = asyncio.get_running_loop()
+                result, fingerprint = await loop.run_in_executor(
+                    self._executor, extract_with_layout, page_type, content, content_type, fields
+                )
+                self.offloaded += 1
+                self.offloaded_seconds += time.perf_counter() - start_time
+                layout_monitor.observe(page_type, fingerprint, result, fields)
+                return result
+            except BrokenProcessPool:
+                logger.error("解析进程池异常退出，重新创建后本次在当前进程解析")
+                self.close()
+                self.start()
+                self.fallbacks += 1
+                start_time = time.perf_counter()
+        result, fingerprint = extract_with_layout(page_type, content, content_type, fields)
+        self.inline += 1
+        self.inline_seconds += time.perf_counter() - start_time
+        layout_monitor.observe(page_type, fingerprint, result, fields)
+        return result
+
+    def get_stats(self) -> dict:
+        """获取解析次数和平均耗时"""
+        return {
+            'enabled': self.enabled,
+            'parser_backend': PARSER_BACKEND,
+            'threshold_kb': self.threshold // 1024,
+            'inline': self.inline,
+            'offloaded': self.offloaded,
+            'fallbacks': self.fallbacks,
+            'inline_avg_ms': round(self.inline_seconds / self.inline * 1000, 2) if self.inline else 0,
+            'offloaded_avg_ms': round(self.offloaded_seconds / self.offloaded * 1000, 2) if self.offloaded else 0
+        }
+
+
+# 全局共享的解析进程池
+parse_pool = ParsePool()
@@ -0,0 +1,110 @@
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from playwright.async_api import BrowserContext, Route, Response
+from config.settings import RESOURCE_BLOCKING_CONFIG
+from utils.asset_cache import AssetCache, asset_cache as shared_asset_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _host_matches(host: str, domains) -> bool:
+    """判断域名是否等于列表中的某个域名或为其子域名"""
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+class ResourceBlockingPolicy:
+    """BrowserContext 级别的资源拦截策略
+
+    按资源类型、统计/广告域名和第三方脚本白名单拦截请求，
+    并统计拦截次数和估算节省的流量。放行的静态资源交给 asset_cache 处理。
+    """
+    def __init__(self, config: Optional[dict] = None, asset_cache: Optional[AssetCache] = None):
+        config = config or RESOURCE_BLOCKING_CONFIG
+        self.asset_cache = asset_cache
+        self.enabled = config.get('enabled', True)
+        self.blocked_resource_types = set(config.get('blocked_resource_types', []))
+        self.blocked_hosts = tuple(config.get('blocked_hosts', []))
+        self.script_allowlist_hosts = tuple(config.get('script_allowlist_hosts', []))
+        self.estimated_sizes = dict(config.get('estimated_sizes', {}))
+        self.blocked_requests = 0
+        self.allowed_requests = 0
+        self.saved_bytes = 0
+        self.blocked_by_reason: Dict[str, int] = {}
+        self.blocked_by_type: Dict[str, int] = {}
+        # 已放行响应的大小统计 {资源类型: [总字节数, 响应数]}，用于估算被拦截请求的大小
+        self._observed_sizes: Dict[str, list] = {}
+
+    def match(self, resource_type: str, url: str) -> Optional[str]:
+        """返回拦截原因，不需要拦截时返回 None"""
+        if not self.enabled:
+            return None
+        if resource_type in self.blocked_resource_types:
+            return 'resource_type'
+        host = (urlsplit(url).hostname or '').lower()
+        if not host:
+            return None
+        if _host_matches(host, self.blocked_hosts):
+            return 'tracker_host'
+        if resource_type == 'script' and not _host_matches(host, self.script_allowlist_hosts):
+            return 'third_party_script'
+        return None
+
+    async def apply(self, context: BrowserContext):
+        """在浏览器上下文上注册拦截策略，对该上下文的所有页面生效"""
+        if not self.enabled and not (self.asset_cache and self.asset_cache.enabled):
+            return
+        await context.route('**/*', self._handle_route)
+        context.on('response', self._on_response)
+        logger.info("已在浏览器上下文上应用资源拦截策略")
+
+    async def _handle_route(self, route: Route):
+        """处理资源请求"""
+        request = route.request
+        reason = self.match(request.resource_type, request.url)
+        if reason:
+            self._record_blocked(request.resource_type, reason)
+            await route.abort()
+        else:
+            self.allowed_requests += 1
+            if self.asset_cache and await self.asset_cache.handle(route):
+                return
+            await route.fallback()
+
+    def _on_response(self, response: Response):
+        """记录已放行响应的大小"""
+        try:
+            length = response.headers.get('content-length')
+            if length and length.isdigit():
+                sizes = self._observed_sizes.setdefault(response.request.resource_type, [0, 0])
+                sizes[0] += int(length)
+                sizes[1] += 1
+        except Exception as e:
+            logger.debug(f"记录响应大小失败: {str(e)}")
+
+    def _estimate_size(self, resource_type: str) -> int:
+        observed = self._observed_sizes.get(resource_type)
+        if observed and observed[1]:
+            return observed[0] // observed[1]
+        return self.estimated_sizes.get(resource_type, self.estimated_sizes.get('other', 0))
+
+    def _record_blocked(self, resource_type: str, reason: str):
+        self.blocked_requests += 1
+        self.saved_bytes += self._estimate_size(resource_type)
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+
+    def get_stats(self) -> dict:
+        """获取拦截统计信息"""
+        return {
+            'enabled': self.enabled,
+            'blocked_requests': self.blocked_requests,
+            'allowed_requests': self.allowed_requests,
+            'saved_bytes_estimated': self.saved_bytes,
+            'blocked_by_reason': dict(self.blocked_by_reason),
+            'blocked_by_type': dict(self.blocked_by_type)
+        }
+
+
+# 全局共享的拦截策略，所有浏览器上下文共用同一份统计
+resource_policy = ResourceBlockingPolicy(asset_cache=shared_asset_cache)
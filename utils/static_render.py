@@ -0,0 +1,71 @@
+import time
+import logging
+from typing import Dict, Optional
+from config.settings import STATIC_RENDER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class StaticRenderSelector:
+    """按页面类型选择是否使用禁用 JavaScript 的轻量渲染模式
+
+    记录每种页面类型轻量模式的尝试和回退次数，连续得不到完整结果时
+    暂停该类型的轻量模式，冷却期过后再重新尝试。
+    """
+    def __init__(self, config: Optional[dict] = None):
+        config = config or STATIC_RENDER_CONFIG
+        self.enabled = config.get('enabled', True)
+        self.page_types = set(config.get('page_types', []))
+        self.max_failures = config.get('max_failures', 3)
+        self.cooldown = config.get('cooldown', 600)
+        self._stats: Dict[str, dict] = {}
+
+    def _entry(self, page_type: str) -> dict:
+        return self._stats.setdefault(page_type, {
+            'attempts': 0,
+            'complete': 0,
+            'fallbacks': 0,
+            'consecutive_failures': 0,
+            'disabled_until': 0
+        })
+
+    def should_try(self, page_type: str) -> bool:
+        """该页面类型是否先尝试轻量模式"""
+        if not self.enabled or page_type not in self.page_types:
+            return False
+        return time.time() >= self._entry(page_type)['disabled_until']
+
+    def record(self, page_type: str, complete: bool):
+        """记录一次轻量模式的结果"""
+        entry = self._entry(page_type)
+        entry['attempts'] += 1
+        if complete:
+            entry['complete'] += 1
+            entry['consecutive_failures'] = 0
+            return
+        entry['fallbacks'] += 1
+        entry['consecutive_failures'] += 1
+        if entry['consecutive_failures'] >= self.max_failures:
+            entry['disabled_until'] = time.time() + self.cooldown
+            entry['consecutive_failures'] = 0
+            logger.warning(f"页面类型 {page_type} 轻量模式连续 {self.max_failures} 次内容不完整，暂停 {self.cooldown} 秒")
+
+    def get_stats(self) -> dict:
+        """获取各页面类型的轻量模式统计"""
+        now = time.time()
+        return {
+            'enabled': self.enabled,
+            'page_types': {
+                page_type: {
+                    'attempts': entry['attempts'],
+                    'complete': entry['complete'],
+                    'fallbacks': entry['fallbacks'],
+                    'active': now >= entry['disabled_until']
+                }
+                for page_type, entry in self._stats.items()
+            }
+        }
+
+
+# 全局共享的轻量模式选择器
+static_render_selector = StaticRenderSelector()
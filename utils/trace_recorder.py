@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import weakref
+from typing import List, Optional
+from playwright.async_api import BrowserContext
+from config.settings import TRACE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class TraceRecorder:
+    """慢导航的 Playwright trace 采样
+
+    开启后每个浏览器上下文持续开启 tracing（只记录网络和时序，不截图、不保存 DOM 快照），
+    导航期间打开一个 trace 分段；分段内所有导航结束时，只要有一次超过延迟阈值就保存分段，
+    否则直接丢弃。同一上下文的并发导航共用一个分段。
+    """
+    def __init__(self, config: Optional[dict] = None):
+        config = config or TRACE_CONFIG
+        self.enabled = config.get('enabled', False)
+        self.slow_threshold_ms = config.get('slow_threshold_ms', 10000)
+        self.max_chunk_seconds = config.get('max_chunk_seconds', 120)
+        self.directory = config.get('directory')
+        self.max_files = config.get('max_files', 50)
+        self.max_total_bytes = config.get('max_total_mb', 500) * 1024 * 1024
+        self.saved = 0
+        self.discarded = 0
+        self.skipped = 0
+        self.errors = 0
+        # 各上下文的 tracing 状态，上下文释放后自动移除
+        self._states = weakref.WeakKeyDictionary()
+
+    async def attach(self, context: BrowserContext):
+        """在新建的上下文上开启 tracing"""
+        if not self.enabled:
+            return
+        try:
+            await context.tracing.start(screenshots=False, snapshots=False, sources=False)
+            self._states[context] = {
+                'lock': asyncio.Lock(),
+                'active': False,
+                'inflight': 0,
+                'started_at': 0,
+                'slow': []
+            }
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"开启 tracing 失败: {str(e)}")
+
+    async def begin(self, context: BrowserContext, url: str) -> bool:
+        """导航开始前调用，返回本次导航是否被 trace 覆盖"""
+        state = self._states.get(context)
+        if not state:
+            return False
+        async with state['lock']:
+            if state['active']:
+                # 分段持续过久时不再加入，等当前分段结束后重新开始
+                if time.time() - state['started_at'] > self.max_chunk_seconds:
+                    self.skipped += 1
+                    return False
+            else:
+                try:
+                    await context.tracing.start_chunk(title=url)
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"开始 trace 分段失败: {str(e)}")
+                    return False
+                state.update({'active': True, 'started_at': time.time(), 'slow': []})
+            state['inflight'] += 1
+            return True
+
+    async def end(self, context: BrowserContext, url: str, elapsed_ms: float):
+        """被 trace 覆盖的导航结束后调用"""
+        state = self._states.get(context)
+        if not state:
+            return
+        async with state['lock']:
+            if elapsed_ms >= self.slow_threshold_ms:
+                state['slow'].append({'url': url, 'elapsed_ms': round(elapsed_ms)})
+            state['inflight'] -= 1
+            if state['inflight'] > 0:
+                return
+            state['active'] = False
+            slow, state['slow'] = state['slow'], []
+            try:
+                if not slow:
+                    await context.tracing.stop_chunk()
+                    self.discarded += 1
+                    return
+                os.makedirs(self.directory, exist_ok=True)
+                name = f"trace_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{int(time.time() * 1000) % 1000:03d}"
+                path = os.path.join(self.directory, name + '.zip')
+                await context.tracing.stop_chunk(path=path)
+                with open(os.path.join(self.directory, name + '.json'), 'w', encoding='utf-8') as f:
+                    json.dump({'navigations': slow, 'created_at': int(time.time())}, f, ensure_ascii=False)
+                self.saved += 1
+                logger.warning(f"慢导航 trace 已保存到: {path} ({', '.join(item['url'] for item in slow)})")
+                await asyncio.get_running_loop().run_in_executor(None, self._rotate)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"保存 trace 分段失败: {str(e)}")
+
+    def _rotate(self):
+        """删除最旧的 trace，直到数量和总大小都不超过上限"""
+        traces = self.list_traces()
+        total = sum(trace['size'] for trace in traces)
+        count = len(traces)
+        for trace in reversed(traces):
+            if count <= self.max_files and total <= self.max_total_bytes:
+                break
+            for suffix in ('.zip', '.json'):
+                try:
+                    os.remove(os.path.join(self.directory, trace['name'] + suffix))
+                except OSError:
+                    pass
+            count -= 1
+            total -= trace['size']
+
+    def list_traces(self) -> List[dict]:
+        """列出已保存的 trace，最新的在前"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        traces = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.zip'):
+                continue
+            name = filename[:-4]
+            path = os.path.join(self.directory, filename)
+            try:
+                size = os.path.getsize(path)
+                modified_at = os.path.getmtime(path)
+            except OSError:
+                continue
+            navigations = []
+            try:
+                with open(os.path.join(self.directory, name + '.json'), 'r', encoding='utf-8') as f:
+                    navigations = json.load(f).get('navigations', [])
+            except (OSError, ValueError):
+                pass
+            traces.append((modified_at, {'name': name, 'size': size, 'created_at': int(modified_at),
+                                         'navigations': navigations}))
+        traces.sort(key=lambda item: item[0], reverse=True)
+        return [trace for _, trace in traces]
+
+    def trace_path(self, name: str) -> Optional[str]:
+        """trace 文件路径，不存在时返回 None"""
+        path = os.path.join(self.directory, os.path.basename(name) + '.zip')
+        return path if os.path.isfile(path) else None
+
+    def get_stats(self) -> dict:
+        """获取 trace 采样统计"""
+        return {
+            'enabled': self.enabled,
+            'slow_threshold_ms': self.slow_threshold_ms,
+            'saved': self.saved,
+            'discarded': self.discarded,
+            'skipped': self.skipped,
+            'errors': self.errors
+        }
+
+
+# 全局共享的 trace 采样器
+trace_recorder = TraceRecorder()
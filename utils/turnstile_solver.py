@@ -63,6 +63,18 @@ class TurnstileSolver:
             "--ignore-certificate-errors"
         ]
 
+    async def _wait_for_clearance(self, context, timeout: float) -> bool:
+        """轮询等待 cf_clearance cookie 出现，拿到即返回"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            cookies = await context.cookies()
+            if any(cookie['name'] == 'cf_clearance' for cookie in cookies):
+                logger.info(f"获得 cf_clearance，用时 {time.time() - (deadline - timeout):.2f}s")
+                return True
+            await asyncio.sleep(0.25)
+        logger.warning("等待 cf_clearance 超时")
+        return False
+
     async def solve(self, url: str) -> Optional[TurnstileResult]:
         """
         解决 Turnstile 验证
@@ -107,7 +119,7 @@ class TurnstileSolver:
                     
                     if turnstile_frame:
                         logger.info("找到 Turnstile iframe，等待验证完成...")
-                        await page.wait_for_timeout(5000)
+                        await self._wait_for_clearance(context, timeout=10)
                     
                     # 获取 cookies
                     cookies = await context.cookies()
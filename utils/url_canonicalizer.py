@@ -0,0 +1,146 @@
+import re
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+from config.settings import BASE_URL, URL_CANONICAL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 带域名的地址（协议可省略，如 //cdn.example.com/a.jpg）
+_NETWORK_URL = re.compile(r'^(?:(https?):)?//([^/?#]+)(.*)$', re.I | re.S)
+# 其他协议（data:、javascript: 等）原样保留
+_OTHER_SCHEME = re.compile(r'^[a-z][a-z0-9+.-]*:', re.I)
+# 路径的第一段，用于 域名/路径 形式的查找
+_FIRST_SEGMENT = re.compile(r'^/([^/?#]*)')
+
+_MANGA_PREFIX = '/manga/'
+_KINDS = ('page', 'manga', 'chapter', 'image', 'cover')
+
+
+class CanonicalUrl(NamedTuple):
+    """canonical 为完整地址（用于请求和去重），display 为返回给客户端的形式"""
+    canonical: str
+    display: str
+
+
+class UrlCanonicalizer:
+    """批量规范化站内链接和图片地址
+
+    相对地址补全、域名角色判断和展示形式转换都在这里完成，所有提取器共用同一套规则：
+
+    - page: 站内页面，展示为去掉域名的路径（如 manga/xxx/123）
+    - manga/chapter: 漫画和章节链接，展示为 /manga/ 之后的路径；不带斜杠的相对路径相对于 /manga/
+    - image: 章节图片，展示为完整地址
+    - cover: 封面图片，封面域名的图片展示为压缩代理地址
+    """
+    def __init__(self, config: Optional[dict] = None):
+        config = config or URL_CANONICAL_CONFIG
+        self.hosts: Dict[str, str] = {}
+        self.path_roles: Dict[str, Dict[str, str]] = {}
+        for key, role in config.get('hosts', {}).items():
+            domain, _, segment = key.lower().partition('/')
+            if segment:
+                self.path_roles.setdefault(domain, {})[segment.strip('/')] = role
+            else:
+                self.hosts[domain] = role
+        keywords = config.get('image_exclude_keywords', [])
+        self.excluded = re.compile('|'.join(map(re.escape, keywords)), re.I) if keywords else None
+        self.cover_proxy = config.get('cover_proxy')
+        match = _NETWORK_URL.match(BASE_URL)
+        self.site_scheme = match.group(1).lower()
+        self.site_host = match.group(2).lower()
+        # 域名 -> (按首段路径区分的角色, 域名角色)，域名数量有限，按需缓存
+        self._host_roles: Dict[str, Tuple[Optional[Dict[str, str]], Optional[str]]] = {}
+
+    def _split(self, url: str, kind: str) -> Optional[Tuple[str, str, str]]:
+        """拆分为 (协议, 域名, 路径)，相对地址按站点补全；其他协议返回 None"""
+        match = _NETWORK_URL.match(url)
+        if match:
+            scheme = (match.group(1) or self.site_scheme).lower()
+            return scheme, match.group(2).lower(), match.group(3) or '/'
+        if url.startswith('/'):
+            return self.site_scheme, self.site_host, url
+        if _OTHER_SCHEME.match(url):
+            return None
+        if kind in ('manga', 'chapter') and not url.startswith(_MANGA_PREFIX[1:]):
+            return self.site_scheme, self.site_host, _MANGA_PREFIX + url
+        return self.site_scheme, self.site_host, '/' + url
+
+    def _host_role(self, host: str) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+        entry = self._host_roles.get(host)
+        if entry is None:
+            paths = role = None
+            labels = host.split('.')
+            for start in range(len(labels) - 1):
+                domain = '.'.join(labels[start:])
+                paths = paths or self.path_roles.get(domain)
+                role = role or self.hosts.get(domain)
+            entry = self._host_roles[host] = (paths, role)
+        return entry
+
+    def role(self, host: str, path: str = '/') -> Optional[str]:
+        """域名角色：域名/首段路径 优先于域名，域名未配置时逐级查找上级域名"""
+        paths, role = self._host_role(host)
+        if paths:
+            match = _FIRST_SEGMENT.match(path)
+            return paths.get(match.group(1) if match else '') or role
+        return role
+
+    def _display(self, kind: str, canonical: str, host: str, path: str) -> str:
+        if kind == 'page':
+            return path.lstrip('/') if host == self.site_host else canonical
+        if kind in ('manga', 'chapter'):
+            if host == self.site_host and path.startswith(_MANGA_PREFIX):
+                return path[len(_MANGA_PREFIX):]
+            return canonical
+        if kind == 'cover' and self.cover_proxy and self.role(host, path) == 'cover':
+            return self.cover_proxy.format(url=quote(canonical, safe=''))
+        return canonical
+
+    def canonicalize(self, url: Optional[str], kind: str = 'page') -> CanonicalUrl:
+        """规范化单个地址，空地址返回两个空字符串"""
+        url = (url or '').strip()
+        if not url:
+            return CanonicalUrl('', '')
+        parts = self._split(url, kind)
+        if parts is None:
+            return CanonicalUrl(url, url)
+        scheme, host, path = parts
+        canonical = f'{scheme}://{host}{path}'
+        return CanonicalUrl(canonical, self._display(kind, canonical, host, path))
+
+    def canonicalize_many(self, urls: Iterable[Optional[str]], kind: str = 'page') -> List[CanonicalUrl]:
+        """批量规范化，保持顺序；同一批中重复的地址只计算一次"""
+        if kind not in _KINDS:
+            raise ValueError(f"未知的地址类型: {kind}")
+        results = []
+        seen: Dict[str, CanonicalUrl] = {}
+        for url in urls:
+            result = seen.get(url) if url else None
+            if result is None:
+                result = seen[url or ''] = self.canonicalize(url, kind)
+            results.append(result)
+        return results
+
+    def display(self, urls: Iterable[Optional[str]], kind: str = 'page') -> List[str]:
+        """批量规范化，只返回展示形式"""
+        return [result.display for result in self.canonicalize_many(urls, kind)]
+
+    def is_chapter_image(self, url: Optional[str]) -> bool:
+        """章节正文图片：图片域名下且路径不含封面、头像等关键词"""
+        parts = self._split(url.strip(), 'image') if url else None
+        if parts is None:
+            return False
+        _, host, path = parts
+        if self.role(host, path) != 'image':
+            return False
+        return not (self.excluded and self.excluded.search(path))
+
+    def chapter_images(self, urls: Iterable[Optional[str]]) -> List[str]:
+        """过滤出章节正文图片，返回去重后的完整地址（保持页面顺序）"""
+        images = [url for url in urls if self.is_chapter_image(url)]
+        return list(dict.fromkeys(result.canonical for result in self.canonicalize_many(images, 'image')))
+
+
+# 全局共享的地址规范化器
+url_canonicalizer = UrlCanonicalizer()
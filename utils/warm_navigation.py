@@ -0,0 +1,76 @@
+import logging
+from urllib.parse import urlsplit
+from playwright.async_api import Page
+from config.settings import PAGE_READINESS_CONFIG, WARM_PAGE_CONFIG
+from utils.page_readiness import wait_for_page_ready
+
+logger = logging.getLogger(__name__)
+
+# 导航方式
+NAVIGATION_COLD = 'cold'
+NAVIGATION_WARM = 'warm'
+NAVIGATION_CLIENT = 'client'
+
+# 通过站点前端路由跳转，返回是否已发起导航
+_CLIENT_NAVIGATE_SCRIPT = """
+(url) => {
+    const target = new URL(url, location.href);
+    if (target.origin !== location.origin) {
+        return false;
+    }
+    const path = target.pathname + target.search + target.hash;
+    if (window.next && window.next.router && typeof window.next.router.push === 'function') {
+        window.next.router.push(path);
+        return true;
+    }
+    if (window.$nuxt && window.$nuxt.$router) {
+        window.$nuxt.$router.push(path);
+        return true;
+    }
+    return false;
+}
+"""
+
+# 标记上一页面的目标元素，客户端导航后只有新渲染的元素才算就绪
+_MARK_STALE_SCRIPT = """
+(selector) => {
+    for (const element of document.querySelectorAll(selector)) {
+        element.setAttribute('data-gmh-stale', '');
+    }
+}
+"""
+
+
+def keep_warm(url: str) -> bool:
+    """归还的页面是否可以停留在当前地址"""
+    if not WARM_PAGE_CONFIG.get('enabled', True):
+        return False
+    host = (urlsplit(url).hostname or '').lower()
+    return any(host == domain or host.endswith('.' + domain) for domain in WARM_PAGE_CONFIG['origin_hosts'])
+
+
+def navigation_mode(page: Page, url: str, javascript: bool) -> str:
+    """根据页面当前地址选择导航方式"""
+    current = urlsplit(page.url)
+    target = urlsplit(url)
+    if not keep_warm(page.url) or (current.scheme, current.netloc) != (target.scheme, target.netloc):
+        return NAVIGATION_COLD
+    if javascript and WARM_PAGE_CONFIG.get('client_navigation', True):
+        return NAVIGATION_CLIENT
+    return NAVIGATION_WARM
+
+
+async def client_navigate(page: Page, url: str, page_type: str) -> bool:
+    """使用站点前端路由导航并等待新内容就绪，失败时返回 False 由调用方改用 page.goto"""
+    config = PAGE_READINESS_CONFIG.get(page_type)
+    if not config:
+        return False
+    try:
+        await page.evaluate(_MARK_STALE_SCRIPT, config['selector'])
+        if not await page.evaluate(_CLIENT_NAVIGATE_SCRIPT, url):
+            return False
+        await page.wait_for_url(url, timeout=WARM_PAGE_CONFIG.get('client_navigation_timeout', 10000))
+        return await wait_for_page_ready(page, page_type, fresh_only=True)
+    except Exception as e:
+        logger.debug(f"客户端导航失败，改用页面跳转: {str(e)}")
+        return False